@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""PTA benchmark runner.
+
+Runs the benchmark drivers in the ``pta_bench`` package and writes results
+in the schema defined by ``spec.md``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add this directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pta_bench import (
+    adversarial,
+    history,
+    includes,
+    incremental,
+    micro,
+    query,
+    scaling,
+    startup,
+)
+from pta_bench.profiling import KINDS, Profiler
+
+# Subcommand name -> driver module exposing add_arguments() and run()
+COMMANDS = {
+    "query": query,
+    "incremental": incremental,
+    "history": history,
+    "scaling": scaling,
+    "includes": includes,
+    "adversarial": adversarial,
+    "micro": micro,
+    "startup": startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="PTA benchmark runner",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Query benchmarks B101-B103 against Python beancount (beanquery)
+  python benchmark.py query --preset medium --output results.json
+
+  # Same catalog through rustledger's query command
+  python benchmark.py query --impl rustledger --file files/medium.beancount
+
+  # Generate an edit script and replay it through the reference loader
+  python benchmark.py incremental generate --preset medium -o edits.json
+  python benchmark.py incremental run --script edits.json
+
+  # Replay the same edits against a language server
+  python benchmark.py incremental run --script edits.json --lsp beancount-language-server
+
+  # Store results and gate on regressions against the previous stored run
+  python benchmark.py history record results.json
+  python benchmark.py history compare new-results.json --threshold 5
+
+  # Sweep 1k..32k transactions and fail if any phase grows faster than n^1.2
+  python benchmark.py scaling --min-size 1000 --max-size 32000 --bound 1.2
+
+  # Compare single-file and include-tree loading
+  python benchmark.py includes --impl rustledger --sizes 1000,4000,16000 --fan-out 4 --depth 2
+
+  # Probe input limits with worst-case files
+  python benchmark.py adversarial --impl rustledger --pathology deep-accounts
+
+  # Time reference core primitives on 1000-item synthetic inputs
+  python benchmark.py micro --size 1000 -b inventory-add-position
+
+  # Start-up cost and per-module import times on a tiny ledger
+  python benchmark.py startup --impl beancount --top 10
+
+  # Profile the measured iterations; reports are written next to results.json
+  python benchmark.py --profile cpu micro -b entry-sort --output results.json
+""",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profiler",
+        choices=KINDS,
+        help="Profile in-process measured iterations with cProfile (cpu) or tracemalloc (alloc)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path("profile"),
+        help="Report directory when results go to stdout (default: profile)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        help="Functions or allocation sites in the text reports (default: 30)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, module in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=module.__doc__.splitlines()[0])
+        module.add_arguments(subparser)
+
+    args = parser.parse_args()
+    if args.profiler:
+        args.profiler = Profiler(args.profiler, top=args.profile_top)
+    status = COMMANDS[args.command].run(args)
+    if args.profiler:
+        output = getattr(args, "output", None)
+        prefix = output.with_suffix("") if output else args.profile_dir / args.command
+        args.profiler.write_reports(prefix)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,11 @@
 from __future__ import annotations
 
 import argparse
+import json
+import math
 import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from pathlib import Path
 
@@ -114,15 +118,78 @@ def get_payee(account: str) -> str:
     return random.choice(PAYEES["default"])
 
 
+@dataclass
+class Posting:
+    """A single posting; ``number`` and ``currency`` are None when elided.
+
+    ``cost`` and ``price`` are per-unit amounts such as ``"185.00 USD"``.
+    """
+
+    account: str
+    number: str | None = None
+    currency: str | None = None
+    cost: str | None = None
+    price: str | None = None
+
+
+@dataclass
+class Transaction:
+    """A format-independent transaction."""
+
+    date: date
+    flag: str
+    payee: str
+    narration: str
+    postings: list[Posting]
+    metadata: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Balance:
+    """A balance assertion: ``account`` holds the amount at the start of ``date``."""
+
+    date: date
+    account: str
+    number: str
+    currency: str
+
+
+@dataclass
+class Price:
+    """A price of ``currency`` in units of ``quote``."""
+
+    date: date
+    currency: str
+    number: str
+    quote: str
+
+
+@dataclass
+class Journal:
+    """A format-independent benchmark journal.
+
+    The random draws happen once while building the journal, so every output
+    format renders exactly the same transactions for a given seed.
+    """
+
+    transactions_count: int
+    accounts_count: int
+    commodities_count: int
+    complexity: str
+    commodities: list[str]
+    accounts: list[str]
+    open_date: date
+    # Balance assertions appear in the stream after the entries they check
+    transactions: list[Transaction | Balance]
+
+
 def generate_transaction(
     txn_date: date,
     accounts: list[str],
     commodities: list[str],
     complexity: str = "medium",
-) -> str:
+) -> Transaction:
     """Generate a single transaction."""
-    lines = []
-
     # Pick expense and funding accounts
     expense_accounts = [a for a in accounts if a.startswith("Expenses:")]
     asset_accounts = [a for a in accounts if a.startswith("Assets:")]
@@ -133,7 +200,17 @@ def generate_transaction(
 
     expense = random.choice(expense_accounts)
     asset = random.choice(asset_accounts)
+    return generate_purchase(txn_date, expense, asset, commodities, complexity)
+
 
+def generate_purchase(
+    txn_date: date,
+    expense: str,
+    funding: str,
+    commodities: list[str],
+    complexity: str = "medium",
+) -> Transaction:
+    """Generate a purchase booked to ``expense`` and paid from ``funding``."""
     payee = get_payee(expense)
     narration = f"Purchase at {payee}"
     commodity = random.choice(commodities[:3])  # Use main currencies
@@ -146,26 +223,50 @@ def generate_transaction(
     else:
         amount = round(random.uniform(10, 500), 2)
 
-    # Transaction header
     flag = random.choice(["*", "*", "*", "!"])  # Mostly complete
-    lines.append(f'{txn_date} {flag} "{payee}" "{narration}"')
 
     # Add metadata sometimes
+    metadata = {}
     if complexity == "high" and random.random() < 0.3:
-        lines.append(f'  category: "{expense.split(":")[-1].lower()}"')
+        metadata["category"] = expense.split(":")[-1].lower()
+
+    # Pay for some foreign-currency purchases in USD
+    price = None
+    if complexity == "high" and commodity != "USD" and random.random() < 0.2:
+        price = f"{BASE_RATES.get(commodity, 1.0) * random.uniform(0.95, 1.05):.4f} USD"
+
+    return Transaction(
+        date=txn_date,
+        flag=flag,
+        payee=payee,
+        narration=narration,
+        postings=[Posting(expense, f"{amount:.2f}", commodity, price=price), Posting(funding)],
+        metadata=metadata,
+    )
 
-    # Postings
-    lines.append(f"  {expense}  {amount:.2f} {commodity}")
-    lines.append(f"  {asset}")
 
-    return "\n".join(lines)
+def generate_investment_transaction(txn_date: date, account: str, funding: str) -> Transaction:
+    """Generate a purchase of shares held at cost in ``account``."""
+    stock = random.choice(STOCKS)
+    shares = random.randint(1, 20)
+    cost = round(random.uniform(20, 500), 2)
+    return Transaction(
+        date=txn_date,
+        flag="*",
+        payee="Broker",
+        narration=f"Buy {stock}",
+        postings=[
+            Posting(account, str(shares), stock, cost=f"{cost:.2f} USD"),
+            Posting(funding),
+        ],
+    )
 
 
 def generate_income_transaction(
     txn_date: date,
     accounts: list[str],
     commodities: list[str],
-) -> str:
+) -> Transaction:
     """Generate an income transaction (e.g., salary)."""
     income_accounts = [a for a in accounts if a.startswith("Income:")]
     asset_accounts = [a for a in accounts if a.startswith("Assets:")]
@@ -176,78 +277,569 @@ def generate_income_transaction(
     commodity = random.choice(commodities[:3])
     amount = round(random.uniform(2000, 8000), 2)
 
-    lines = [
-        f'{txn_date} * "Employer" "Paycheck"',
-        f"  {asset}  {amount:.2f} {commodity}",
-        f"  {income}",
-    ]
+    return Transaction(
+        date=txn_date,
+        flag="*",
+        payee="Employer",
+        narration="Paycheck",
+        postings=[Posting(asset, f"{amount:.2f}", commodity), Posting(income)],
+    )
 
-    return "\n".join(lines)
 
+@dataclass
+class Recurring:
+    """A transaction repeated every month on the same day.
+
+    The first posting carries ``amount``; the ``funding`` posting is elided.
+    """
+
+    payee: str
+    narration: str
+    account: str
+    funding: str
+    amount: float
+    currency: str = "USD"
+    day: int = 1
+
+
+@dataclass
+class Profile:
+    """A statistical model of how a real ledger grows.
+
+    - ``zipf_exponent``: account popularity follows ``1 / rank^s``; 0 is uniform
+    - ``account_weights``: extra multipliers for accounts starting with a prefix
+    - ``transactions_per_day``: mean of the Poisson daily transaction count
+    - ``monthly_weights``: twelve seasonal multipliers, January first
+    - ``burst_probability``/``burst_multiplier``: rare days with many transactions
+    - ``recurring``: monthly transactions such as salary and rent
+    """
+
+    zipf_exponent: float = 1.0
+    account_weights: dict[str, float] = field(default_factory=dict)
+    transactions_per_day: float = 3.0
+    monthly_weights: list[float] = field(default_factory=lambda: [1.0] * 12)
+    burst_probability: float = 0.0
+    burst_multiplier: float = 1.0
+    recurring: list[Recurring] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, path: Path) -> Profile:
+        """Load a profile; unknown keys are rejected rather than ignored."""
+        data = json.loads(path.read_text())
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"{path}: unknown profile keys: {', '.join(sorted(unknown))}")
+        data["recurring"] = [Recurring(**item) for item in data.get("recurring", [])]
+        profile = cls(**data)
+        if len(profile.monthly_weights) != 12:
+            raise ValueError(f"{path}: monthly_weights needs 12 values")
+        return profile
+
+
+# Profiled purchases are paid from bank accounts and credit cards alike
+FUNDING_PREFIXES = ("Assets:Bank", "Assets:Cash", "Liabilities:CreditCard")
+
+
+def zipf_weights(accounts: list[str], profile: Profile) -> list[float]:
+    """Return cumulative Zipf weights for ``accounts`` in a random rank order.
+
+    The ranking is shuffled so the popular accounts differ between seeds
+    rather than always being the first template entries.
+    """
+    ranked = random.sample(accounts, len(accounts))
+    rank = {account: i + 1 for i, account in enumerate(ranked)}
+    weights = []
+    total = 0.0
+    for account in accounts:
+        weight = 1.0 / rank[account] ** profile.zipf_exponent
+        for prefix, multiplier in profile.account_weights.items():
+            if account.startswith(prefix):
+                weight *= multiplier
+        total += weight
+        weights.append(total)
+    return weights
+
+
+def poisson(mean: float) -> int:
+    """Draw a Poisson-distributed count (normal approximation for large means)."""
+    if mean > 30:
+        return max(0, round(random.gauss(mean, math.sqrt(mean))))
+    limit = math.exp(-mean)
+    count = 0
+    product = random.random()
+    while product > limit:
+        count += 1
+        product *= random.random()
+    return count
+
+
+def generate_profiled_transactions(
+    transactions: int,
+    accounts: list[str],
+    commodities: list[str],
+    start_date: date,
+    complexity: str,
+    profile: Profile,
+) -> list[Transaction]:
+    """Generate transactions day by day following ``profile``.
+
+    ``accounts`` must include an expense account and a funding account (see
+    ``FUNDING_PREFIXES``) for purchases to be posted to.
+    """
+    expense_accounts = [a for a in accounts if a.startswith("Expenses:")]
+    funding_accounts = [a for a in accounts if a.startswith(FUNDING_PREFIXES)]
+    if not expense_accounts or not funding_accounts:
+        raise ValueError("profiled transactions need an expense and a funding account")
+    expense_weights = zipf_weights(expense_accounts, profile)
+    funding_weights = zipf_weights(funding_accounts, profile)
 
-def generate_beancount_file(
+    txn_list: list[Transaction] = []
+    current_date = start_date
+    while len(txn_list) < transactions:
+        for item in profile.recurring:
+            if current_date.day == item.day:
+                txn_list.append(
+                    Transaction(
+                        date=current_date,
+                        flag="*",
+                        payee=item.payee,
+                        narration=item.narration,
+                        postings=[
+                            Posting(item.account, f"{item.amount:.2f}", item.currency),
+                            Posting(item.funding),
+                        ],
+                    )
+                )
+
+        rate = profile.transactions_per_day * profile.monthly_weights[current_date.month - 1]
+        if random.random() < profile.burst_probability:
+            rate *= profile.burst_multiplier
+        for _ in range(poisson(rate)):
+            expense = random.choices(expense_accounts, cum_weights=expense_weights)[0]
+            funding = random.choices(funding_accounts, cum_weights=funding_weights)[0]
+            txn_list.append(
+                generate_purchase(current_date, expense, funding, commodities, complexity)
+            )
+        current_date += timedelta(days=1)
+
+    return txn_list[:transactions]
+
+
+def generate_journal(
     transactions: int,
     accounts: int,
     commodities: int,
     start_date: date,
     complexity: str,
-) -> str:
-    """Generate a complete Beancount file."""
-    lines = []
-
-    # Header
-    lines.append(f"; Benchmark file generated with {transactions} transactions")
-    lines.append(f"; Accounts: {accounts}, Commodities: {commodities}")
-    lines.append(f"; Complexity: {complexity}")
-    lines.append("")
-    lines.append('option "title" "Benchmark Ledger"')
-    lines.append('option "operating_currency" "USD"')
-    lines.append("")
+    profile: Profile | None = None,
+) -> Journal:
+    """Generate a complete, format-independent journal.
 
+    Without a ``profile`` accounts and payees are picked uniformly and dates
+    advance at a fixed rate.
+    """
     # Generate accounts and commodities
     account_list = generate_accounts(accounts)
     commodity_list = COMMODITIES[:commodities]
+    if "Equity:OpeningBalances" not in account_list:
+        account_list.append("Equity:OpeningBalances")
 
-    # Commodity declarations
-    for comm in commodity_list:
-        lines.append(f"1900-01-01 commodity {comm}")
-    lines.append("")
-
-    # Account declarations (day before start date)
+    # Accounts are opened the day before the start date
     open_date = start_date - timedelta(days=1)
-    for account in account_list:
-        lines.append(f"{open_date} open {account}")
-    if "Equity:OpeningBalances" not in account_list:
-        lines.append(f"{open_date} open Equity:OpeningBalances")
-    lines.append("")
 
     # Opening balance
-    lines.append(f'{open_date} * "Opening Balance"')
-    lines.append(f"  Assets:Bank:Checking  10000.00 USD")
-    lines.append(f"  Equity:OpeningBalances")
-    lines.append("")
+    txn_list: list[Transaction | Balance] = [
+        Transaction(
+            date=open_date,
+            flag="*",
+            payee="",
+            narration="Opening Balance",
+            postings=[
+                Posting("Assets:Bank:Checking", "10000.00", "USD"),
+                Posting("Equity:OpeningBalances"),
+            ],
+        )
+    ]
+    if complexity == "high":
+        txn_list.append(Balance(start_date, "Assets:Bank:Checking", "10000.00", "USD"))
+
+    if profile is not None:
+        for item in profile.recurring:
+            for account in (item.account, item.funding):
+                if account not in account_list:
+                    account_list.append(account)
+        # Few accounts may leave no expense or funding account for purchases
+        if not any(account.startswith("Expenses:") for account in account_list):
+            account_list.append("Expenses:Misc")
+        if not any(account.startswith(FUNDING_PREFIXES) for account in account_list):
+            account_list.append("Assets:Bank:Checking")
+        txn_list.extend(
+            generate_profiled_transactions(
+                transactions, account_list, commodity_list, start_date, complexity, profile
+            )
+        )
+    else:
+        # Generate transactions
+        current_date = start_date
+        investment_accounts = [a for a in account_list if a.startswith("Assets:Investment:")]
+
+        for i in range(transactions):
+            # Advance date occasionally
+            if random.random() < 0.3:
+                current_date += timedelta(days=random.randint(1, 3))
+
+            # Mix of transaction types
+            if i % 30 == 0:  # Monthly income
+                txn = generate_income_transaction(current_date, account_list, commodity_list)
+            elif complexity == "high" and i % 30 == 15 and investment_accounts:
+                txn = generate_investment_transaction(
+                    current_date, random.choice(investment_accounts), "Assets:Bank:Checking"
+                )
+            else:
+                txn = generate_transaction(current_date, account_list, commodity_list, complexity)
+
+            txn_list.append(txn)
+
+    return Journal(
+        transactions_count=transactions,
+        accounts_count=accounts,
+        commodities_count=commodities,
+        complexity=complexity,
+        commodities=commodity_list,
+        accounts=account_list,
+        open_date=open_date,
+        transactions=txn_list,
+    )
 
-    # Generate transactions
-    current_date = start_date
-    days_span = transactions // 3  # Average ~3 transactions per day
 
-    for i in range(transactions):
-        # Advance date occasionally
-        if random.random() < 0.3:
-            current_date += timedelta(days=random.randint(1, 3))
+def format_header(journal: Journal) -> list[str]:
+    """Format the comment header shared by all output formats."""
+    return [
+        f"; Benchmark file generated with {journal.transactions_count} transactions",
+        f"; Accounts: {journal.accounts_count}, Commodities: {journal.commodities_count}",
+        f"; Complexity: {journal.complexity}",
+        "",
+    ]
 
-        # Mix of transaction types
-        if i % 30 == 0:  # Monthly income
-            txn = generate_income_transaction(current_date, account_list, commodity_list)
-        else:
-            txn = generate_transaction(current_date, account_list, commodity_list, complexity)
 
-        lines.append(txn)
+def format_posting(posting: Posting, lot_costs: bool = True) -> str:
+    """Format a posting line; amounts use suffix currencies in every format.
+
+    Without ``lot_costs`` (hledger) a cost is written as a price annotation.
+    """
+    if posting.number is None:
+        return f"  {posting.account}"
+    line = f"  {posting.account}  {posting.number} {posting.currency}"
+    if posting.cost is not None:
+        line += f" {{{posting.cost}}}" if lot_costs else f" @ {posting.cost}"
+    if posting.price is not None:
+        line += f" @ {posting.price}"
+    return line
+
+
+def format_beancount_transaction(txn: Transaction) -> list[str]:
+    """Format a transaction in Beancount syntax."""
+    if txn.payee:
+        lines = [f'{txn.date} {txn.flag} "{txn.payee}" "{txn.narration}"']
+    else:
+        lines = [f'{txn.date} {txn.flag} "{txn.narration}"']
+    lines.extend(f'  {key}: "{value}"' for key, value in txn.metadata.items())
+    lines.extend(format_posting(posting) for posting in txn.postings)
+    return lines
+
+
+def format_ledger_transaction(
+    txn: Transaction, date_format: str, lot_costs: bool = True
+) -> list[str]:
+    """Format a transaction in Ledger/hledger syntax.
+
+    Payee and narration are joined with ``|`` and metadata becomes a
+    ``; key: value`` comment, per the conversion specs.
+    """
+    description = f"{txn.payee} | {txn.narration}" if txn.payee else txn.narration
+    lines = [f"{txn.date.strftime(date_format)} {txn.flag} {description}"]
+    lines.extend(f"  ; {key}: {value}" for key, value in txn.metadata.items())
+    lines.extend(format_posting(posting, lot_costs) for posting in txn.postings)
+    return lines
+
+
+def format_ledger_balance(balance: Balance, date_format: str) -> list[str]:
+    """Format a balance assertion as a Ledger/hledger assertion posting.
+
+    Beancount checks the balance at the start of the day and Ledger/hledger
+    after the posting, so the assertion is dated the day before.
+    """
+    day_before = balance.date - timedelta(days=1)
+    return [
+        f"{day_before.strftime(date_format)} * Balance assertion",
+        f"  {balance.account}  0 {balance.currency} = {balance.number} {balance.currency}",
+    ]
+
+
+def beancount_options() -> list[str]:
+    """Format the file-level options in Beancount syntax."""
+    return ['option "title" "Benchmark Ledger"', 'option "operating_currency" "USD"']
+
+
+def ledger_options() -> list[str]:
+    """Format the file-level options as Ledger/hledger comments."""
+    return ["; title: Benchmark Ledger", "; operating_currency: USD"]
+
+
+@dataclass(frozen=True)
+class Syntax:
+    """How each kind of directive is written in one output format."""
+
+    extension: str
+    options: Callable[[], list[str]]
+    commodity: Callable[[str], list[str]]
+    account: Callable[[Journal, str], list[str]]
+    transaction: Callable[[Transaction], list[str]]
+    balance: Callable[[Balance], list[str]]
+    price: Callable[[Price], str]
+    include: Callable[[str], str]
+
+
+# Ledger syntax follows conversions/beancount-ledger/spec.md and hledger
+# syntax follows conversions/beancount-hledger/spec.md.
+SYNTAXES = {
+    "beancount": Syntax(
+        extension=".beancount",
+        options=beancount_options,
+        commodity=lambda comm: [f"1900-01-01 commodity {comm}"],
+        account=lambda journal, account: [f"{journal.open_date} open {account}"],
+        transaction=format_beancount_transaction,
+        balance=lambda b: [f"{b.date} balance {b.account}  {b.number} {b.currency}"],
+        price=lambda p: f"{p.date} price {p.currency} {p.number} {p.quote}",
+        include=lambda path: f'include "{path}"',
+    ),
+    "ledger": Syntax(
+        extension=".ledger",
+        options=ledger_options,
+        commodity=lambda comm: [f"commodity {comm}", f"  format 1,000.00 {comm}"],
+        account=lambda journal, account: [
+            f"; Account opened: {journal.open_date}",
+            f"account {account}",
+        ],
+        transaction=lambda txn: format_ledger_transaction(txn, "%Y/%m/%d"),
+        balance=lambda b: format_ledger_balance(b, "%Y/%m/%d"),
+        price=lambda p: f"P {p.date:%Y/%m/%d} {p.currency} {p.number} {p.quote}",
+        include=lambda path: f"include {path}",
+    ),
+    "hledger": Syntax(
+        extension=".journal",
+        options=ledger_options,
+        commodity=lambda comm: [f"commodity 1,000.00 {comm}"],
+        account=lambda journal, account: [f"; Opened: {journal.open_date}", f"account {account}"],
+        transaction=lambda txn: format_ledger_transaction(txn, "%Y-%m-%d", lot_costs=False),
+        balance=lambda b: format_ledger_balance(b, "%Y-%m-%d"),
+        price=lambda p: f"P {p.date} {p.currency} {p.number} {p.quote}",
+        include=lambda path: f"include {path}",
+    ),
+}
+
+
+def format_commodities(journal: Journal, syntax: Syntax) -> list[str]:
+    """Format the commodity declarations."""
+    lines = []
+    for comm in journal.commodities:
+        lines.extend(syntax.commodity(comm))
+    return lines
+
+
+def format_accounts(journal: Journal, syntax: Syntax) -> list[str]:
+    """Format the account declarations."""
+    lines = []
+    for account in journal.accounts:
+        lines.extend(syntax.account(journal, account))
+    return lines
+
+
+def format_transactions(transactions: list[Transaction | Balance], syntax: Syntax) -> list[str]:
+    """Format transactions and balance assertions, each followed by a blank line."""
+    lines = []
+    for txn in transactions:
+        if isinstance(txn, Balance):
+            lines.extend(syntax.balance(txn))
+        else:
+            lines.extend(syntax.transaction(txn))
         lines.append("")
+    return lines
 
+
+def format_journal(
+    journal: Journal, output_format: str, prices: list[Price] | None = None
+) -> str:
+    """Render a journal as a single file in ``output_format``.
+
+    With ``prices`` the file holds the same directives as the include tree
+    written by ``write_include_tree`` for the same seed.
+    """
+    syntax = SYNTAXES[output_format]
+    lines = format_header(journal)
+    lines.extend(syntax.options())
+    lines.append("")
+    lines.extend(format_commodities(journal, syntax))
+    lines.append("")
+    lines.extend(format_accounts(journal, syntax))
+    lines.append("")
+    if prices is not None:
+        lines.extend(syntax.price(price) for price in prices)
+        lines.append("")
+    lines.extend(format_transactions(journal.transactions, syntax))
     return "\n".join(lines)
 
 
+# Approximate USD rates used as the starting point of the price random walk
+BASE_RATES = {"EUR": 1.10, "GBP": 1.27, "JPY": 0.0068, "CAD": 0.74, "AUD": 0.66, "CHF": 1.12}
+
+
+def generate_prices(journal: Journal, quote: str = "USD") -> list[Price]:
+    """Generate month-end prices for every non-quote commodity of ``journal``.
+
+    Prices are drawn after the journal is complete, so adding them does not
+    change the transactions generated for a given seed.
+    """
+    currencies = [comm for comm in journal.commodities if comm != quote]
+    rates = {comm: BASE_RATES.get(comm, 1.0) for comm in currencies}
+    last_date = journal.transactions[-1].date
+    prices = []
+    month = date(journal.open_date.year, journal.open_date.month, 1)
+    while month <= last_date:
+        next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        for comm in currencies:
+            rates[comm] *= random.uniform(0.98, 1.02)
+            prices.append(Price(next_month - timedelta(days=1), comm, f"{rates[comm]:.6g}", quote))
+        month = next_month
+    return prices
+
+
+def account_filename(account: str, syntax: Syntax) -> str:
+    """Return the file name holding the transactions of ``account``."""
+    return account.replace(":", "-") + syntax.extension
+
+
+def chunk(items: list, count: int) -> list[list]:
+    """Split ``items`` into at most ``count`` contiguous, nearly equal chunks."""
+    size, extra = divmod(len(items), count)
+    chunks = []
+    start = 0
+    for i in range(min(count, len(items))):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def write_include_tree(
+    journal: Journal,
+    output_format: str,
+    output_dir: Path,
+    fan_out: int = 4,
+    depth: int = 2,
+    repeat_includes: bool = False,
+) -> list[Path]:
+    """Write ``journal`` as a tree of files connected by ``include`` directives.
+
+    The layout mirrors how large personal ledgers are usually organised::
+
+        main                     options, includes of everything below
+        commodities, accounts    declarations
+        prices                   month-end prices shared by all years
+        <year>/index             per-year entry point
+        <year>/part-N/.../index  nested index files, ``depth`` levels deep
+        <year>/.../<Account>     transactions of one year and account
+
+    Each index includes at most ``fan_out`` children, except those of the last
+    level, which include all the files below them. Transactions are filed
+    under the account of their first posting, balance assertions under their
+    account. With ``repeat_includes`` every
+    year index includes the shared price file again, which exercises
+    deduplication of repeated includes.
+
+    Returns:
+      The written paths, the main file first.
+    """
+    if fan_out < 2 or depth < 1:
+        raise ValueError("fan_out must be at least 2 and depth at least 1")
+    syntax = SYNTAXES[output_format]
+    ext = syntax.extension
+    written: list[Path] = []
+
+    def write(relative: str, lines: list[str]) -> None:
+        path = output_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n")
+        written.append(path)
+
+    def write_index(directory: str, files: dict[str, list[str]], levels: int) -> str:
+        """Write an index for ``files`` under ``directory``; return its path."""
+        names = sorted(files)
+        includes = []
+        if levels <= 1 or len(names) <= fan_out:
+            for name in names:
+                write(f"{directory}/{name}", files[name])
+                includes.append(name)
+        else:
+            for i, part in enumerate(chunk(names, fan_out)):
+                child = write_index(
+                    f"{directory}/part-{i}", {name: files[name] for name in part}, levels - 1
+                )
+                includes.append(child.removeprefix(f"{directory}/"))
+        if repeat_includes and directory.count("/") == 0:
+            includes.append(f"../prices{ext}")
+        write(f"{directory}/index{ext}", [syntax.include(name) for name in includes])
+        return f"{directory}/index{ext}"
+
+    by_year: dict[int, dict[str, list[Transaction | Balance]]] = {}
+    for txn in journal.transactions:
+        accounts = by_year.setdefault(txn.date.year, {})
+        account = txn.account if isinstance(txn, Balance) else txn.postings[0].account
+        accounts.setdefault(account, []).append(txn)
+
+    main = format_header(journal) + syntax.options() + [""]
+    main.append(syntax.include(f"commodities{ext}"))
+    main.append(syntax.include(f"accounts{ext}"))
+    main.append(syntax.include(f"prices{ext}"))
+    for year, accounts in sorted(by_year.items()):
+        files = {
+            account_filename(account, syntax): format_transactions(txns, syntax)
+            for account, txns in accounts.items()
+        }
+        main.append(syntax.include(write_index(str(year), files, depth)))
+    write(f"commodities{ext}", format_commodities(journal, syntax))
+    write(f"accounts{ext}", format_accounts(journal, syntax))
+    write(f"prices{ext}", [syntax.price(price) for price in generate_prices(journal)])
+    write(f"main{ext}", main)
+    written.insert(0, written.pop())
+    return written
+
+
+def generate_file(
+    transactions: int,
+    accounts: int,
+    commodities: int,
+    start_date: date,
+    complexity: str,
+    output_format: str = "beancount",
+    profile: Profile | None = None,
+    prices: bool = False,
+) -> str:
+    """Generate a complete ledger file in the requested format.
+
+    With ``prices`` month-end prices are added, as in an include tree.
+    """
+    journal = generate_journal(
+        transactions=transactions,
+        accounts=accounts,
+        commodities=commodities,
+        start_date=start_date,
+        complexity=complexity,
+        profile=profile,
+    )
+    return format_journal(journal, output_format, generate_prices(journal) if prices else None)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate benchmark ledger files",
@@ -285,12 +877,51 @@ def main():
         default="medium",
         help="Transaction complexity (default: medium)",
     )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=sorted(SYNTAXES),
+        default="beancount",
+        help="Output syntax (default: beancount)",
+    )
     parser.add_argument(
         "--output",
         "-o",
         type=Path,
         help="Output file (default: stdout)",
     )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="JSON distribution profile (Zipf accounts, recurring and burst days)",
+    )
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="Write a tree of included files into the --output directory",
+    )
+    parser.add_argument(
+        "--prices",
+        action="store_true",
+        help="Add month-end prices, as --tree mode always does",
+    )
+    parser.add_argument(
+        "--fan-out",
+        type=int,
+        default=4,
+        help="Maximum includes per index file in --tree mode (default: 4)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=2,
+        help="Levels of index files per year in --tree mode (default: 2)",
+    )
+    parser.add_argument(
+        "--repeat-includes",
+        action="store_true",
+        help="Include the shared price file again from every year (--tree mode)",
+    )
     parser.add_argument(
         "--seed",
         type=int,
@@ -325,14 +956,43 @@ def main():
 
     # Parse start date
     start_date = date.fromisoformat(args.start_date)
+    try:
+        profile = Profile.from_json(args.profile) if args.profile else None
+    except (OSError, TypeError, ValueError) as e:
+        parser.error(f"invalid profile: {e}")
+
+    if args.tree:
+        if not args.output:
+            parser.error("--tree requires --output DIRECTORY")
+        journal = generate_journal(
+            transactions=args.transactions,
+            accounts=args.accounts,
+            commodities=args.commodities,
+            start_date=start_date,
+            complexity=args.complexity,
+            profile=profile,
+        )
+        paths = write_include_tree(
+            journal,
+            args.format,
+            args.output,
+            fan_out=args.fan_out,
+            depth=args.depth,
+            repeat_includes=args.repeat_includes,
+        )
+        print(f"Generated {paths[0]} ({len(paths)} files, {args.transactions} transactions)")
+        return
 
     # Generate file
-    content = generate_beancount_file(
+    content = generate_file(
         transactions=args.transactions,
         accounts=args.accounts,
         commodities=args.commodities,
         start_date=start_date,
         complexity=args.complexity,
+        output_format=args.format,
+        profile=profile,
+        prices=args.prices,
     )
 
     # Output
@@ -0,0 +1,20 @@
+"""Benchmark tooling for PTA implementations.
+
+See ``spec.md`` and ``methodology.md`` in the parent directory. The
+``benchmark.py`` script is the command-line entry point.
+"""
+
+from .results import SUITE, benchmark_result, suite_result, write_results
+from .runner import MeasureConfig, measure, run_command
+from .stats import summarize
+
+__all__ = [
+    "SUITE",
+    "MeasureConfig",
+    "benchmark_result",
+    "measure",
+    "run_command",
+    "suite_result",
+    "summarize",
+    "write_results",
+]
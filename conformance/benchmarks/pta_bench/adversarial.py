@@ -0,0 +1,313 @@
+"""Adversarial inputs that probe the limits in ``security/limits``.
+
+Each pathology builds a small, valid Beancount file whose cost is driven by
+a single parameter ``n`` (nesting depth, string length, key count, ...).
+The harness runs an implementation's ``parse`` command on every size,
+recording time, peak memory and whether the input was accepted, and fits
+the growth exponents with the scaling benchmark's log-log fit. A limit that
+is enforced cheaply shows up as a rejection with flat time and memory; an
+unenforced one shows up as a steep curve, a timeout or a crash.
+
+Benchmark IDs ``B501``-``B507`` follow the order of ``PATHOLOGIES``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import DEFAULT_WORKDIR
+from .results import benchmark_result, suite_result, write_results
+from .runner import run_measured
+from .scaling import fit_exponent
+
+HEADER = """\
+option "operating_currency" "USD"
+
+2000-01-01 commodity USD
+2000-01-01 open Assets:Cash
+2000-01-01 open Equity:Opening
+"""
+
+
+def _transaction(
+    narration: str = "Adversarial", posting: str = "Assets:Cash", lines: str = ""
+) -> str:
+    """A two-posting transaction with optional extra lines before the postings."""
+    return f'2000-01-02 * "{narration}"\n{lines}  {posting}  1.00 USD\n  Equity:Opening\n'
+
+
+def deep_accounts(n: int) -> str:
+    """An account with ``n`` components, used in an open and a posting."""
+    account = "Assets:" + ":".join(f"L{i}" for i in range(n))
+    return f"{HEADER}2000-01-01 open {account}\n\n{_transaction(posting=account)}"
+
+
+def long_string(n: int) -> str:
+    """A narration of ``n`` bytes."""
+    return f"{HEADER}\n{_transaction(narration='x' * n)}"
+
+
+def many_metadata(n: int) -> str:
+    """A transaction with ``n`` distinct metadata keys."""
+    lines = "".join(f'  key{i}: "value"\n' for i in range(n))
+    return f"{HEADER}\n{_transaction(lines=lines)}"
+
+
+def many_commodities(n: int) -> str:
+    """``n`` commodities, all held in one inventory."""
+    names = [f"C{i:X}" for i in range(n)]
+    parts = [HEADER]
+    parts.extend(f"2000-01-01 commodity {name}\n" for name in names)
+    parts.append('\n2000-01-02 * "Many commodities"\n')
+    parts.extend(f"  Assets:Cash  1 {name}\n  Equity:Opening  -1 {name}\n" for name in names)
+    return "".join(parts)
+
+
+def long_number(n: int) -> str:
+    """A posting amount with an ``n``-digit integer part."""
+    number = "9" * n
+    return (
+        f'{HEADER}\n2000-01-02 * "Long number"\n  Assets:Cash  {number}.00 USD\n  Equity:Opening\n'
+    )
+
+
+def grouped_number(n: int) -> str:
+    """A posting amount of ``n`` digits with thousands separators.
+
+    ``[0-9,]+``-style number patterns are listed in
+    ``security/parsing/redos.md`` as a backtracking risk.
+    """
+    digits = "9" * (n % 3 or 3) + ",999" * ((n - 1) // 3)
+    return (
+        f'{HEADER}\n2000-01-02 * "Grouped number"\n'
+        f"  Assets:Cash  {digits}.00 USD\n  Equity:Opening\n"
+    )
+
+
+def pushtag_stack(n: int) -> str:
+    """``n`` nested ``pushtag`` directives around one transaction."""
+    push = "".join(f"pushtag #tag{i}\n" for i in range(n))
+    pop = "".join(f"poptag #tag{i}\n" for i in reversed(range(n)))
+    return f"{HEADER}\n{push}\n{_transaction()}\n{pop}"
+
+
+@dataclass(frozen=True)
+class Pathology:
+    """A worst-case input family and the limit it probes."""
+
+    benchmark_id: str
+    name: str
+    build: Callable[[int], str]
+    sizes: tuple[int, ...]
+    unit: str
+    limit: str
+
+
+PATHOLOGIES = [
+    Pathology(
+        "B501",
+        "deep-accounts",
+        deep_accounts,
+        (10, 100, 1000, 10000, 100000),
+        "components",
+        "security/limits/nesting.md",
+    ),
+    Pathology(
+        "B502",
+        "long-string",
+        long_string,
+        (1024, 16384, 262144, 4194304, 16777216),
+        "bytes",
+        "security/limits/input.md (line length)",
+    ),
+    Pathology(
+        "B503",
+        "many-metadata",
+        many_metadata,
+        (10, 100, 1000, 10000, 100000),
+        "keys",
+        "security/limits/memory.md",
+    ),
+    Pathology(
+        "B504",
+        "many-commodities",
+        many_commodities,
+        (10, 100, 1000, 10000, 100000),
+        "commodities",
+        "security/limits/memory.md (large collections)",
+    ),
+    Pathology(
+        "B505",
+        "long-number",
+        long_number,
+        (10, 100, 1000, 10000, 100000),
+        "digits",
+        "security/parsing/redos.md",
+    ),
+    Pathology(
+        "B506",
+        "grouped-number",
+        grouped_number,
+        (10, 100, 1000, 10000, 100000),
+        "digits",
+        "security/parsing/redos.md",
+    ),
+    Pathology(
+        "B507",
+        "pushtag-stack",
+        pushtag_stack,
+        (10, 100, 1000, 10000, 100000),
+        "tags",
+        "security/limits/nesting.md",
+    ),
+]
+
+
+def write_inputs(
+    directory: Path, pathologies: list[Pathology], max_bytes: int
+) -> dict[str, list[tuple[int, Path]]]:
+    """Write every size of every pathology; sizes above ``max_bytes`` are skipped."""
+    directory.mkdir(parents=True, exist_ok=True)
+    written: dict[str, list[tuple[int, Path]]] = {}
+    for pathology in pathologies:
+        files = written.setdefault(pathology.name, [])
+        for size in pathology.sizes:
+            content = pathology.build(size)
+            if len(content) > max_bytes:
+                break
+            path = directory / f"{pathology.name}-{size}.beancount"
+            if not path.exists() or path.stat().st_size != len(content):
+                path.write_text(content)
+            files.append((size, path))
+    return written
+
+
+def classify(exit_code: int, stderr: str) -> str:
+    """Describe how an implementation handled one input.
+
+    A non-zero exit is a rejection (an enforced limit or a reported error),
+    a negative one a crash by signal.
+    """
+    if exit_code == -1 and stderr.startswith("Timeout"):
+        return "timeout"
+    if exit_code < 0:
+        return "crashed"
+    return "accepted" if exit_code == 0 else "rejected"
+
+
+def run_pathology(
+    pathology: Pathology, files: list[tuple[int, Path]], command_template: str, timeout: float
+) -> dict:
+    """Measure one pathology over its sizes and return its benchmark entry."""
+    points = []
+    for size, path in files:
+        result = run_measured(format_command(command_template, path), timeout)
+        outcome = classify(result.exit_code, result.stderr)
+        size_bytes = path.stat().st_size
+        points.append(
+            {
+                "size": size,
+                "size_bytes": size_bytes,
+                "time_ms": result.duration_ms,
+                "peak_rss_mb": result.peak_rss_mb,
+                "outcome": outcome,
+            }
+        )
+        print(
+            f"{pathology.benchmark_id} {pathology.name} n={size}: {outcome}, "
+            f"{result.duration_ms:.0f} ms, {result.peak_rss_mb or 0:.1f} MB",
+            file=sys.stderr,
+        )
+        if outcome in ("timeout", "crashed"):
+            break
+        # security/limits/memory.md asks for less than 10x the file size.
+        points[-1]["memory_per_input_byte"] = result.peak_rss_mb * 1024 * 1024 / size_bytes
+
+    results: dict = {"unit": pathology.unit, "limit": pathology.limit, "points": points}
+    measured = [p for p in points if p["outcome"] in ("accepted", "rejected")]
+    if len(measured) >= 2:
+        sizes = [p["size"] for p in measured]
+        results["time_exponent"] = round(
+            fit_exponent(sizes, [p["time_ms"] for p in measured]).exponent, 4
+        )
+        results["memory_exponent"] = round(
+            fit_exponent(sizes, [p["peak_rss_mb"] for p in measured]).exponent, 4
+        )
+    failed = any(p["outcome"] in ("timeout", "crashed") for p in points)
+    return benchmark_result(
+        pathology.benchmark_id,
+        pathology.name,
+        {"sizes": [p["size"] for p in points]},
+        {"timeout_seconds": timeout},
+        results,
+        status="failed" if failed else "passed",
+    )
+
+
+def _select(names: list[str] | None) -> list[Pathology]:
+    if not names:
+        return PATHOLOGIES
+    known = {p.name: p for p in PATHOLOGIES}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise SystemExit(f"Error: Unknown pathology: {', '.join(unknown)}")
+    return [known[name] for name in names]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``adversarial`` subcommand options."""
+    parser.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    parser.add_argument(
+        "--pathology",
+        action="append",
+        help=f"Run only this pathology (repeatable): {', '.join(p.name for p in PATHOLOGIES)}",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=64 * 1024 * 1024,
+        help="Skip inputs larger than this many bytes (default: 64 MiB)",
+    )
+    parser.add_argument(
+        "--generate-only",
+        action="store_true",
+        help="Write the input files and exit without running anything",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Per-input timeout in seconds (default: 60)"
+    )
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+
+
+def run(args: argparse.Namespace) -> int:
+    """Generate the adversarial inputs and measure an implementation on them."""
+    pathologies = _select(args.pathology)
+    inputs = write_inputs(args.workdir / "adversarial", pathologies, args.max_bytes)
+    if args.generate_only:
+        for files in inputs.values():
+            for _size, path in files:
+                print(path)
+        return 0
+
+    impl_config = load_implementations().get(args.impl)
+    if impl_config is None:
+        raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+    template = impl_config["commands"]["parse"]
+
+    benchmarks = [
+        run_pathology(pathology, inputs[pathology.name], template, args.timeout)
+        for pathology in pathologies
+    ]
+    document = suite_result(implementation_info(args.impl, impl_config), benchmarks)
+    write_results(document, args.output)
+    return 0 if document["summary"]["failed"] == 0 else 1
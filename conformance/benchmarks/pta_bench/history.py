@@ -0,0 +1,310 @@
+"""Benchmark history store and regression gate.
+
+Result documents are recorded in a local SQLite database keyed by
+implementation, version and machine fingerprint. ``compare`` tests each
+metric of a candidate run against a baseline run with a one-sided
+Mann-Whitney U test on the raw iteration samples, and flags a regression
+only when the change for the worse is both statistically significant and
+larger than the configured threshold. Times and sizes get worse as they
+grow; rates (units ending in ``_per_second``) get worse as they shrink. The exit status is non-zero when any metric
+regresses, so the command can gate merges.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from .ledgers import DEFAULT_WORKDIR
+from .results import machine_fingerprint
+from .stats import mann_whitney_greater
+
+DEFAULT_DB = DEFAULT_WORKDIR / "history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    implementation TEXT NOT NULL,
+    version TEXT,
+    machine TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (implementation, version, machine);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    benchmark_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    median REAL,
+    samples TEXT NOT NULL,
+    PRIMARY KEY (run_id, benchmark_id, metric)
+);
+"""
+
+
+@dataclass
+class Comparison:
+    """Outcome of comparing one metric between two runs."""
+
+    benchmark_id: str
+    metric: str
+    baseline_median: float
+    candidate_median: float
+    change_pct: float
+    p_value: float
+    regression: bool
+    higher_is_better: bool = False
+
+
+def _digest(document: dict) -> str:
+    """Return a content hash identifying a result document."""
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+
+def iter_metrics(document: dict):
+    """Yield (benchmark_id, metric, samples) for every sampled metric.
+
+    A metric is any entry of a benchmark's ``results`` that carries raw
+    ``samples`` (``time``, ``cold``, ``load``, ...).
+    """
+    for benchmark in document.get("benchmarks", []):
+        for metric, value in (benchmark.get("results") or {}).items():
+            if isinstance(value, dict) and value.get("samples"):
+                yield benchmark["benchmark_id"], metric, value["samples"]
+
+
+def higher_is_better(unit: str | None) -> bool:
+    """Return whether a metric in ``unit`` improves as it grows."""
+    return bool(unit) and unit.endswith("_per_second")
+
+
+def metric_units(document: dict) -> dict[tuple[str, str], str | None]:
+    """Return the unit of every sampled metric, keyed by (benchmark_id, metric)."""
+    return {
+        (benchmark["benchmark_id"], metric): value.get("unit")
+        for benchmark in document.get("benchmarks", [])
+        for metric, value in (benchmark.get("results") or {}).items()
+        if isinstance(value, dict) and value.get("samples")
+    }
+
+
+class HistoryStore:
+    """SQLite-backed store of benchmark result documents."""
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, document: dict) -> int | None:
+        """Store a result document; returns the run id, or None if already stored."""
+        implementation = document.get("implementation", {})
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO runs"
+                " (implementation, version, machine, timestamp, digest, document)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    implementation.get("name", "unknown"),
+                    implementation.get("version"),
+                    machine_fingerprint(document.get("environment", {})),
+                    document.get("timestamp", ""),
+                    _digest(document),
+                    json.dumps(document, sort_keys=True),
+                ),
+            )
+            if cursor.rowcount == 0:
+                return None
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO measurements VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, benchmark_id, metric, statistics.median(samples), json.dumps(samples))
+                    for benchmark_id, metric, samples in iter_metrics(document)
+                ],
+            )
+        return run_id
+
+    def runs(self, implementation: str | None = None) -> list[tuple]:
+        """List (id, implementation, version, machine, timestamp), newest first."""
+        query = "SELECT id, implementation, version, machine, timestamp FROM runs"
+        params: tuple = ()
+        if implementation:
+            query += " WHERE implementation = ?"
+            params = (implementation,)
+        return self.conn.execute(query + " ORDER BY timestamp DESC, id DESC", params).fetchall()
+
+    def document(self, run_id: int) -> dict:
+        """Return the stored document of a run."""
+        row = self.conn.execute("SELECT document FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        return json.loads(row[0])
+
+    def find_baseline(self, candidate: dict, version: str | None = None) -> dict | None:
+        """Find the newest stored run of the same implementation and machine.
+
+        Only runs that measured at least one of the candidate's benchmarks
+        qualify, and a stored copy of the candidate itself is skipped. With
+        ``version``, only runs of that version are considered.
+        """
+        implementation = candidate.get("implementation", {}).get("name", "unknown")
+        machine = machine_fingerprint(candidate.get("environment", {}))
+        query = "SELECT document, digest FROM runs WHERE implementation = ? AND machine = ?"
+        params: tuple = (implementation, machine)
+        if version is not None:
+            query += " AND version = ?"
+            params += (version,)
+        query += " ORDER BY timestamp DESC, id DESC"
+        candidate_digest = _digest(candidate)
+        wanted = {(b, m) for b, m, _ in iter_metrics(candidate)}
+        for document, digest in self.conn.execute(query, params):
+            if digest == candidate_digest:
+                continue
+            stored = json.loads(document)
+            if wanted & {(b, m) for b, m, _ in iter_metrics(stored)}:
+                return stored
+        return None
+
+
+def compare(
+    baseline: dict,
+    candidate: dict,
+    threshold_pct: float = 5.0,
+    alpha: float = 0.05,
+) -> list[Comparison]:
+    """Compare every metric present in both documents.
+
+    A metric regresses when the candidate is worse with p < ``alpha`` and its
+    median moved the wrong way by more than ``threshold_pct`` percent: up for
+    times and sizes, down for rates.
+    """
+    baseline_metrics = {(b, m): s for b, m, s in iter_metrics(baseline)}
+    units = metric_units(candidate)
+    comparisons = []
+    for benchmark_id, metric, samples in iter_metrics(candidate):
+        reference = baseline_metrics.get((benchmark_id, metric))
+        if not reference:
+            continue
+        baseline_median = statistics.median(reference)
+        candidate_median = statistics.median(samples)
+        change_pct = (
+            (candidate_median - baseline_median) / baseline_median * 100 if baseline_median else 0.0
+        )
+        higher = higher_is_better(units[benchmark_id, metric])
+        if higher:
+            p_value = mann_whitney_greater(reference, samples)
+            worse_pct = -change_pct
+        else:
+            p_value = mann_whitney_greater(samples, reference)
+            worse_pct = change_pct
+        comparisons.append(
+            Comparison(
+                benchmark_id=benchmark_id,
+                metric=metric,
+                baseline_median=baseline_median,
+                candidate_median=candidate_median,
+                change_pct=change_pct,
+                p_value=p_value,
+                regression=p_value < alpha and worse_pct > threshold_pct,
+                higher_is_better=higher,
+            )
+        )
+    return comparisons
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``history`` subcommand options."""
+    parser.add_argument(
+        "--db", type=Path, default=DEFAULT_DB, help=f"History database (default: {DEFAULT_DB})"
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    record = actions.add_parser("record", help="Store result documents")
+    record.add_argument("results", type=Path, nargs="+", help="Result JSON files")
+
+    listing = actions.add_parser("list", help="List stored runs")
+    listing.add_argument("--impl", help="Only runs of this implementation")
+
+    comparison = actions.add_parser("compare", help="Check a result against a baseline")
+    comparison.add_argument("results", type=Path, help="Candidate result JSON")
+    baseline = comparison.add_mutually_exclusive_group()
+    baseline.add_argument("--baseline", type=Path, help="Baseline result JSON file")
+    baseline.add_argument(
+        "--baseline-version", help="Compare with the newest stored run of this version"
+    )
+    comparison.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Minimum median change for the worse in percent to count as a regression"
+        " (default: 5)",
+    )
+    comparison.add_argument(
+        "--alpha", type=float, default=0.05, help="Significance level (default: 0.05)"
+    )
+    comparison.add_argument(
+        "--record", action="store_true", help="Also store the candidate after comparing"
+    )
+
+
+def _print_comparisons(comparisons: list[Comparison]) -> None:
+    print(
+        f"{'Benchmark':<10} {'Metric':<10} {'Baseline':>12} {'Candidate':>12} {'Change':>9} {'p':>8}"
+    )
+    for c in comparisons:
+        marker = "  REGRESSION" if c.regression else ""
+        print(
+            f"{c.benchmark_id:<10} {c.metric:<10} {c.baseline_median:>12.3f} "
+            f"{c.candidate_median:>12.3f} {c.change_pct:>+8.1f}% {c.p_value:>8.4f}{marker}"
+        )
+
+
+def run(args: argparse.Namespace) -> int:
+    """Record, list or compare benchmark runs."""
+    store = HistoryStore(args.db)
+    try:
+        if args.action == "record":
+            for path in args.results:
+                run_id = store.record(json.loads(path.read_text()))
+                status = f"recorded as run {run_id}" if run_id else "already recorded"
+                print(f"{path}: {status}")
+            return 0
+
+        if args.action == "list":
+            for run_id, implementation, version, machine, timestamp in store.runs(args.impl):
+                print(f"{run_id:>5}  {timestamp}  {implementation} {version or '-'}  [{machine}]")
+            return 0
+
+        candidate = json.loads(args.results.read_text())
+        if args.baseline:
+            baseline = json.loads(args.baseline.read_text())
+        else:
+            baseline = store.find_baseline(candidate, args.baseline_version)
+        if baseline is None:
+            print("No baseline found for this implementation and machine", file=sys.stderr)
+            return 2
+
+        comparisons = compare(baseline, candidate, args.threshold, args.alpha)
+        _print_comparisons(comparisons)
+        if args.record:
+            store.record(candidate)
+        regressions = [c for c in comparisons if c.regression]
+        if regressions:
+            print(
+                f"\n{len(regressions)} regression(s) above {args.threshold:g}% (alpha={args.alpha:g})"
+            )
+            return 1
+        return 0
+    finally:
+        store.close()
@@ -0,0 +1,39 @@
+"""Implementation commands, shared with the differential test configuration."""
+
+from __future__ import annotations
+
+import json
+import shlex
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DIFFERENTIAL_CONFIG = REPO_ROOT / "tests" / "differential" / "config.json"
+
+
+def load_implementations(path: Path = DIFFERENTIAL_CONFIG) -> dict[str, dict]:
+    """Load the ``implementations`` section of the differential config."""
+    with open(path) as f:
+        return json.load(f).get("implementations", {})
+
+
+def format_command(template: str, file: Path, **kwargs: str) -> str:
+    """Fill in a command template such as ``rledger query {file} '{query}'``."""
+    return template.format(file=shlex.quote(str(file)), **kwargs)
+
+
+def implementation_info(name: str, impl_config: dict) -> dict:
+    """Return the ``implementation`` section of a suite result."""
+    version = None
+    version_command = impl_config.get("version_command")
+    if version_command:
+        try:
+            result = subprocess.run(
+                version_command, shell=True, capture_output=True, text=True, timeout=30
+            )
+            output = (result.stdout or result.stderr).strip()
+            if result.returncode == 0 and output:
+                version = output.splitlines()[0]
+        except subprocess.TimeoutExpired:
+            pass
+    return {"name": name, "version": version, "commit": None}
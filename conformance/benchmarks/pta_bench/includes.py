@@ -0,0 +1,262 @@
+"""Include-resolution benchmarks B401-B403 over generated include trees.
+
+Every size is generated twice from the same seed: as one file and as a tree
+of files written by ``generate-benchmark.py --tree`` (per-year and
+per-account files below nested index files, plus shared declaration and
+price files). Both hold the same directives, prices included. A third
+variant repeats the include of the shared price file from every year, which
+exercises deduplication of repeated includes.
+
+- ``B401`` include-load: total load time, single file vs. tree
+- ``B402`` include-resolution: time spent resolving includes outside the
+  parser itself (reference implementation only)
+- ``B403`` include-dedup: load time of the tree with repeated includes
+
+Command-line implementations are timed through their configured ``parse``
+command, so only total load times are available for them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import DEFAULT_WORKDIR, generate_ledger, input_info, tree_ledger
+from .results import benchmark_result, suite_result, write_results
+from .runner import MeasureConfig, add_measure_arguments, measure, run_command
+from .stats import summarize
+
+VARIANTS = ("single", "tree", "repeat")
+
+# include directives as written by the generator, quoted (beancount) or not
+_INCLUDE_RE = re.compile(r'^include\s+"?([^"\n]+?)"?\s*$', re.MULTILINE)
+
+
+def variant_paths(size: int, workdir: Path, fan_out: int, depth: int) -> dict[str, Path]:
+    """Generate (or reuse) the three variants of one size."""
+    single = generate_ledger(
+        workdir / f"single-{size}.beancount",
+        *("--transactions", str(size), "--accounts", "100", "--commodities", "5", "--prices"),
+    )
+    return {
+        "single": single,
+        "tree": tree_ledger(size, workdir, fan_out, depth),
+        "repeat": tree_ledger(size, workdir, fan_out, depth, repeat_includes=True),
+    }
+
+
+def loaded_files(path: Path) -> int:
+    """Count the files loading ``path`` reads, following its include directives.
+
+    The trees are generated in a subprocess and cached, so the files that
+    ``write_include_tree`` wrote are recovered from the directives linking them;
+    a file included several times is counted once.
+    """
+    seen: set[Path] = set()
+    pending = [path.resolve()]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for name in _INCLUDE_RE.findall(current.read_text()):
+            pending.append((current.parent / name).resolve())
+    return len(seen)
+
+
+@contextmanager
+def _timed_parsing(totals: dict[str, float]):
+    """Accumulate time spent in the loader's recursive parse and in the parser.
+
+    The loader looks both functions up at call time, so wrapping the module
+    attributes is enough; the originals are restored on exit.
+    """
+    from beancount import loader
+    from beancount.parser import parser
+
+    parse_recursive = loader._parse_recursive
+    parse_file = parser.parse_file
+
+    def wrap(fn, key):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                totals[key] += (time.perf_counter() - start) * 1000
+
+        return timed
+
+    loader._parse_recursive = wrap(parse_recursive, "parse")
+    parser.parse_file = wrap(parse_file, "parser")
+    try:
+        yield
+    finally:
+        loader._parse_recursive = parse_recursive
+        parser.parse_file = parse_file
+
+
+def bench_beancount(path: Path, config: MeasureConfig, label: str = "load") -> dict:
+    """Measure the reference loader on one variant."""
+    from beancount import loader
+
+    loader.initialize(use_cache=False)
+    runs: list[dict] = []
+
+    def load(_):
+        totals = {"parse": 0.0, "parser": 0.0}
+        with _timed_parsing(totals):
+            entries, errors, options = loader.load_file(str(path))
+        totals["files"] = len(options["include"])
+        totals["duplicates"] = sum("Duplicate filename" in e.message for e in errors)
+        runs.append(totals)
+        return entries
+
+    samples = measure(load, config, label=label)
+    # Keep the details of the measured iterations only, not the warm-up.
+    runs = runs[-len(samples) :]
+    return {
+        "time": summarize(samples),
+        "resolution": summarize([run["parse"] - run["parser"] for run in runs]),
+        "files": runs[-1]["files"],
+        "duplicates": runs[-1]["duplicates"],
+    }
+
+
+def bench_command(impl_config: dict, path: Path, config: MeasureConfig) -> dict:
+    """Measure an implementation's ``parse`` command on one variant."""
+    command = format_command(impl_config["commands"]["parse"], path)
+    exit_codes: set[int] = set()
+
+    def invoke(_):
+        exit_codes.add(run_command(command, timeout=config.timeout_seconds).exit_code)
+
+    samples = measure(invoke, config)
+    return {
+        "time": summarize(samples),
+        "files": loaded_files(path),
+        "exit_codes": sorted(exit_codes),
+    }
+
+
+def _point(size: int, variants: dict[str, dict]) -> dict:
+    """Summarise one size for B401 (single vs. tree overhead)."""
+    single = variants["single"]["time"]["median"]
+    tree = variants["tree"]["time"]["median"]
+    files = variants["tree"]["files"]
+    return {
+        "size": size,
+        "files": files,
+        "single_ms": single,
+        "tree_ms": tree,
+        "overhead_ms": tree - single,
+        "overhead_per_file_ms": (tree - single) / files,
+        "single": variants["single"]["time"],
+        "tree": variants["tree"]["time"],
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``includes`` subcommand options."""
+    parser.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[1000, 4000, 16000],
+        help="Comma-separated transaction counts (default: 1000,4000,16000)",
+    )
+    parser.add_argument(
+        "--fan-out", type=int, default=4, help="Maximum includes per index file (default: 4)"
+    )
+    parser.add_argument(
+        "--depth", type=int, default=2, help="Levels of index files per year (default: 2)"
+    )
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+    add_measure_arguments(parser)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the include benchmarks over all sizes and write the suite result."""
+    impl_config = load_implementations().get(args.impl)
+    if impl_config is None and args.impl != "beancount":
+        raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+    impl_config = impl_config or {}
+    config = MeasureConfig.from_args(args)
+
+    measured: list[tuple[int, dict[str, Path], dict[str, dict]]] = []
+    for size in args.sizes:
+        paths = variant_paths(size, args.workdir, args.fan_out, args.depth)
+        if args.impl == "beancount":
+            variants = {
+                name: bench_beancount(paths[name], config, label=f"{name}-{size}")
+                for name in VARIANTS
+            }
+        else:
+            variants = {name: bench_command(impl_config, paths[name], config) for name in VARIANTS}
+        measured.append((size, paths, variants))
+
+    configuration = {**config.as_dict(), "fan_out": args.fan_out, "depth": args.depth}
+    inputs = {"sizes": args.sizes, "files": [input_info(p["single"]) for _, p, _ in measured]}
+
+    benchmarks = [
+        benchmark_result(
+            "B401",
+            "include-load",
+            inputs,
+            configuration,
+            {"points": [_point(size, variants) for size, _, variants in measured]},
+        )
+    ]
+    if args.impl == "beancount":
+        benchmarks.append(
+            benchmark_result(
+                "B402",
+                "include-resolution",
+                inputs,
+                configuration,
+                {
+                    "points": [
+                        {
+                            "size": size,
+                            "files": variants["tree"]["files"],
+                            "single": variants["single"]["resolution"],
+                            "tree": variants["tree"]["resolution"],
+                        }
+                        for size, _, variants in measured
+                    ]
+                },
+            )
+        )
+    benchmarks.append(
+        benchmark_result(
+            "B403",
+            "include-dedup",
+            inputs,
+            configuration,
+            {
+                "points": [
+                    {
+                        "size": size,
+                        "tree": variants["tree"]["time"],
+                        "repeat": variants["repeat"]["time"],
+                        "duplicates": variants["repeat"].get("duplicates"),
+                        "exit_codes": variants["repeat"].get("exit_codes"),
+                    }
+                    for size, _, variants in measured
+                ]
+            },
+        )
+    )
+
+    document = suite_result(implementation_info(args.impl, impl_config), benchmarks)
+    write_results(document, args.output)
+    return 0
@@ -0,0 +1,520 @@
+"""Incremental edit benchmarks B201 (incremental-add) and B202 (incremental-reparse).
+
+``generate`` turns a ledger into a reproducible edit script: appended
+transactions, amount edits in the middle of the file, deleted postings and
+account renames. Each edit is a list of LSP ``TextDocumentContentChangeEvent``
+objects with whole-line ranges, applied in order, so the same script can be
+replayed against a command-line implementation (which reparses the file),
+the reference loader in-process, or a language server via ``didChange``.
+
+``run`` replays a script and records the latency of every edit: for
+commands and the reference loader, the time to reload the edited file; for
+language servers, the time from ``didChange`` until the matching
+``publishDiagnostics``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import DEFAULT_WORKDIR, input_info, preset_ledger
+from .lsp import SYNC_FULL, SYNC_NONE, LspClient, LspError
+from .results import benchmark_result, suite_result, write_results
+from .runner import run_command, time_call
+from .stats import summarize
+
+EDIT_KINDS = ["append", "amount", "delete-posting", "rename-account"]
+DEFAULT_MIX = {"append": 4, "amount": 3, "delete-posting": 2, "rename-account": 1}
+
+SCRIPT_VERSION = 1
+
+_TXN_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}) [*!]")
+_OPEN_RE = re.compile(r"^\d{4}-\d{2}-\d{2} open (\S+)")
+_POSTING_RE = re.compile(
+    r"^\s+[*!]?\s*([A-Z][A-Za-z0-9-]*(?::[A-Za-z0-9][A-Za-z0-9-]*)+)"
+    r"(?:\s{2,}(-?[0-9][0-9.,]*)\s+([A-Z][A-Z0-9'._-]*))?"
+)
+
+
+@dataclass
+class Edit:
+    """One step of an edit script: changes sent together in one didChange."""
+
+    kind: str
+    description: str
+    changes: list[dict]
+
+
+@dataclass
+class _Posting:
+    line: int
+    account: str
+    number: str | None
+
+
+@dataclass
+class _Transaction:
+    date: str
+    start: int
+    postings: list[_Posting]
+
+
+def _line_range(start: int, end: int) -> dict:
+    """Return an LSP range covering lines ``start`` up to (excluding) ``end``."""
+    return {
+        "start": {"line": start, "character": 0},
+        "end": {"line": end, "character": 0},
+    }
+
+
+def _offset(line_starts: list[int], text: str, position: dict) -> int:
+    """Convert an LSP position to an offset in ``text``."""
+    line = position["line"]
+    if line >= len(line_starts):
+        return len(text)
+    return min(line_starts[line] + position["character"], len(text))
+
+
+def apply_changes(text: str, changes: list[dict]) -> str:
+    """Apply LSP content changes to ``text`` in order."""
+    for change in changes:
+        if "range" not in change:
+            text = change["text"]
+            continue
+        line_starts = [0]
+        line_starts.extend(m.end() for m in re.finditer("\n", text))
+        start = _offset(line_starts, text, change["range"]["start"])
+        end = _offset(line_starts, text, change["range"]["end"])
+        text = text[:start] + change["text"] + text[end:]
+    return text
+
+
+def _scan(lines: list[str]) -> tuple[list[_Transaction], list[str]]:
+    """Find transactions (with their postings) and opened accounts."""
+    transactions: list[_Transaction] = []
+    opened: list[str] = []
+    current: _Transaction | None = None
+    for index, line in enumerate(lines):
+        if match := _TXN_RE.match(line):
+            current = _Transaction(match.group(1), index, [])
+            transactions.append(current)
+            continue
+        if current is not None and line[:1] in (" ", "\t"):
+            if match := _POSTING_RE.match(line):
+                current.postings.append(_Posting(index, match.group(1), match.group(2)))
+            continue
+        current = None
+        if match := _OPEN_RE.match(line):
+            opened.append(match.group(1))
+    return transactions, opened
+
+
+class EditScriptGenerator:
+    """Generate edits against an evolving copy of a ledger."""
+
+    def __init__(self, text: str, seed: int):
+        self.text = text
+        self.rng = random.Random(seed)
+        self.count = 0
+
+    def _append(self, transactions: list[_Transaction], opened: list[str]) -> Edit | None:
+        expenses = [a for a in opened if a.startswith("Expenses:")]
+        assets = [a for a in opened if a.startswith("Assets:")]
+        if len(expenses) < 2 or not assets:
+            return None
+        date = transactions[-1].date if transactions else "2020-01-01"
+        first, second = self.rng.sample(expenses, 2)
+        asset = self.rng.choice(assets)
+        lines = self.text.splitlines(keepends=True)
+        prefix = "\n" if lines and not lines[-1].endswith("\n") else ""
+        new_text = (
+            f'{prefix}\n{date} * "Incremental" "Appended transaction {self.count}"\n'
+            f"  {first}  {self.rng.uniform(1, 200):.2f} USD\n"
+            f"  {second}  {self.rng.uniform(1, 200):.2f} USD\n"
+            f"  {asset}\n"
+        )
+        return Edit(
+            "append",
+            f"Append a 3-posting transaction dated {date}",
+            [{"range": _line_range(len(lines), len(lines)), "text": new_text}],
+        )
+
+    def _amount(self, transactions: list[_Transaction], lines: list[str]) -> Edit | None:
+        middle = transactions[len(transactions) // 3 : 2 * len(transactions) // 3]
+        candidates = [p for t in middle for p in t.postings if p.number is not None]
+        if not candidates:
+            return None
+        posting = self.rng.choice(candidates)
+        line = lines[posting.line]
+        match = _POSTING_RE.match(line)
+        assert match is not None
+        new_number = f"{self.rng.uniform(1, 500):.2f}"
+        new_line = line[: match.start(2)] + new_number + line[match.end(2) :]
+        return Edit(
+            "amount",
+            f"Change {posting.account} amount on line {posting.line + 1}",
+            [{"range": _line_range(posting.line, posting.line + 1), "text": new_line}],
+        )
+
+    def _delete_posting(self, transactions: list[_Transaction]) -> Edit | None:
+        # Only delete from transactions that still balance afterwards: at
+        # least two explicit amounts and one elided posting to absorb it.
+        candidates = [
+            t
+            for t in transactions
+            if sum(p.number is not None for p in t.postings) >= 2
+            and any(p.number is None for p in t.postings)
+        ]
+        if not candidates:
+            return None
+        transaction = self.rng.choice(candidates)
+        posting = self.rng.choice([p for p in transaction.postings if p.number is not None])
+        return Edit(
+            "delete-posting",
+            f"Delete {posting.account} posting on line {posting.line + 1}",
+            [{"range": _line_range(posting.line, posting.line + 1), "text": ""}],
+        )
+
+    def _rename_account(self, lines: list[str], opened: list[str]) -> Edit | None:
+        leaves = [a for a in opened if not any(o.startswith(a + ":") for o in opened)]
+        if not leaves:
+            return None
+        account = self.rng.choice(leaves)
+        new_account = f"{account}Renamed{self.count}"
+        token = re.compile(rf"(?<=\s){re.escape(account)}(?=\s|$)")
+        changes = []
+        # Bottom-up so that every range is still valid when applied in order.
+        for index in range(len(lines) - 1, -1, -1):
+            if account in lines[index] and token.search(lines[index]):
+                changes.append(
+                    {
+                        "range": _line_range(index, index + 1),
+                        "text": token.sub(new_account, lines[index]),
+                    }
+                )
+        return Edit("rename-account", f"Rename {account} to {new_account}", changes)
+
+    def next_edit(self, kind: str) -> Edit:
+        """Generate an edit of ``kind``, falling back to an append."""
+        lines = self.text.splitlines(keepends=True)
+        transactions, opened = _scan(lines)
+        edit = None
+        if kind == "amount":
+            edit = self._amount(transactions, lines)
+        elif kind == "delete-posting":
+            edit = self._delete_posting(transactions)
+        elif kind == "rename-account":
+            edit = self._rename_account(lines, opened)
+        if edit is None:
+            edit = self._append(transactions, opened)
+        if edit is None:
+            raise ValueError("Ledger has no Expenses/Assets accounts to edit")
+        self.text = apply_changes(self.text, edit.changes)
+        self.count += 1
+        return edit
+
+
+def generate_edit_script(
+    source: Path,
+    edits: int,
+    seed: int,
+    mix: dict[str, int] | None = None,
+) -> dict:
+    """Generate a reproducible edit script for ``source``."""
+    mix = mix or DEFAULT_MIX
+    data = source.read_bytes()
+    generator = EditScriptGenerator(data.decode("utf-8"), seed)
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    # The first edit is always an append so later deletions have candidates.
+    steps = [generator.next_edit("append")] if edits else []
+    while len(steps) < edits:
+        steps.append(generator.next_edit(generator.rng.choices(kinds, weights)[0]))
+    return {
+        "version": SCRIPT_VERSION,
+        "source": str(source),
+        "source_sha256": hashlib.sha256(data).hexdigest(),
+        "seed": seed,
+        "edits": [asdict(step) for step in steps],
+    }
+
+
+class CommandTarget:
+    """Reparse the edited file with an implementation's ``parse`` command."""
+
+    def __init__(self, impl_config: dict, timeout: float):
+        self.template = impl_config["commands"]["parse"]
+        self.timeout = timeout
+
+    def open(self, path: Path, text: str) -> tuple[float, bool]:
+        return self.apply(path, text, [], 0)
+
+    def apply(self, path: Path, text: str, changes: list[dict], version: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        path.write_text(text)
+        result = run_command(format_command(self.template, path), timeout=self.timeout)
+        return (time.perf_counter() - start) * 1000, result.success
+
+    def close(self) -> None:
+        pass
+
+
+class BeancountTarget:
+    """Reload the edited file with the reference loader, in-process."""
+
+    def __init__(self):
+        from beancount import loader
+
+        loader.initialize(use_cache=False)
+        self.loader = loader
+
+    def open(self, path: Path, text: str) -> tuple[float, bool]:
+        return self.apply(path, text, [], 0)
+
+    def apply(self, path: Path, text: str, changes: list[dict], version: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        path.write_text(text)
+        _entries, errors, _options = self.loader.load_file(str(path))
+        return (time.perf_counter() - start) * 1000, not errors
+
+    def close(self) -> None:
+        pass
+
+
+class LspTarget:
+    """Send edits to a language server and wait for its diagnostics."""
+
+    def __init__(self, command: str, timeout: float):
+        self.client = LspClient(command, timeout=timeout)
+        self.initialized = False
+        self.uri = ""
+
+    def open(self, path: Path, text: str) -> tuple[float, bool]:
+        path.write_text(text)
+        self.uri = path.resolve().as_uri()
+        if not self.initialized:
+            self.client.initialize(path.parent)
+            self.initialized = True
+            if self.client.sync_kind == SYNC_NONE:
+                raise LspError("The language server does not accept document changes")
+        sent = time.perf_counter()
+        elapsed, _ = time_call(
+            lambda: (
+                self.client.notify(
+                    "textDocument/didOpen",
+                    {
+                        "textDocument": {
+                            "uri": self.uri,
+                            "languageId": "beancount",
+                            "version": 0,
+                            "text": text,
+                        }
+                    },
+                ),
+                self.client.wait_for_diagnostics(self.uri, 0, sent),
+            )
+        )
+        return elapsed, True
+
+    def apply(self, path: Path, text: str, changes: list[dict], version: int) -> tuple[float, bool]:
+        if self.client.sync_kind == SYNC_FULL:
+            changes = [{"text": text}]
+        params = {"textDocument": {"uri": self.uri, "version": version}, "contentChanges": changes}
+        sent = time.perf_counter()
+        try:
+            elapsed, _ = time_call(
+                lambda: (
+                    self.client.notify("textDocument/didChange", params),
+                    self.client.wait_for_diagnostics(self.uri, version, sent),
+                )
+            )
+        except LspError:
+            return self.client.timeout * 1000, False
+        return elapsed, True
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def replay(script: dict, source: Path, target, rounds: int = 1) -> tuple[list[float], list[dict]]:
+    """Replay ``script`` against ``target`` ``rounds`` times.
+
+    Returns (initial load times, per-edit timings).
+    """
+    initial: list[float] = []
+    timings: list[dict] = []
+    original = source.read_text()
+    with tempfile.TemporaryDirectory(prefix="pta-incremental-") as tmp:
+        for round_index in range(rounds):
+            path = Path(tmp) / f"round{round_index}{source.suffix}"
+            text = original
+            elapsed, _ = target.open(path, text)
+            initial.append(elapsed)
+            for version, edit in enumerate(script["edits"], 1):
+                text = apply_changes(text, edit["changes"])
+                elapsed, ok = target.apply(path, text, edit["changes"], version)
+                timings.append(
+                    {
+                        "round": round_index,
+                        "index": version - 1,
+                        "kind": edit["kind"],
+                        "latency_ms": round(elapsed, 4),
+                        "ok": ok,
+                    }
+                )
+            if round_index < rounds - 1 and isinstance(target, LspTarget):
+                target.client.notify("textDocument/didClose", {"textDocument": {"uri": target.uri}})
+    return initial, timings
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    """Parse ``append=4,amount=3`` into a weight mapping."""
+    mix = {}
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in EDIT_KINDS:
+            raise argparse.ArgumentTypeError(f"unknown edit kind: {kind}")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``incremental`` subcommand options."""
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    generate = actions.add_parser("generate", help="Generate an edit script for a ledger")
+    generate.add_argument("--file", type=Path, help="Ledger to edit (default: preset ledger)")
+    generate.add_argument(
+        "--preset",
+        choices=["small", "medium", "large", "huge"],
+        default="medium",
+        help="Generated ledger to use when --file is not given (default: medium)",
+    )
+    generate.add_argument(
+        "--profile",
+        type=Path,
+        help="Distribution profile for generated ledgers, e.g. profiles/household.json",
+    )
+    generate.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    generate.add_argument("--edits", "-n", type=int, default=50, help="Number of edits")
+    generate.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    generate.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default=DEFAULT_MIX,
+        help="Edit kind weights, e.g. append=4,amount=3,delete-posting=2,rename-account=1",
+    )
+    generate.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+
+    replay_parser = actions.add_parser("run", help="Replay an edit script and time each edit")
+    replay_parser.add_argument("--script", type=Path, required=True, help="Edit script JSON")
+    replay_parser.add_argument(
+        "--file", type=Path, help="Ledger the script was generated from (default: as recorded)"
+    )
+    target = replay_parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    target.add_argument("--lsp", metavar="COMMAND", help="Language server command to drive")
+    replay_parser.add_argument(
+        "--rounds", type=int, default=1, help="Times to replay the script (default: 1)"
+    )
+    replay_parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Per-edit timeout in seconds (default: 60)"
+    )
+    replay_parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+
+
+def _run_generate(args: argparse.Namespace) -> int:
+    source = args.file or preset_ledger(args.preset, args.workdir, profile=args.profile)
+    script = generate_edit_script(source, args.edits, args.seed, args.mix)
+    text = json.dumps(script, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(text)
+        print(f"Generated {args.output} ({len(script['edits'])} edits)")
+    else:
+        print(text, end="")
+    return 0
+
+
+def _run_replay(args: argparse.Namespace) -> int:
+    script = json.loads(args.script.read_text())
+    source = args.file or Path(script["source"])
+    if hashlib.sha256(source.read_bytes()).hexdigest() != script["source_sha256"]:
+        raise SystemExit(f"Error: {source} does not match the ledger the script was generated from")
+
+    if args.lsp:
+        target = LspTarget(args.lsp, args.timeout)
+        implementation = {"name": args.lsp, "version": None, "commit": None}
+    elif args.impl == "beancount":
+        target = BeancountTarget()
+        implementation = implementation_info("beancount", load_implementations()["beancount"])
+    else:
+        impl_config = load_implementations().get(args.impl)
+        if impl_config is None:
+            raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+        target = CommandTarget(impl_config, args.timeout)
+        implementation = implementation_info(args.impl, impl_config)
+
+    try:
+        initial, timings = replay(script, source, target, args.rounds)
+    except LspError as e:
+        raise SystemExit(f"Error: {e}") from e
+    finally:
+        target.close()
+
+    configuration = {
+        "edit_script": args.script.name,
+        "edits": len(script["edits"]),
+        "rounds": args.rounds,
+        "mode": "lsp" if args.lsp else "reload",
+    }
+    benchmarks = []
+    groups = [
+        ("B201", "incremental-add", lambda t: t["kind"] == "append"),
+        ("B202", "incremental-reparse", lambda t: t["kind"] != "append"),
+    ]
+    for benchmark_id, name, selected in groups:
+        group = [t for t in timings if selected(t)]
+        by_kind = {}
+        for kind in EDIT_KINDS:
+            samples = [t["latency_ms"] for t in group if t["kind"] == kind]
+            if samples:
+                by_kind[kind] = summarize(samples)
+        benchmarks.append(
+            benchmark_result(
+                benchmark_id,
+                name,
+                input_info(source),
+                configuration,
+                {
+                    "time": summarize([t["latency_ms"] for t in group]),
+                    "initial_load": summarize(initial),
+                    "by_kind": by_kind,
+                    "edits": group,
+                },
+                status="passed" if all(t["ok"] for t in group) else "failed",
+            )
+        )
+
+    document = suite_result(implementation, benchmarks)
+    write_results(document, args.output)
+    return 0 if document["summary"]["failed"] == 0 else 1
+
+
+def run(args: argparse.Namespace) -> int:
+    """Generate or replay an edit script."""
+    if args.action == "generate":
+        return _run_generate(args)
+    return _run_replay(args)
@@ -0,0 +1,101 @@
+"""Generate and describe benchmark input ledgers."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent
+GENERATOR = BENCHMARKS_DIR / "generate-benchmark.py"
+DEFAULT_WORKDIR = BENCHMARKS_DIR / "files"
+
+FORMAT_EXTENSIONS = {
+    "beancount": ".beancount",
+    "ledger": ".ledger",
+    "hledger": ".journal",
+}
+
+_HEADER_RE = re.compile(rb"; Benchmark file generated with (\d+) transactions")
+
+
+def generate_ledger(output: Path, *generator_args: str, force: bool = False) -> Path:
+    """Run ``generate-benchmark.py`` with ``generator_args`` to create ``output``.
+
+    Existing files are reused unless ``force`` is set; the generator is
+    seeded, so the same arguments always produce the same file.
+    """
+    if output.exists() and not force:
+        return output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [sys.executable, str(GENERATOR), *generator_args, "--output", str(output)],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return output
+
+
+def profile_tag(profile: Path) -> str:
+    """Return a file name suffix identifying a distribution profile.
+
+    It includes a hash of the profile's contents, so that editing a profile
+    generates new ledgers rather than reusing those of its earlier version.
+    """
+    digest = hashlib.sha256(profile.read_bytes()).hexdigest()
+    return f"{profile.stem}-{digest[:12]}"
+
+
+def preset_ledger(
+    preset: str,
+    workdir: Path = DEFAULT_WORKDIR,
+    output_format: str = "beancount",
+    profile: Path | None = None,
+) -> Path:
+    """Return the path of a preset ledger, generating it if needed.
+
+    With a ``profile`` (see ``profiles/``) the ledger follows that
+    distribution model instead of the uniform default.
+    """
+    args = ["--preset", preset, "--format", output_format]
+    name = preset
+    if profile is not None:
+        args += ["--profile", str(profile.resolve())]
+        name += f"-{profile_tag(profile)}"
+    return generate_ledger(workdir / f"{name}{FORMAT_EXTENSIONS[output_format]}", *args)
+
+
+def count_transactions(path: Path) -> int | None:
+    """Read the transaction count from a generated file's header comment."""
+    with open(path, "rb") as f:
+        match = _HEADER_RE.match(f.readline())
+    return int(match.group(1)) if match else None
+
+
+def input_info(path: Path) -> dict:
+    """Return the ``input`` section of a benchmark result for ``path``."""
+    return {
+        "file": path.name,
+        "size_bytes": path.stat().st_size,
+        "transactions": count_transactions(path),
+    }
+
+
+def tree_ledger(
+    transactions: int,
+    workdir: Path = DEFAULT_WORKDIR,
+    fan_out: int = 4,
+    depth: int = 2,
+    repeat_includes: bool = False,
+    output_format: str = "beancount",
+) -> Path:
+    """Return the main file of a generated include tree, generating it if needed."""
+    name = f"tree-{transactions}-f{fan_out}-d{depth}{'-repeat' if repeat_includes else ''}"
+    args = ["--transactions", str(transactions), "--accounts", "100", "--commodities", "5"]
+    args += ["--format", output_format, "--tree", "--fan-out", str(fan_out), "--depth", str(depth)]
+    if repeat_includes:
+        args.append("--repeat-includes")
+    directory = generate_ledger(workdir / name, *args)
+    return directory / f"main{FORMAT_EXTENSIONS[output_format]}"
@@ -0,0 +1,167 @@
+"""Minimal LSP client for driving language servers over stdio.
+
+Only what the incremental benchmark needs: initialize, open a document,
+send changes and wait for the diagnostics that follow each change.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+# TextDocumentSyncKind values from the LSP specification
+SYNC_NONE = 0
+SYNC_FULL = 1
+SYNC_INCREMENTAL = 2
+
+
+class LspError(Exception):
+    """Raised when the server misbehaves or does not answer in time."""
+
+
+def _read_message(stream: BinaryIO) -> dict | None:
+    """Read one JSON-RPC message framed with a Content-Length header."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length is None:
+        raise LspError("Message without Content-Length header")
+    return json.loads(stream.read(length))
+
+
+class LspClient:
+    """A language server subprocess speaking JSON-RPC over stdio."""
+
+    def __init__(self, command: str, timeout: float = 60.0):
+        self.timeout = timeout
+        self.process = subprocess.Popen(
+            shlex.split(command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._next_id = 0
+        # Messages with the time they were read, None once the server exits
+        self._messages: queue.Queue[tuple[float, dict | None]] = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        self.sync_kind = SYNC_FULL
+
+    def _read_loop(self) -> None:
+        assert self.process.stdout is not None
+        while True:
+            try:
+                message = _read_message(self.process.stdout)
+            except (LspError, ValueError):
+                message = None
+            self._messages.put((time.perf_counter(), message))
+            if message is None:
+                return
+
+    def _send(self, payload: dict) -> None:
+        assert self.process.stdin is not None
+        body = json.dumps({"jsonrpc": "2.0", **payload}).encode()
+        self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        self.process.stdin.flush()
+
+    def notify(self, method: str, params: Any) -> None:
+        """Send a notification."""
+        self._send({"method": method, "params": params})
+
+    def _next_message(self, deadline: float) -> tuple[float, dict]:
+        """Return the next server message and the time it was read.
+
+        Server-to-client requests are answered and skipped.
+        """
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise LspError(f"No response within {self.timeout:g} seconds")
+            try:
+                received, message = self._messages.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if message is None:
+                raise LspError("Language server exited")
+            if "method" in message and "id" in message:
+                # workspace/configuration, client/registerCapability, ...
+                self._send({"id": message["id"], "result": None})
+                continue
+            return received, message
+
+    def request(self, method: str, params: Any) -> Any:
+        """Send a request and wait for its response."""
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({"id": request_id, "method": method, "params": params})
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            _, message = self._next_message(deadline)
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise LspError(f"{method} failed: {message['error']}")
+                return message.get("result")
+
+    def initialize(self, root: Path) -> None:
+        """Run the initialize handshake and record the sync kind."""
+        result = self.request(
+            "initialize",
+            {
+                "processId": None,
+                "rootUri": root.resolve().as_uri(),
+                "capabilities": {
+                    "textDocument": {
+                        "synchronization": {"didSave": False},
+                        "publishDiagnostics": {"versionSupport": True},
+                    }
+                },
+            },
+        )
+        # Servers that advertise no textDocumentSync do not take changes.
+        sync = (result or {}).get("capabilities", {}).get("textDocumentSync", SYNC_NONE)
+        self.sync_kind = sync.get("change", SYNC_NONE) if isinstance(sync, dict) else sync
+        self.notify("initialized", {})
+
+    def wait_for_diagnostics(self, uri: str, version: int, sent: float) -> list[dict]:
+        """Wait for the diagnostics of ``uri`` at ``version``.
+
+        ``sent`` is the time the document was opened or changed. Servers that
+        do not report versions are taken to answer with the first diagnostics
+        read after it; those read earlier are about a previous version.
+        """
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            received, message = self._next_message(deadline)
+            if message.get("method") != "textDocument/publishDiagnostics":
+                continue
+            params = message.get("params", {})
+            if params.get("uri") != uri:
+                continue
+            if params.get("version") is None:
+                if received >= sent:
+                    return params.get("diagnostics", [])
+            elif params["version"] == version:
+                return params.get("diagnostics", [])
+
+    def close(self) -> None:
+        """Shut the server down, killing it if it does not exit."""
+        try:
+            self.request("shutdown", None)
+            self.notify("exit", None)
+            self.process.wait(timeout=5)
+        except (LspError, OSError, subprocess.TimeoutExpired):
+            self.process.kill()
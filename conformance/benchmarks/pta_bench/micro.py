@@ -0,0 +1,322 @@
+"""Micro-benchmarks B601-B610 for the reference implementation's core primitives.
+
+End-to-end numbers say that loading got slower, not where. These benchmarks
+time the hot paths of ``beancount.core`` individually on synthetic inputs of
+``--size`` items, so an optimization to one primitive can be measured on its
+own.
+
+Every sample is a calibrated batch: like ``timeit``, the number of calls per
+batch is doubled until a batch takes at least ``--min-batch-time``, and each
+sample is the batch time divided by that number. Samples then follow the
+usual warm-up and confidence-interval protocol (see ``methodology.md``).
+
+``--beancount PATH`` puts a source tree first on ``sys.path``, to measure a
+patched copy of the reference implementation against the installed one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import random
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+from .results import benchmark_result, suite_result, write_results
+from .runner import MeasureConfig, add_measure_arguments, measure
+from .stats import summarize
+
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "HOOL", "AAPL", "VTI"]
+
+
+@dataclass(frozen=True)
+class Micro:
+    """A micro-benchmark; ``setup(size, rng, currencies)`` returns the operation to time."""
+
+    benchmark_id: str
+    name: str
+    description: str
+    setup: Callable[[int, random.Random, int], Callable[[], object]]
+
+
+def _number(rng: random.Random) -> Decimal:
+    return Decimal(rng.randrange(1, 1_000_000)).scaleb(-2)
+
+
+def _amounts(size: int, rng: random.Random, currencies: int) -> list:
+    from beancount.core.amount import Amount
+
+    return [Amount(_number(rng), rng.choice(CURRENCIES[:currencies])) for _ in range(size)]
+
+
+def _positions(size: int, rng: random.Random, currencies: int) -> list:
+    """Positions held at cost, with about four lots per currency."""
+    from beancount.core.position import Cost, Position
+
+    date = datetime.date(2020, 1, 1)
+    positions = []
+    for amount in _amounts(size, rng, currencies):
+        lot = rng.randrange(4)
+        cost = Cost(Decimal(100 + lot), "USD", date + datetime.timedelta(days=lot), None)
+        positions.append(Position(amount, cost))
+    return positions
+
+
+def setup_add_amount(size: int, rng: random.Random, currencies: int):
+    from beancount.core.inventory import Inventory
+
+    amounts = _amounts(size, rng, currencies)
+
+    def run():
+        inventory = Inventory()
+        for amount in amounts:
+            inventory.add_amount(amount)
+        return inventory
+
+    return run
+
+
+def setup_add_position(size: int, rng: random.Random, currencies: int):
+    from beancount.core.inventory import Inventory
+
+    positions = _positions(size, rng, currencies)
+
+    def run():
+        inventory = Inventory()
+        for position in positions:
+            inventory.add_position(position)
+        return inventory
+
+    return run
+
+
+def setup_add_inventory(size: int, rng: random.Random, currencies: int):
+    from beancount.core.inventory import Inventory
+
+    first = Inventory(_positions(size // 2, rng, currencies))
+    second = Inventory(_positions(size - size // 2, rng, currencies))
+
+    def run():
+        inventory = Inventory()
+        inventory.add_inventory(first)
+        inventory.add_inventory(second)
+        return inventory
+
+    return run
+
+
+def _amount_pairs(size: int, rng: random.Random) -> list:
+    from beancount.core.amount import Amount
+
+    pairs = []
+    for _ in range(size):
+        currency = rng.choice(CURRENCIES)
+        pairs.append((Amount(_number(rng), currency), Amount(_number(rng), currency)))
+    return pairs
+
+
+def setup_amount_add(size: int, rng: random.Random, currencies: int):
+    from beancount.core import amount
+
+    pairs = _amount_pairs(size, rng)
+    add = amount.add
+    return lambda: [add(a, b) for a, b in pairs]
+
+
+def setup_amount_sub(size: int, rng: random.Random, currencies: int):
+    from beancount.core import amount
+
+    pairs = _amount_pairs(size, rng)
+    sub = amount.sub
+    return lambda: [sub(a, b) for a, b in pairs]
+
+
+def setup_amount_mul(size: int, rng: random.Random, currencies: int):
+    from beancount.core import amount
+
+    pairs = [(a, b.number) for a, b in _amount_pairs(size, rng)]
+    mul = amount.mul
+    return lambda: [mul(a, n) for a, n in pairs]
+
+
+def setup_from_string(size: int, rng: random.Random, currencies: int):
+    from beancount.core.amount import Amount
+
+    strings = [f"{a.number} {a.currency}" for a in _amounts(size, rng, currencies)]
+    from_string = Amount.from_string
+    return lambda: [from_string(s) for s in strings]
+
+
+def setup_entry_sort(size: int, rng: random.Random, currencies: int):
+    from beancount.core import data
+
+    start = datetime.date(2020, 1, 1)
+    entries = []
+    for i in range(size):
+        meta = data.new_metadata("bench.beancount", rng.randrange(size * 10))
+        date = start + datetime.timedelta(days=rng.randrange(3650))
+        kind = rng.random()
+        if kind < 0.05:
+            entries.append(data.Open(meta, date, f"Assets:Account{i}", None, None))
+        elif kind < 0.1:
+            entries.append(data.Balance(meta, date, "Assets:Cash", None, None, None))
+        else:
+            entries.append(
+                data.Transaction(meta, date, "*", None, "Bench", frozenset(), frozenset(), [])
+            )
+    return lambda: data.sorted(entries)
+
+
+def setup_compute_residual(size: int, rng: random.Random, currencies: int):
+    from beancount.core import data, interpolate
+
+    postings = []
+    for position in _positions(size, rng, currencies):
+        cost = position.cost if rng.random() < 0.3 else None
+        postings.append(data.Posting("Assets:Cash", position.units, cost, None, None, None))
+    return lambda: interpolate.compute_residual(postings)
+
+
+def setup_average(size: int, rng: random.Random, currencies: int):
+    from beancount.core.inventory import Inventory
+
+    inventory = Inventory(_positions(size, rng, currencies))
+    return inventory.average
+
+
+MICROS = [
+    Micro(
+        "B601", "inventory-add-amount", "Inventory.add_amount into one inventory", setup_add_amount
+    ),
+    Micro(
+        "B602",
+        "inventory-add-position",
+        "Inventory.add_position of lots held at cost",
+        setup_add_position,
+    ),
+    Micro(
+        "B603",
+        "inventory-add-inventory",
+        "Inventory.add_inventory of two inventories",
+        setup_add_inventory,
+    ),
+    Micro("B604", "amount-add", "amount.add of same-currency amounts", setup_amount_add),
+    Micro("B605", "amount-sub", "amount.sub of same-currency amounts", setup_amount_sub),
+    Micro("B606", "amount-mul", "amount.mul by a Decimal", setup_amount_mul),
+    Micro("B607", "amount-from-string", "Amount.from_string", setup_from_string),
+    Micro(
+        "B608", "entry-sort", "data.sorted (data.entry_sortkey) of mixed entries", setup_entry_sort
+    ),
+    Micro(
+        "B609",
+        "compute-residual",
+        "interpolate.compute_residual of a posting list",
+        setup_compute_residual,
+    ),
+    Micro("B610", "inventory-average", "Inventory.average of multi-lot holdings", setup_average),
+]
+
+
+def calibrate(fn: Callable[[], object], min_batch_time: float) -> int:
+    """Return the number of calls per batch so a batch lasts ``min_batch_time``."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_batch_time:
+            return number
+        number *= 2
+
+
+def run_micro(micro: Micro, args: argparse.Namespace, config: MeasureConfig) -> dict:
+    """Calibrate and measure one micro-benchmark; return its benchmark entry."""
+    fn = micro.setup(args.size, random.Random(args.seed), args.currencies)
+    number = calibrate(fn, args.min_batch_time)
+
+    def batch(_):
+        for _ in range(number):
+            result = fn()
+        return result  # Kept alive for --profile alloc
+
+    # measure() reports milliseconds per batch; convert to microseconds per call.
+    samples = [ms * 1000 / number for ms in measure(batch, config, label=micro.name)]
+    time_stats = summarize(samples, unit="microseconds")
+    per_item = summarize([sample * 1000 / args.size for sample in samples], unit="nanoseconds")
+    return benchmark_result(
+        micro.benchmark_id,
+        micro.name,
+        {"synthetic": True, "size": args.size, "currencies": args.currencies, "seed": args.seed},
+        {**config.as_dict(), "calls_per_sample": number},
+        {"time": time_stats, "per_item": per_item},
+        description=micro.description,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``micro`` subcommand options."""
+    parser.add_argument(
+        "--benchmark",
+        "-b",
+        action="append",
+        choices=[m.benchmark_id for m in MICROS] + [m.name for m in MICROS],
+        help="Run only this micro-benchmark, by ID or name (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--size", type=int, default=1000, help="Items per synthetic input (default: 1000)"
+    )
+    parser.add_argument(
+        "--currencies",
+        type=int,
+        default=5,
+        choices=range(1, len(CURRENCIES) + 1),
+        metavar=f"1-{len(CURRENCIES)}",
+        help="Distinct currencies in the inputs (default: 5)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument(
+        "--min-batch-time",
+        type=float,
+        default=0.02,
+        help="Minimum seconds per calibrated batch (default: 0.02)",
+    )
+    parser.add_argument(
+        "--beancount",
+        type=Path,
+        help="Import beancount from this source tree instead of the installed package",
+    )
+    parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+    add_measure_arguments(parser)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the selected micro-benchmarks and write the suite result."""
+    if args.beancount:
+        sys.path.insert(0, str(args.beancount.resolve()))
+    import beancount
+
+    config = MeasureConfig.from_args(args)
+    selected = [
+        m for m in MICROS if not args.benchmark or {m.benchmark_id, m.name} & set(args.benchmark)
+    ]
+    benchmarks = []
+    for micro in selected:
+        result = run_micro(micro, args, config)
+        print(
+            f"{micro.benchmark_id} {micro.name:<24} {result['results']['time']['median']:10.1f} us",
+            file=sys.stderr,
+        )
+        benchmarks.append(result)
+
+    implementation = {
+        "name": "beancount",
+        "version": beancount.__version__,
+        "commit": None,
+        "path": str(Path(beancount.__file__).parent),
+    }
+    write_results(suite_result(implementation, benchmarks), args.output)
+    return 0
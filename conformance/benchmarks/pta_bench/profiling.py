@@ -0,0 +1,194 @@
+"""Profile capture for in-process benchmark iterations and conformance tests.
+
+A ``Profiler`` wraps each unit of work (a measured iteration, a conformance
+test) in ``capture(label)``. Captures are aggregated across all units and
+written as reports sharing one path prefix:
+
+``cpu`` (``cProfile``):
+
+- ``<prefix>.cpu.pstats``: aggregated stats, for ``python -m pstats``/snakeviz
+- ``<prefix>.cpu.folded``: collapsed stacks for ``flamegraph.pl``/speedscope
+- ``<prefix>.cpu.txt``: the top functions by cumulative and own time
+
+``alloc`` (``tracemalloc``):
+
+- ``<prefix>.alloc.folded``: collapsed allocation stacks, weighted in bytes
+- ``<prefix>.alloc.txt``: the top sites of memory still live when a unit ends
+
+Both also write ``<prefix>.<kind>.json`` with a per-label summary. Only code
+running in this process is seen; implementations driven as subprocesses
+show up as the harness overhead around them.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+KINDS = ("cpu", "alloc")
+
+# Frames kept per allocation traceback
+ALLOC_FRAMES = 32
+
+# cProfile only records caller -> callee edges, so full stacks are rebuilt by
+# walking callers; the walk stops at this depth and below this weight.
+MAX_STACK_DEPTH = 64
+MIN_STACK_WEIGHT_US = 1.0
+
+
+def _function_name(func: tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name  # Built-in, e.g. "<built-in method builtins.sorted>"
+    return f"{name} ({Path(filename).name}:{lineno})"
+
+
+def collapse_pstats(stats: pstats.Stats) -> Counter[str]:
+    """Approximate collapsed stacks (in microseconds) from cProfile data.
+
+    Each function's own time is split among its callers in proportion to the
+    cumulative time of each call edge, recursively up to the roots. Exact for
+    call trees; an estimate where a function is reached from several paths.
+    """
+    table = stats.stats  # type: ignore[attr-defined]
+    folded: Counter[str] = Counter()
+
+    def walk(func, weight: float, stack: list) -> None:
+        callers = table[func][4] if func in table else {}
+        edges = {c: edge[3] for c, edge in callers.items() if c not in stack and edge[3] > 0}
+        total = sum(edges.values())
+        if not edges or len(stack) >= MAX_STACK_DEPTH or total <= 0:
+            folded[";".join(_function_name(f) for f in reversed(stack))] += weight
+            return
+        for caller, edge_time in edges.items():
+            share = weight * edge_time / total
+            if share >= MIN_STACK_WEIGHT_US:
+                walk(caller, share, [*stack, caller])
+
+    for func, (_cc, _nc, tottime, _ct, _callers) in table.items():
+        weight = tottime * 1e6
+        if weight >= MIN_STACK_WEIGHT_US:
+            walk(func, weight, [func])
+    return folded
+
+
+def write_folded(path: Path, folded: Counter[str]) -> None:
+    """Write collapsed stacks, one ``frame;frame;frame weight`` line each."""
+    with open(path, "w") as f:
+        for stack, weight in sorted(folded.items()):
+            if round(weight) > 0:
+                f.write(f"{stack} {round(weight)}\n")
+
+
+class _Capture:
+    """``with profiler.capture(label):``, without generator frames in the profile."""
+
+    def __init__(self, profiler: Profiler, label: str) -> None:
+        self.profiler = profiler
+        self.label = label
+
+    def __enter__(self) -> None:
+        self.profiler._start(self.label)
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._stop()
+
+
+class Profiler:
+    """Collects ``cpu`` or ``alloc`` profiles around labelled units of work."""
+
+    def __init__(self, kind: str, top: int = 30) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown profile kind: {kind}")
+        self.kind = kind
+        self.top = top
+        self.labels: dict[str, dict] = {}
+        self._stats: pstats.Stats | None = None
+        self._alloc_sites: Counter = Counter()
+        self._alloc_stacks: Counter[str] = Counter()
+
+    def capture(self, label: str) -> _Capture:
+        """Return a context manager profiling its body under ``label``."""
+        return _Capture(self, label)
+
+    def _start(self, label: str) -> None:
+        self._label = label
+        if self.kind == "cpu":
+            self._profile = cProfile.Profile()
+            self._started = time.perf_counter()
+            self._profile.enable()
+        else:
+            tracemalloc.start(ALLOC_FRAMES)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def _stop(self) -> None:
+        if self.kind == "cpu":
+            self._profile.disable()
+            elapsed = (time.perf_counter() - self._started) * 1000
+            stats = pstats.Stats(self._profile)
+            if self._stats is None:
+                self._stats = stats
+            else:
+                self._stats.add(stats)
+            entry = self.labels.setdefault(self._label, {"runs": 0, "time_ms": 0.0})
+            entry["runs"] += 1
+            entry["time_ms"] += elapsed
+            return
+
+        after = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = after.filter_traces(ignore).compare_to(
+            self._snapshot.filter_traces(ignore), "traceback"
+        )
+        net = 0
+        for stat in diff:
+            if stat.size_diff <= 0:
+                continue
+            net += stat.size_diff
+            # Tracebacks run from the oldest frame to the allocation site.
+            frame = stat.traceback[-1]
+            self._alloc_sites[(frame.filename, frame.lineno)] += stat.size_diff
+            stack = ";".join(f"{Path(f.filename).name}:{f.lineno}" for f in stat.traceback)
+            self._alloc_stacks[stack] += stat.size_diff
+        entry = self.labels.setdefault(self._label, {"runs": 0, "peak_bytes": 0, "net_bytes": 0})
+        entry["runs"] += 1
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+        entry["net_bytes"] += net
+
+    def write_reports(self, prefix: Path) -> list[Path]:
+        """Write the aggregated reports; return the written paths."""
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        base = f"{prefix}.{self.kind}"
+        written = []
+        if self.kind == "cpu" and self._stats is not None:
+            self._stats.dump_stats(f"{base}.pstats")
+            write_folded(Path(f"{base}.folded"), collapse_pstats(self._stats))
+            text = io.StringIO()
+            stats = pstats.Stats(f"{base}.pstats", stream=text)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            stats.sort_stats("tottime").print_stats(self.top)
+            Path(f"{base}.txt").write_text(text.getvalue())
+            written += [Path(f"{base}.{ext}") for ext in ("pstats", "folded", "txt")]
+        elif self.kind == "alloc":
+            write_folded(Path(f"{base}.folded"), self._alloc_stacks)
+            lines = [f"Top {self.top} allocation sites (bytes live at the end of each unit)", ""]
+            for (filename, lineno), size in self._alloc_sites.most_common(self.top):
+                lines.append(f"{size:>14,} B  {filename}:{lineno}")
+            Path(f"{base}.txt").write_text("\n".join(lines) + "\n")
+            written += [Path(f"{base}.{ext}") for ext in ("folded", "txt")]
+        Path(f"{base}.json").write_text(
+            json.dumps({"kind": self.kind, "labels": self.labels}, indent=2) + "\n"
+        )
+        written.append(Path(f"{base}.json"))
+        for path in written:
+            print(f"Profile written to: {path}", file=sys.stderr)
+        return written
@@ -0,0 +1,256 @@
+"""Query benchmarks B101-B103 with separate cold and warm measurements.
+
+``query_cold_ms`` is the first query executed after a fresh load of the
+ledger; ``query_warm_ms`` is the same query repeated in the same session.
+The reference implementation is measured in-process through beanquery so
+both numbers are available. Command-line implementations (such as
+``rledger query``) reload the ledger on every invocation, so for them each
+sample is a cold query and the warm figure is reported as null.
+
+The date filter of B102 covers the middle half of the ledger's transaction
+dates, so it selects about half of the postings whatever the ledger's size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import DEFAULT_WORKDIR, input_info, preset_ledger
+from .results import benchmark_result, suite_result, write_results
+from .runner import MeasureConfig, add_measure_arguments, measure, run_command, time_call
+from .stats import summarize
+
+
+_TRANSACTION_DATE_RE = re.compile(rb"^(\d{4})-(\d{2})-(\d{2}) +(?:[*!]|txn\b)", re.MULTILINE)
+
+
+def date_window(path: Path) -> tuple[date, date]:
+    """Return the middle half of the ledger's transaction dates, end exclusive."""
+    dates = [
+        date(int(year), int(month), int(day))
+        for year, month, day in _TRANSACTION_DATE_RE.findall(path.read_bytes())
+    ]
+    if not dates:
+        raise ValueError(f"No transactions in {path}")
+    first, last = min(dates), max(dates)
+    quarter = (last - first) / 4
+    return first + quarter, last - quarter + timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class Query:
+    """A catalog entry: one fixed BQL query.
+
+    ``{start}`` and ``{end}`` in ``bql`` are replaced by the ledger's
+    ``date_window``.
+    """
+
+    benchmark_id: str
+    name: str
+    description: str
+    bql: str
+
+    def text(self, path: Path) -> str:
+        """Return the query to run against the ledger at ``path``."""
+        if "{start}" not in self.bql:
+            return self.bql
+        start, end = date_window(path)
+        return self.bql.format(start=start.isoformat(), end=end.isoformat())
+
+
+# The catalog is fixed so results stay comparable across runs and
+# implementations. Queries avoid single quotes so they can be substituted
+# into the quoted ``{query}`` slot of the command templates.
+QUERIES = [
+    Query(
+        "B101",
+        "query-simple",
+        "Simple balance query",
+        "SELECT account, sum(position) AS balance GROUP BY account ORDER BY account",
+    ),
+    Query(
+        "B102",
+        "query-filter",
+        "Query with date filter",
+        "SELECT date, account, position WHERE date >= {start} AND date < {end}",
+    ),
+    Query(
+        "B103",
+        "query-aggregate",
+        "Aggregation query",
+        "SELECT year, root(account, 1) AS root, currency, sum(number) AS total, "
+        "count(number) AS n GROUP BY year, root, currency ORDER BY year, root, currency",
+    ),
+]
+
+
+def _run_beanquery(conn, bql: str) -> int:
+    """Execute a query and fetch all rows, returning the row count."""
+    return len(conn.execute(bql).fetchall())
+
+
+def bench_beanquery(path: Path, query: Query, config: MeasureConfig) -> dict:
+    """Measure a query in-process through beanquery."""
+    import beanquery
+    from beancount import loader
+
+    # Bypass the pickle cache so every load is a real fresh load.
+    loader.initialize(use_cache=False)
+    dsn = f"beancount:{path.resolve()}"
+
+    load_samples: list[float] = []
+
+    def connect():
+        elapsed, conn = time_call(lambda: beanquery.connect(dsn))
+        load_samples.append(elapsed)
+        return conn
+
+    # Cold: a fresh connection for every sample, no warm-up.
+    cold_config = MeasureConfig(
+        warm_up_iterations=0,
+        min_iterations=config.min_iterations,
+        max_iterations=config.min_iterations,
+    )
+    cold = measure(lambda conn: _run_beanquery(conn, query.bql), cold_config, setup=connect)
+
+    # Warm: one session, the query repeated after the usual warm-up.
+    conn = connect()
+    rows = _run_beanquery(conn, query.bql)
+    warm = measure(lambda _: _run_beanquery(conn, query.bql), config, label=query.benchmark_id)
+    conn.close()
+
+    return {
+        "time": summarize(warm),
+        "cold": summarize(cold),
+        "load": summarize(load_samples),
+        "rows": rows,
+    }
+
+
+def bench_command(impl_config: dict, path: Path, query: Query, config: MeasureConfig) -> dict:
+    """Measure a query through an implementation's ``query`` command."""
+    command = format_command(impl_config["commands"]["query"], path, query=query.bql)
+
+    failures: list[str] = []
+
+    def invoke(_):
+        result = run_command(command, timeout=config.timeout_seconds)
+        if not result.success:
+            failures.append(result.stderr.strip() or f"exit code {result.exit_code}")
+
+    cold = measure(invoke, config)
+    results = {"time": None, "cold": summarize(cold)}
+    parse_template = impl_config["commands"].get("parse")
+    if parse_template:
+        parse_command = format_command(parse_template, path)
+        load = measure(lambda _: run_command(parse_command, config.timeout_seconds), config)
+        results["load"] = summarize(load)
+    if failures:
+        results["error"] = failures[0]
+    return results
+
+
+def run_query_benchmark(
+    impl: str,
+    impl_config: dict,
+    path: Path,
+    query: Query,
+    config: MeasureConfig,
+) -> dict:
+    """Run one catalog query and return its benchmark entry."""
+    try:
+        query = replace(query, bql=query.text(path))
+    except ValueError as e:
+        results = {"error": str(e)}
+    else:
+        if impl == "beancount":
+            try:
+                results = bench_beanquery(path, query, config)
+            except Exception as e:
+                results = {"error": f"{type(e).__name__}: {e}"}
+        else:
+            results = bench_command(impl_config, path, query, config)
+
+    status = "failed" if "error" in results else "passed"
+    metrics = {
+        "query_cold_ms": (results.get("cold") or {}).get("median"),
+        "query_warm_ms": (results.get("time") or {}).get("median"),
+    }
+    return benchmark_result(
+        query.benchmark_id,
+        query.name,
+        input_info(path),
+        config.as_dict(),
+        results,
+        status=status,
+        query=query.bql,
+        metrics=metrics,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``query`` subcommand options."""
+    parser.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        "-b",
+        action="append",
+        choices=[q.benchmark_id for q in QUERIES],
+        help="Run only this benchmark (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--file",
+        type=Path,
+        help="Ledger to query (default: the generated preset ledger)",
+    )
+    parser.add_argument(
+        "--preset",
+        choices=["small", "medium", "large", "huge"],
+        default="medium",
+        help="Generated ledger to use when --file is not given (default: medium)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Distribution profile for generated ledgers, e.g. profiles/household.json",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=DEFAULT_WORKDIR,
+        help="Directory for generated ledgers",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        help="Output file for the result JSON (default: stdout)",
+    )
+    add_measure_arguments(parser)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the query benchmarks and write the suite result."""
+    implementations = load_implementations()
+    impl_config = implementations.get(args.impl)
+    if impl_config is None and args.impl != "beancount":
+        raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+    impl_config = impl_config or {}
+
+    path = args.file or preset_ledger(args.preset, args.workdir, profile=args.profile)
+    config = MeasureConfig.from_args(args)
+    selected = [q for q in QUERIES if not args.benchmark or q.benchmark_id in args.benchmark]
+
+    benchmarks = [run_query_benchmark(args.impl, impl_config, path, q, config) for q in selected]
+    document = suite_result(implementation_info(args.impl, impl_config), benchmarks)
+    write_results(document, args.output)
+    return 0 if document["summary"]["failed"] == 0 else 1
@@ -0,0 +1,101 @@
+"""Benchmark result documents in the schema defined by ``spec.md``."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+SUITE = "pta-benchmarks-v1"
+
+
+def _cpu_model() -> str:
+    """Return a human-readable CPU model name."""
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        for line in cpuinfo.read_text().splitlines():
+            if line.startswith("model name"):
+                return line.split(":", 1)[1].strip()
+    return platform.processor() or platform.machine()
+
+
+def _ram_gb() -> float | None:
+    """Return total physical memory in GiB, if it can be determined."""
+    try:
+        return round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30, 1)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def environment() -> dict:
+    """Describe the machine the benchmarks ran on."""
+    return {
+        "os": f"{platform.system()} {platform.release()}",
+        "cpu": _cpu_model(),
+        "cores": os.cpu_count(),
+        "ram_gb": _ram_gb(),
+        "python": platform.python_version(),
+    }
+
+
+def machine_fingerprint(env: dict) -> str:
+    """Return a short stable identifier for the machine described by ``env``.
+
+    Only hardware and OS fields take part, so results from the same machine
+    share a fingerprint across Python or implementation upgrades.
+    """
+    key = json.dumps({k: env.get(k) for k in ("os", "cpu", "cores", "ram_gb")}, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def benchmark_result(
+    benchmark_id: str,
+    name: str,
+    input_info: dict,
+    configuration: dict,
+    results: dict,
+    status: str = "passed",
+    **extra: object,
+) -> dict:
+    """Build a single benchmark entry."""
+    entry = {
+        "benchmark_id": benchmark_id,
+        "name": name,
+        "status": status,
+        "input": input_info,
+        "configuration": configuration,
+        "results": results,
+    }
+    entry.update(extra)
+    return entry
+
+
+def suite_result(implementation: dict, benchmarks: list[dict]) -> dict:
+    """Build the full suite document wrapping ``benchmarks``."""
+    passed = sum(1 for b in benchmarks if b.get("status") == "passed")
+    return {
+        "suite": SUITE,
+        "timestamp": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "implementation": implementation,
+        "environment": environment(),
+        "benchmarks": benchmarks,
+        "summary": {
+            "total_benchmarks": len(benchmarks),
+            "passed": passed,
+            "failed": len(benchmarks) - passed,
+        },
+    }
+
+
+def write_results(document: dict, output: Path | None) -> None:
+    """Write a result document to ``output``, or stdout if None."""
+    text = json.dumps(document, indent=2)
+    if output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        output.write_text(text + "\n")
+        print(f"Results written to: {output}", file=sys.stderr)
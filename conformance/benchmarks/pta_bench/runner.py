@@ -0,0 +1,242 @@
+"""Measurement loop shared by the benchmark drivers.
+
+Follows the measurement protocol in ``methodology.md``: discarded warm-up
+iterations, then at least ``min_iterations`` measured runs, continuing until
+the 95% confidence interval is within ``target_ci`` of the mean or
+``max_iterations`` is reached.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+
+from .profiling import Profiler
+from .stats import relative_ci
+
+
+@dataclass
+class MeasureConfig:
+    """Iteration policy for a measurement."""
+
+    warm_up_iterations: int = 3
+    min_iterations: int = 10
+    max_iterations: int = 100
+    target_ci: float = 0.05
+    timeout_seconds: float = 60.0
+    # Set by ``benchmark.py --profile``; wraps every measured iteration
+    profiler: Profiler | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> MeasureConfig:
+        """Build a config from the options added by ``add_measure_arguments``."""
+        return cls(
+            warm_up_iterations=args.warmup,
+            min_iterations=args.min_iterations,
+            max_iterations=max(args.max_iterations, args.min_iterations),
+            timeout_seconds=args.timeout,
+            profiler=getattr(args, "profiler", None),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the ``configuration`` section of a benchmark result."""
+        config = {
+            "warm_up_iterations": self.warm_up_iterations,
+            "min_iterations": self.min_iterations,
+            "max_iterations": self.max_iterations,
+            "target_relative_ci": self.target_ci,
+            "timeout_seconds": self.timeout_seconds,
+        }
+        if self.profiler is not None:
+            # Profiled samples include the profiler's overhead.
+            config["profile"] = self.profiler.kind
+        return config
+
+
+@dataclass
+class CommandResult:
+    """Result of running an external implementation command."""
+
+    duration_ms: float
+    exit_code: int
+    stdout: str
+    stderr: str
+    peak_rss_mb: float | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.exit_code == 0
+
+
+def add_measure_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the iteration policy options to a driver's argument parser."""
+    defaults = MeasureConfig()
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=defaults.warm_up_iterations,
+        help=f"Discarded warm-up iterations (default: {defaults.warm_up_iterations})",
+    )
+    parser.add_argument(
+        "--min-iterations",
+        type=int,
+        default=defaults.min_iterations,
+        help=f"Minimum measured iterations (default: {defaults.min_iterations})",
+    )
+    parser.add_argument(
+        "--max-iterations",
+        type=int,
+        default=defaults.max_iterations,
+        help=f"Maximum measured iterations (default: {defaults.max_iterations})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=defaults.timeout_seconds,
+        help=f"Per-command timeout in seconds (default: {defaults.timeout_seconds:g})",
+    )
+
+
+def time_call(fn: Callable[[], Any]) -> tuple[float, Any]:
+    """Call ``fn`` and return (elapsed milliseconds, result)."""
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def measure(
+    fn: Callable[[Any], Any],
+    config: MeasureConfig,
+    setup: Callable[[], Any] | None = None,
+    label: str = "measure",
+) -> list[float]:
+    """Measure ``fn`` repeatedly and return the samples in milliseconds.
+
+    If ``setup`` is given it is called before every iteration, untimed, and
+    its return value is passed to ``fn``; otherwise ``fn`` receives None.
+    With ``config.profiler`` set, each measured iteration (not the warm-ups)
+    is profiled under ``label``.
+    """
+    for _ in range(config.warm_up_iterations):
+        fn(setup() if setup else None)
+
+    samples: list[float] = []
+    while len(samples) < config.max_iterations:
+        state = setup() if setup else None
+        with config.profiler.capture(label) if config.profiler else nullcontext():
+            elapsed, _ = time_call(lambda state=state: fn(state))
+        samples.append(elapsed)
+        if len(samples) >= config.min_iterations and relative_ci(samples) <= config.target_ci:
+            break
+    return samples
+
+
+def run_command(command: str, timeout: float = 60.0) -> CommandResult:
+    """Run a shell command from an implementation config and time it."""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return CommandResult(
+            duration_ms=timeout * 1000,
+            exit_code=-1,
+            stdout="",
+            stderr=f"Timeout after {timeout:g} seconds",
+        )
+    return CommandResult(
+        duration_ms=(time.perf_counter() - start) * 1000,
+        exit_code=result.returncode,
+        stdout=result.stdout,
+        stderr=result.stderr,
+    )
+
+
+# Runs a command in a forked grandchild and reports its exit code, wall time
+# and peak RSS on a pipe. Linux carries ru_maxrss across fork and exec, so a command
+# spawned directly by the benchmark process would report at least the
+# benchmark's own peak; this small interpreter bounds that floor instead.
+_LAUNCHER = """
+import os, sys, time
+fd, argv = int(sys.argv[1]), sys.argv[2:]
+start = time.perf_counter_ns()
+pid = os.fork()
+if pid == 0:
+    os.close(fd)
+    try:
+        os.execvp(argv[0], argv)
+    finally:
+        os._exit(127)
+_, status, usage = os.wait4(pid, 0)
+elapsed = time.perf_counter_ns() - start
+maxrss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+os.write(fd, b"%d %d %d" % (os.waitstatus_to_exitcode(status), elapsed, maxrss))
+"""
+
+
+def run_measured(
+    command: str | list[str],
+    timeout: float = 60.0,
+    cwd: str | os.PathLike | None = None,
+) -> CommandResult:
+    """Run a command, timing it and recording its peak resident memory.
+
+    The duration excludes the launcher's own start-up. The reported peak
+    has a floor of a few megabytes, the size of the launcher process the
+    command is forked from.
+    """
+    argv = ["/bin/sh", "-c", command] if isinstance(command, str) else list(command)
+    read_fd, write_fd = os.pipe()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(
+            [sys.executable, "-I", "-S", "-c", _LAUNCHER, str(write_fd), *argv],
+            stdout=out,
+            stderr=err,
+            cwd=cwd,
+            pass_fds=(write_fd,),
+            start_new_session=True,
+        )
+        os.close(write_fd)
+        try:
+            process.wait(timeout=timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+            timed_out = True
+        with os.fdopen(read_fd, "rb") as report:
+            status = report.read().split()
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode(errors="replace")
+        stderr = err.read().decode(errors="replace")
+
+    if timed_out or not status:
+        return CommandResult(
+            duration_ms=timeout * 1000,
+            exit_code=-1,
+            stdout=stdout,
+            stderr=f"Timeout after {timeout:g} seconds",
+        )
+    exit_code, elapsed_ns, maxrss_kb = (int(field) for field in status)
+    return CommandResult(
+        duration_ms=elapsed_ns / 1e6,
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr=stderr,
+        peak_rss_mb=maxrss_kb / 1024,
+    )
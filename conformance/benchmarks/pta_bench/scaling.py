@@ -0,0 +1,305 @@
+"""Scaling-curve benchmarks: detect super-linear complexity.
+
+Ledgers are generated at geometric sizes and, for each size, the parse,
+validate and query phases are timed and the peak resident memory is
+recorded. The empirical exponent ``k`` in ``time ~ n^k`` is the slope of a
+least-squares fit in log-log space. Fixed start-up costs flatten the curve
+at small sizes, so the gate uses the exponent fitted over the largest sizes
+only; a phase fails when that exponent exceeds its bound (e.g. 1.2), which
+catches accidental O(n^2) paths long before they hurt real ledgers.
+
+Phases and benchmark IDs:
+
+- ``B301`` scaling-parse: parse only (reference implementation in-process)
+- ``B302`` scaling-validate: parse + full validation (``bean-check``-like)
+- ``B303`` scaling-query: the B101 query on the loaded ledger
+- ``B304`` scaling-memory: peak resident set size of the validate run
+
+Command-line implementations are timed through their configured ``parse``
+(a full check, so it counts as validate) and ``query`` commands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import shlex
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import BENCHMARKS_DIR, DEFAULT_WORKDIR, generate_ledger, input_info, profile_tag
+from .query import QUERIES
+from .results import benchmark_result, suite_result, write_results
+from .runner import CommandResult, run_measured
+
+PHASES = {
+    "parse": ("B301", "scaling-parse"),
+    "validate": ("B302", "scaling-validate"),
+    "query": ("B303", "scaling-query"),
+    "memory": ("B304", "scaling-memory"),
+}
+
+DEFAULT_BOUNDS = {"parse": 1.2, "validate": 1.2, "query": 1.2, "memory": 1.1}
+
+SCALING_QUERY = QUERIES[0].bql
+
+
+@dataclass
+class Fit:
+    """A power-law fit ``y = c * n^exponent``."""
+
+    exponent: float
+    r_squared: float
+
+
+def fit_exponent(sizes: list[int], values: list[float]) -> Fit:
+    """Fit ``values ~ sizes^k`` by least squares on the logarithms."""
+    points = [(math.log(n), math.log(v)) for n, v in zip(sizes, values, strict=True) if v > 0]
+    if len(points) < 2:
+        raise ValueError("Need at least two positive measurements to fit an exponent")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    slope = sxy / sxx
+    r_squared = sxy * sxy / (sxx * syy) if syy else 1.0
+    return Fit(exponent=slope, r_squared=r_squared)
+
+
+def geometric_sizes(minimum: int, maximum: int, factor: float) -> list[int]:
+    """Return sizes ``minimum * factor^i`` up to ``maximum``."""
+    if factor <= 1:
+        raise ValueError("Size factor must be greater than 1")
+    sizes = []
+    size = float(minimum)
+    while round(size) <= maximum:
+        sizes.append(round(size))
+        size *= factor
+    return sizes
+
+
+def _run_checked(command: list[str] | str, timeout: float) -> CommandResult:
+    """Run a measured command and fail the sweep if it does not succeed."""
+    result = run_measured(command, timeout, cwd=BENCHMARKS_DIR)
+    if not result.success:
+        raise RuntimeError(f"Command failed ({result.exit_code}): {command}")
+    return result
+
+
+def measure_beancount(path: Path, iterations: int, timeout: float) -> dict:
+    """Measure the reference implementation at one size in a fresh worker."""
+    command = [
+        sys.executable,
+        "-m",
+        "pta_bench.scaling",
+        "--worker",
+        str(path.resolve()),
+        str(iterations),
+    ]
+    result = _run_checked(command, timeout)
+    phases = json.loads(result.stdout)
+    phases["memory"] = [result.peak_rss_mb]
+    return phases
+
+
+def measure_command(impl_config: dict, path: Path, iterations: int, timeout: float) -> dict:
+    """Measure a command-line implementation at one size."""
+    commands = impl_config["commands"]
+    phases: dict[str, list[float]] = {"validate": [], "memory": []}
+    check = format_command(commands["parse"], path)
+    for _ in range(iterations):
+        result = _run_checked(check, timeout)
+        phases["validate"].append(result.duration_ms)
+        phases["memory"].append(result.peak_rss_mb)
+    if "query" in commands:
+        query = format_command(commands["query"], path, query=SCALING_QUERY)
+        phases["query"] = [_run_checked(query, timeout).duration_ms for _ in range(iterations)]
+    return phases
+
+
+def _worker(path: str, iterations: int) -> None:
+    """Time the phases of the reference implementation; print JSON samples."""
+    import beanquery
+    from beancount import loader
+    from beancount.parser import parser
+
+    loader.initialize(use_cache=False)
+    times: dict[str, list[float]] = {"parse": [], "validate": [], "query": []}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parser.parse_file(path)
+        times["parse"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        entries, errors, options = loader.load_file(path)
+        times["validate"].append((time.perf_counter() - start) * 1000)
+
+        conn = beanquery.connect("beancount:", entries=entries, errors=errors, options=options)
+        start = time.perf_counter()
+        conn.execute(SCALING_QUERY).fetchall()
+        times["query"].append((time.perf_counter() - start) * 1000)
+    print(json.dumps(times))
+
+
+def _parse_bounds(value: str) -> dict[str, float]:
+    """Parse ``parse=1.1,memory=1.05`` into per-phase bounds."""
+    bounds = {}
+    for item in value.split(","):
+        phase, _, bound = item.partition("=")
+        if phase not in PHASES:
+            raise argparse.ArgumentTypeError(f"unknown phase: {phase}")
+        bounds[phase] = float(bound)
+    return bounds
+
+
+def _parse_tail(value: str) -> int:
+    """Parse ``--tail``; an exponent needs at least two sizes to fit."""
+    tail = int(value)
+    if tail < 2:
+        raise argparse.ArgumentTypeError("--tail needs at least 2 sizes")
+    return tail
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``scaling`` subcommand options."""
+    parser.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    parser.add_argument(
+        "--min-size", type=int, default=1000, help="Smallest transaction count (default: 1000)"
+    )
+    parser.add_argument(
+        "--max-size", type=int, default=32000, help="Largest transaction count (default: 32000)"
+    )
+    parser.add_argument(
+        "--factor", type=float, default=2.0, help="Ratio between sizes (default: 2)"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=3, help="Measurements per size (default: 3)"
+    )
+    parser.add_argument(
+        "--tail",
+        type=_parse_tail,
+        default=3,
+        help="Number of largest sizes used for the gating exponent (default: 3)",
+    )
+    parser.add_argument(
+        "--bound",
+        type=float,
+        help="Maximum exponent for every phase (default: 1.2, memory 1.1)",
+    )
+    parser.add_argument(
+        "--phase-bound",
+        type=_parse_bounds,
+        default={},
+        help="Per-phase maximum exponents, e.g. parse=1.1,memory=1.05",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Distribution profile for generated ledgers, e.g. profiles/household.json",
+    )
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument(
+        "--timeout", type=float, default=600.0, help="Per-run timeout in seconds (default: 600)"
+    )
+    parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+
+
+def run(args: argparse.Namespace) -> int:
+    """Sweep sizes, fit exponents and fail on super-linear phases."""
+    if args.impl == "beancount":
+        impl_config = load_implementations().get("beancount", {})
+    else:
+        impl_config = load_implementations().get(args.impl)
+        if impl_config is None:
+            raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+
+    bounds = dict(DEFAULT_BOUNDS)
+    if args.bound is not None:
+        bounds = dict.fromkeys(bounds, args.bound)
+    bounds.update(args.phase_bound)
+
+    sizes = geometric_sizes(args.min_size, args.max_size, args.factor)
+    per_size: list[dict] = []
+    for size in sizes:
+        generator_args = ["--transactions", str(size), "--accounts", "100", "--commodities", "5"]
+        name = f"scale-{size}"
+        if args.profile:
+            generator_args += ["--profile", str(args.profile.resolve())]
+            name += f"-{profile_tag(args.profile)}"
+        path = generate_ledger(args.workdir / f"{name}.beancount", *generator_args)
+        print(f"Measuring {size} transactions...", file=sys.stderr)
+        try:
+            if args.impl == "beancount":
+                phases = measure_beancount(path, args.iterations, args.timeout)
+            else:
+                phases = measure_command(impl_config, path, args.iterations, args.timeout)
+        except RuntimeError as error:
+            raise SystemExit(f"Error: {size} transactions: {error}") from None
+        per_size.append({"size": size, "input": input_info(path), "phases": phases})
+
+    configuration = {
+        "sizes": sizes,
+        "iterations": args.iterations,
+        "tail": args.tail,
+        "command": shlex.join(sys.argv[1:]),
+    }
+    benchmarks = []
+    for phase, (benchmark_id, name) in PHASES.items():
+        points = [(p["size"], sorted(p["phases"][phase])) for p in per_size if phase in p["phases"]]
+        if len(points) < 2:
+            continue
+        phase_sizes = [size for size, _ in points]
+        # The fastest sample is the least disturbed by scheduling and GC noise,
+        # which otherwise dominates the slope between neighbouring sizes.
+        best = [samples[0] for _, samples in points]
+        overall = fit_exponent(phase_sizes, best)
+        tail = fit_exponent(phase_sizes[-args.tail :], best[-args.tail :])
+        passed = tail.exponent <= bounds[phase]
+        benchmarks.append(
+            benchmark_result(
+                benchmark_id,
+                name,
+                {"sizes": phase_sizes},
+                configuration,
+                {
+                    "unit": "megabytes" if phase == "memory" else "milliseconds",
+                    "points": [
+                        {"size": size, "best": samples[0], "samples": samples}
+                        for size, samples in points
+                    ],
+                    "exponent": round(overall.exponent, 4),
+                    "r_squared": round(overall.r_squared, 4),
+                    "tail_exponent": round(tail.exponent, 4),
+                    "bound": bounds[phase],
+                },
+                status="passed" if passed else "failed",
+            )
+        )
+        verdict = "ok" if passed else "SUPER-LINEAR"
+        print(
+            f"{benchmark_id} {phase:<9} n^{tail.exponent:.3f} (overall n^{overall.exponent:.3f}, "
+            f"bound {bounds[phase]:g}) {verdict}",
+            file=sys.stderr,
+        )
+
+    implementation = implementation_info(args.impl, impl_config)
+    document = suite_result(implementation, benchmarks)
+    write_results(document, args.output)
+    return 0 if document["summary"]["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    # Worker mode, used by measure_beancount() to get a clean peak RSS.
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        _worker(sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.exit("usage: python -m pta_bench.scaling --worker FILE ITERATIONS")
@@ -0,0 +1,210 @@
+"""Start-up benchmark B000: time to first result on tiny inputs.
+
+For short ledgers, process start-up dominates: ``bean-check`` on a hundred
+lines spends most of its time importing modules. This benchmark times every
+configured command of one implementation (and its ``version_command``, the
+pure start-up floor) on a tiny generated ledger.
+
+Python implementations are additionally run with ``PYTHONPROFILEIMPORTTIME``
+set, which makes the interpreter print one ``import time:`` line per module
+to stderr (the same output as ``-X importtime``, but it also reaches
+interpreters started through wrapper scripts). The per-module self times
+are aggregated over several runs into the slowest modules and a
+per-top-level-package breakdown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from .implementations import format_command, implementation_info, load_implementations
+from .ledgers import DEFAULT_WORKDIR, generate_ledger, input_info
+from .query import QUERIES
+from .results import benchmark_result, suite_result, write_results
+from .runner import MeasureConfig, add_measure_arguments, measure, run_command
+from .stats import summarize
+
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One ``import time:`` line, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(stderr: str) -> list[ImportRecord]:
+    """Parse the ``import time:`` lines printed by ``-X importtime``."""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def summarize_imports(runs: list[list[ImportRecord]], top: int) -> dict:
+    """Aggregate several import profiles into medians per module and package."""
+    per_module: dict[str, list[int]] = {}
+    cumulative: dict[str, list[int]] = {}
+    totals = []
+    for records in runs:
+        totals.append(sum(r.self_us for r in records))
+        for r in records:
+            per_module.setdefault(r.module, []).append(r.self_us)
+            cumulative.setdefault(r.module, []).append(r.cumulative_us)
+
+    module_medians = {m: statistics.median(times) for m, times in per_module.items()}
+    packages: dict[str, float] = {}
+    for module, median in module_medians.items():
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + median
+
+    slowest = sorted(module_medians, key=module_medians.get, reverse=True)[:top]
+    return {
+        "unit": "microseconds",
+        "runs": len(runs),
+        "total": statistics.median(totals),
+        "modules_imported": len(module_medians),
+        "slowest_modules": [
+            {
+                "module": module,
+                "self": module_medians[module],
+                "cumulative": statistics.median(cumulative[module]),
+            }
+            for module in slowest
+        ],
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+    }
+
+
+def startup_commands(impl_config: dict, path: Path) -> dict[str, str]:
+    """Return the commands to time, keyed by name; ``version`` needs no input."""
+    commands = {}
+    if impl_config.get("version_command"):
+        commands["version"] = impl_config["version_command"]
+    for name, template in impl_config.get("commands", {}).items():
+        commands[name] = format_command(template, path, query=QUERIES[0].bql)
+    return commands
+
+
+def profile_imports(command: str, runs: int, timeout: float) -> list[list[ImportRecord]] | None:
+    """Run ``command`` with import profiling.
+
+    Returns an empty list if it is not Python and None if a run times out.
+    """
+    env = {**os.environ, "PYTHONPROFILEIMPORTTIME": "1"}
+    profiles = []
+    for _ in range(runs):
+        try:
+            result = subprocess.run(
+                command, shell=True, capture_output=True, text=True, timeout=timeout, env=env
+            )
+        except subprocess.TimeoutExpired:
+            return None
+        records = parse_import_times(result.stderr)
+        if not records:
+            return []
+        profiles.append(records)
+    return profiles
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``startup`` subcommand options."""
+    parser.add_argument(
+        "--impl",
+        default="beancount",
+        help="Implementation from tests/differential/config.json (default: beancount)",
+    )
+    parser.add_argument(
+        "--transactions",
+        type=int,
+        default=20,
+        help="Transactions in the tiny input ledger (default: 20)",
+    )
+    parser.add_argument(
+        "--import-runs",
+        type=int,
+        default=5,
+        help="Import-profiled runs per command (default: 5)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Modules and packages to report (default: 20)"
+    )
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--output", "-o", type=Path, help="Output file (default: stdout)")
+    add_measure_arguments(parser)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Time every command of one implementation on a tiny ledger."""
+    impl_config = load_implementations().get(args.impl)
+    if impl_config is None:
+        raise SystemExit(f"Error: Unknown implementation: {args.impl}")
+    config = MeasureConfig.from_args(args)
+    path = generate_ledger(
+        args.workdir / f"tiny-{args.transactions}.beancount",
+        *("--transactions", str(args.transactions), "--accounts", "20", "--commodities", "3"),
+    )
+
+    commands: dict[str, dict] = {}
+    failures = []
+    for name, command in startup_commands(impl_config, path).items():
+        exit_codes = set()
+
+        def invoke(_, command=command, exit_codes=exit_codes):
+            exit_codes.add(run_command(command, config.timeout_seconds).exit_code)
+
+        entry = {"command": command, "time": summarize(measure(invoke, config))}
+        if exit_codes != {0}:
+            entry["exit_codes"] = sorted(exit_codes)
+            # 127 is the shell's "command not found": the tool is not installed.
+            if exit_codes != {127}:
+                failures.append(name)
+            commands[name] = entry
+            print(f"{name:<10} exit {entry['exit_codes']}", file=sys.stderr)
+            continue
+        profiles = profile_imports(command, args.import_runs, config.timeout_seconds)
+        if profiles is None:
+            entry["error"] = f"import profiling timed out after {config.timeout_seconds:g} seconds"
+            failures.append(name)
+            commands[name] = entry
+            print(f"{name:<10} import profiling timed out", file=sys.stderr)
+            continue
+        if profiles:
+            entry["imports"] = summarize_imports(profiles, args.top)
+        commands[name] = entry
+        print(f"{name:<10} {entry['time']['median']:8.1f} ms", file=sys.stderr)
+
+    # Time to first result is the fastest successful command that reads the input.
+    succeeded = {name: entry for name, entry in commands.items() if "exit_codes" not in entry}
+    with_input = [entry for name, entry in succeeded.items() if name != "version"]
+    candidates = with_input or list(succeeded.values())
+    first = min(candidates, key=lambda e: e["time"]["median"]) if candidates else None
+    if first is None:
+        failures.append("all commands")
+    benchmark = benchmark_result(
+        "B000",
+        "startup",
+        input_info(path),
+        config.as_dict(),
+        {"time": first["time"] if first else None, "commands": commands},
+        status="failed" if failures else "passed",
+    )
+    if failures:
+        benchmark["error"] = f"non-zero exit or timeout from: {', '.join(failures)}"
+    document = suite_result(implementation_info(args.impl, impl_config), [benchmark])
+    write_results(document, args.output)
+    return 0 if not failures else 1
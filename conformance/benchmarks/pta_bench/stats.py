@@ -0,0 +1,134 @@
+"""Summary statistics for benchmark samples.
+
+Implements the statistical analysis and outlier handling described in
+``methodology.md``.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+
+# Two-sided 95% z value; the iteration floor keeps the normal approximation sane.
+Z_95 = 1.96
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) using linear interpolation."""
+    if not samples:
+        raise ValueError("percentile of empty sample list")
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def remove_outliers(samples: list[float], threshold: float = 3.0) -> tuple[list[float], int]:
+    """Drop samples more than ``threshold`` standard deviations from the mean.
+
+    Returns (kept samples, number of outliers removed).
+    """
+    if len(samples) < 3:
+        return list(samples), 0
+    mean = statistics.fmean(samples)
+    std_dev = statistics.stdev(samples)
+    if std_dev == 0:
+        return list(samples), 0
+    kept = [s for s in samples if abs(s - mean) <= threshold * std_dev]
+    return kept, len(samples) - len(kept)
+
+
+def relative_ci(samples: list[float]) -> float:
+    """Return the 95% confidence interval half-width as a fraction of the mean."""
+    if len(samples) < 2:
+        return math.inf
+    mean = statistics.fmean(samples)
+    if mean == 0:
+        return 0.0
+    return Z_95 * statistics.stdev(samples) / math.sqrt(len(samples)) / mean
+
+
+def summarize(samples: list[float], unit: str = "milliseconds") -> dict:
+    """Summarize raw samples in the ``results.time`` shape of the result schema.
+
+    Outliers are removed before computing statistics; the raw samples are kept
+    so that later comparisons can run statistical tests on them.
+    """
+    if not samples:
+        return {"unit": unit, "iterations": 0, "samples": []}
+
+    kept, outliers = remove_outliers(samples)
+    return {
+        "unit": unit,
+        "mean": round(statistics.fmean(kept), 4),
+        "median": round(statistics.median(kept), 4),
+        "std_dev": round(statistics.stdev(kept), 4) if len(kept) > 1 else 0.0,
+        "min": round(min(kept), 4),
+        "max": round(max(kept), 4),
+        "p95": round(percentile(kept, 95), 4),
+        "p99": round(percentile(kept, 99), 4),
+        "iterations": len(samples),
+        "outliers": outliers,
+        "samples": [round(s, 4) for s in samples],
+    }
+
+
+def _exact_u_cdf(u: float, n1: int, n2: int) -> float:
+    """Return P(U <= u) for the Mann-Whitney U statistic without ties."""
+    # counts[i][j][k]: arrangements of i + j samples with U = k
+    counts = [[[0] * (n1 * n2 + 1) for _ in range(n2 + 1)] for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        for j in range(n2 + 1):
+            if i == 0 or j == 0:
+                counts[i][j][0] = 1
+                continue
+            for k in range(i * j + 1):
+                above = counts[i - 1][j][k - j] if k >= j else 0
+                counts[i][j][k] = above + counts[i][j - 1][k]
+    total = math.comb(n1 + n2, n1)
+    return sum(counts[n1][n2][: math.floor(u) + 1]) / total
+
+
+def mann_whitney_greater(candidate: list[float], baseline: list[float]) -> float:
+    """One-sided Mann-Whitney U test that ``candidate`` tends to be larger.
+
+    Returns the p-value. Uses the exact distribution for small samples
+    without ties, and the normal approximation with tie and continuity
+    corrections otherwise.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Mann-Whitney test needs two non-empty samples")
+
+    # Rank the pooled samples, averaging ranks over ties.
+    pooled = sorted([(v, 0) for v in candidate] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied**3 - tied
+        i = j + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, pooled, strict=True) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+
+    if tie_term == 0 and n1 <= 20 and n2 <= 20:
+        # P(U >= u) = P(U <= n1*n2 - u) by symmetry
+        return _exact_u_cdf(n1 * n2 - u, n1, n2)
+
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
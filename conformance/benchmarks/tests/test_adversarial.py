@@ -0,0 +1,33 @@
+"""Tests for the adversarial input builders."""
+
+from __future__ import annotations
+
+import pytest
+
+from pta_bench.adversarial import PATHOLOGIES, classify
+
+beancount_loader = pytest.importorskip("beancount.loader")
+
+
+class TestPathologies:
+    @pytest.mark.parametrize("pathology", PATHOLOGIES, ids=lambda p: p.name)
+    def test_smallest_size_is_valid(self, pathology):
+        _entries, errors, _options = beancount_loader.load_string(
+            pathology.build(pathology.sizes[0])
+        )
+        assert errors == []
+
+    @pytest.mark.parametrize("pathology", PATHOLOGIES, ids=lambda p: p.name)
+    def test_input_grows_with_size(self, pathology):
+        small, large = pathology.sizes[:2]
+        assert len(pathology.build(large)) > len(pathology.build(small))
+
+    def test_grouped_number_digit_count(self):
+        text = PATHOLOGIES[5].build(10)
+        assert "9,999,999,999.00 USD" in text
+
+    def test_classify(self):
+        assert classify(0, "") == "accepted"
+        assert classify(1, "error") == "rejected"
+        assert classify(-9, "") == "crashed"
+        assert classify(-1, "Timeout after 60 seconds") == "timeout"
@@ -0,0 +1,194 @@
+"""Unit tests for the benchmark ledger generator."""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+import re
+import sys
+from datetime import date
+
+import pytest
+
+from pta_bench.ledgers import GENERATOR, profile_tag
+
+_spec = importlib.util.spec_from_file_location("generate_benchmark", GENERATOR)
+generator = importlib.util.module_from_spec(_spec)
+# The generator's dataclasses look their module up in sys.modules.
+sys.modules[_spec.name] = generator
+_spec.loader.exec_module(generator)
+
+
+def posted_accounts(journal) -> set[str]:
+    return {posting.account for txn in journal.transactions for posting in txn.postings}
+
+
+class TestProfiles:
+    def test_fallback_accounts_are_opened(self):
+        random.seed(1)
+        journal = generator.generate_journal(
+            transactions=50,
+            accounts=3,
+            commodities=1,
+            start_date=date(2020, 1, 1),
+            complexity="low",
+            profile=generator.Profile(),
+        )
+        assert "Expenses:Misc" in journal.accounts
+        assert posted_accounts(journal) <= set(journal.accounts)
+
+    def test_profiled_transactions_need_accounts(self):
+        with pytest.raises(ValueError):
+            generator.generate_profiled_transactions(
+                10, ["Assets:Bank:Checking"], ["USD"], date(2020, 1, 1), "low", generator.Profile()
+            )
+
+    def test_profile_tag_follows_contents(self, tmp_path):
+        profile = tmp_path / "household.json"
+        profile.write_text('{"zipf_exponent": 1.0}')
+        first = profile_tag(profile)
+        assert first.startswith("household-")
+        assert profile_tag(profile) == first
+        profile.write_text('{"zipf_exponent": 2.0}')
+        assert profile_tag(profile) != first
+
+
+def directive_lines(lines: list[str]) -> list[str]:
+    """Return the sorted directive lines, without includes, options and comments."""
+    return sorted(
+        line for line in lines if line.strip() and not line.startswith((";", "include", "option"))
+    )
+
+
+class TestIncludeTree:
+    @pytest.fixture
+    def journal(self):
+        random.seed(7)
+        return generator.generate_journal(
+            transactions=300,
+            accounts=40,
+            commodities=3,
+            start_date=date(2020, 6, 1),
+            complexity="medium",
+        )
+
+    @pytest.mark.parametrize("output_format", sorted(generator.SYNTAXES))
+    def test_same_directives_as_single_file(self, journal, tmp_path, output_format):
+        random.seed(8)
+        single = generator.format_journal(
+            journal, output_format, generator.generate_prices(journal)
+        )
+        random.seed(8)
+        paths = generator.write_include_tree(journal, output_format, tmp_path)
+        tree_lines = [line for path in paths for line in path.read_text().splitlines()]
+        assert any(line.endswith("USD") and "EUR" in line for line in tree_lines)
+        assert directive_lines(tree_lines) == directive_lines(single.splitlines())
+
+    def test_generate_file_prices(self):
+        arguments = dict(transactions=100, accounts=20, commodities=3, start_date=date(2020, 1, 1))
+        random.seed(1)
+        plain = generator.generate_file(complexity="low", **arguments)
+        random.seed(1)
+        priced = generator.generate_file(complexity="low", prices=True, **arguments)
+        extra = set(priced.splitlines()) - set(plain.splitlines())
+        assert extra and all(" price " in line for line in extra if line)
+
+    def test_layout(self, journal, tmp_path):
+        paths = generator.write_include_tree(journal, "beancount", tmp_path, fan_out=2, depth=3)
+        assert paths[0] == tmp_path / "main.beancount"
+        assert len(set(paths)) == len(paths)
+        included = set()
+        for path in paths:
+            includes = [
+                line.split('"')[1]
+                for line in path.read_text().splitlines()
+                if line.startswith("include")
+            ]
+            parts = sum(part.startswith("part-") for part in path.relative_to(tmp_path).parts)
+            if path.name == "index.beancount" and parts < 2:
+                # Only the indexes of the last level include more than fan_out files.
+                assert len(includes) <= 2
+            included.update((path.parent / name).resolve() for name in includes)
+        assert included == {path.resolve() for path in paths[1:]}
+
+    def test_repeat_includes(self, journal, tmp_path):
+        paths = generator.write_include_tree(journal, "beancount", tmp_path, repeat_includes=True)
+        year_indexes = [
+            path for path in paths if path.relative_to(tmp_path).parts[1:] == ("index.beancount",)
+        ]
+        assert year_indexes
+        for path in year_indexes:
+            assert 'include "../prices.beancount"' in path.read_text()
+
+    @pytest.mark.parametrize("fan_out, depth", [(1, 2), (4, 0)])
+    def test_rejects_degenerate_trees(self, journal, tmp_path, fan_out, depth):
+        with pytest.raises(ValueError):
+            generator.write_include_tree(journal, "beancount", tmp_path, fan_out, depth)
+
+
+class TestFormats:
+    @pytest.fixture
+    def journal(self):
+        random.seed(11)
+        return generator.generate_journal(
+            transactions=120,
+            accounts=40,
+            commodities=3,
+            start_date=date(2021, 1, 1),
+            complexity="high",
+        )
+
+    @pytest.fixture
+    def rendered(self, journal):
+        return {name: generator.format_journal(journal, name) for name in generator.SYNTAXES}
+
+    def test_same_transactions(self, journal, rendered):
+        headers = {
+            "beancount": r"^\d{4}-\d\d-\d\d [*!] ",
+            "ledger": r"^\d{4}/\d\d/\d\d [*!] ",
+            "hledger": r"^\d{4}-\d\d-\d\d [*!] ",
+        }
+        balances = sum(isinstance(txn, generator.Balance) for txn in journal.transactions)
+        assert balances == 1
+        for name, text in rendered.items():
+            count = len(re.findall(headers[name], text, re.MULTILINE))
+            # Ledger and hledger write balance assertions as transactions.
+            expected = len(journal.transactions) - (balances if name == "beancount" else 0)
+            assert count == expected, name
+
+    def test_commodities(self, rendered):
+        assert "1900-01-01 commodity EUR" in rendered["beancount"].splitlines()
+        assert "commodity EUR\n  format 1,000.00 EUR" in rendered["ledger"]
+        assert "commodity 1,000.00 EUR" in rendered["hledger"].splitlines()
+
+    def test_costs(self, rendered):
+        lots = re.findall(
+            r"  (\d+) ([A-Z]+) \{([\d.]+) USD\}$", rendered["beancount"], re.MULTILINE
+        )
+        assert lots
+        assert lots == re.findall(
+            r"  (\d+) ([A-Z]+) \{([\d.]+) USD\}$", rendered["ledger"], re.MULTILINE
+        )
+        # hledger has no lot syntax: the cost becomes a price annotation.
+        assert "{" not in rendered["hledger"]
+        for shares, stock, cost in lots:
+            assert f"  {shares} {stock} @ {cost} USD" in rendered["hledger"]
+
+    def test_prices(self, rendered):
+        prices = {
+            name: re.findall(r"[\d.]+ [A-Z]+ @ [\d.]+ USD$", text, re.MULTILINE)
+            for name, text in rendered.items()
+        }
+        assert prices["beancount"]
+        assert prices["beancount"] == prices["ledger"]
+        # The hledger list also holds the costs written as prices.
+        assert set(prices["beancount"]) < set(prices["hledger"])
+
+    def test_balance_assertions(self, rendered):
+        assert "2021-01-01 balance Assets:Bank:Checking  10000.00 USD" in rendered["beancount"]
+        # Ledger and hledger check after the posting, so a day earlier.
+        assertion = "* Balance assertion\n  Assets:Bank:Checking  0 USD = 10000.00 USD"
+        assert f"2020/12/31 {assertion}" in rendered["ledger"]
+        assert f"2020-12-31 {assertion}" in rendered["hledger"]
+        for name in ("ledger", "hledger"):
+            assert not re.search(r"^\S+ balance ", rendered[name], re.MULTILINE)
@@ -0,0 +1,81 @@
+"""Unit tests for the benchmark history store and regression gate."""
+
+from __future__ import annotations
+
+import random
+
+from pta_bench.history import HistoryStore, compare
+
+
+def _document(
+    version: str, mean: float, timestamp: str, seed: int = 0, unit: str = "milliseconds"
+) -> dict:
+    rng = random.Random(seed)
+    samples = [rng.gauss(mean, mean * 0.01) for _ in range(20)]
+    return {
+        "suite": "pta-benchmarks-v1",
+        "timestamp": timestamp,
+        "implementation": {"name": "beancount", "version": version, "commit": None},
+        "environment": {"os": "Linux", "cpu": "test", "cores": 4, "ram_gb": 8},
+        "benchmarks": [
+            {"benchmark_id": "B101", "results": {"time": {"unit": unit, "samples": samples}, "rows": 3}},
+        ],
+    }
+
+
+class TestCompare:
+    def test_detects_regression(self):
+        comparisons = compare(_document("1", 100, "t1"), _document("2", 120, "t2", seed=1))
+        assert len(comparisons) == 1
+        assert comparisons[0].regression
+        assert comparisons[0].change_pct > 15
+
+    def test_same_distribution_is_not_a_regression(self):
+        comparisons = compare(_document("1", 100, "t1"), _document("2", 100, "t2", seed=1))
+        assert not comparisons[0].regression
+
+    def test_threshold_ignores_small_significant_changes(self):
+        comparisons = compare(
+            _document("1", 100, "t1"), _document("2", 103, "t2", seed=1), threshold_pct=5.0
+        )
+        assert comparisons[0].p_value < 0.05
+        assert not comparisons[0].regression
+
+    def test_faster_is_not_a_regression(self):
+        comparisons = compare(_document("1", 120, "t1"), _document("2", 100, "t2", seed=1))
+        assert comparisons[0].p_value > 0.5
+        assert not comparisons[0].regression
+
+    def test_rates_regress_when_they_drop(self):
+        unit = "transactions_per_second"
+        baseline = _document("1", 1000, "t1", unit=unit)
+        faster = compare(baseline, _document("2", 1200, "t2", seed=1, unit=unit))
+        assert faster[0].higher_is_better
+        assert not faster[0].regression
+        slower = compare(baseline, _document("2", 800, "t2", seed=1, unit=unit))
+        assert slower[0].regression
+        assert slower[0].p_value < 0.05
+        assert slower[0].change_pct < -15
+
+
+class TestHistoryStore:
+    def test_record_is_idempotent(self, tmp_path):
+        store = HistoryStore(tmp_path / "history.sqlite")
+        document = _document("1", 100, "2024-01-01T00:00:00Z")
+        assert store.record(document) is not None
+        assert store.record(document) is None
+        assert len(store.runs()) == 1
+        store.close()
+
+    def test_find_baseline(self, tmp_path):
+        store = HistoryStore(tmp_path / "history.sqlite")
+        old = _document("1", 100, "2024-01-01T00:00:00Z")
+        newer = _document("2", 100, "2024-02-01T00:00:00Z", seed=1)
+        candidate = _document("3", 100, "2024-03-01T00:00:00Z", seed=2)
+        store.record(old)
+        store.record(newer)
+        store.record(candidate)
+
+        assert store.find_baseline(candidate) == newer
+        assert store.find_baseline(candidate, version="1") == old
+        store.close()
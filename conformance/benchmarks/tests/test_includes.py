@@ -0,0 +1,65 @@
+"""Unit tests for the include benchmarks."""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+import sys
+from datetime import date
+
+import pytest
+
+from pta_bench.includes import _point, loaded_files
+from pta_bench.ledgers import GENERATOR
+
+_spec = importlib.util.spec_from_file_location("generate_benchmark", GENERATOR)
+generator = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = generator
+_spec.loader.exec_module(generator)
+
+
+def variant(median: float, files: int = 1) -> dict:
+    return {"time": {"median": median, "mean": median}, "files": files}
+
+
+class TestPoint:
+    def test_overhead(self):
+        point = _point(1000, {"single": variant(40.0), "tree": variant(52.0, files=24)})
+        assert point["size"] == 1000
+        assert point["files"] == 24
+        assert point["single_ms"] == 40.0
+        assert point["tree_ms"] == 52.0
+        assert point["overhead_ms"] == 12.0
+        assert point["overhead_per_file_ms"] == pytest.approx(0.5)
+        assert point["tree"] == {"median": 52.0, "mean": 52.0}
+
+    def test_faster_tree(self):
+        point = _point(1000, {"single": variant(40.0), "tree": variant(30.0, files=10)})
+        assert point["overhead_per_file_ms"] == pytest.approx(-1.0)
+
+
+class TestLoadedFiles:
+    @pytest.fixture
+    def journal(self):
+        random.seed(3)
+        return generator.generate_journal(
+            transactions=200,
+            accounts=30,
+            commodities=3,
+            start_date=date(2020, 6, 1),
+            complexity="low",
+        )
+
+    @pytest.mark.parametrize("repeat_includes", [False, True])
+    def test_tree(self, journal, tmp_path, repeat_includes):
+        paths = generator.write_include_tree(
+            journal, "beancount", tmp_path / "tree", repeat_includes=repeat_includes
+        )
+        assert loaded_files(paths[0]) == len(paths)
+
+    def test_single_file_among_others(self, journal, tmp_path):
+        generator.write_include_tree(journal, "beancount", tmp_path / "tree")
+        single = tmp_path / "single.beancount"
+        single.write_text(generator.format_journal(journal, "beancount"))
+        (tmp_path / "other.beancount").write_text("")
+        assert loaded_files(single) == 1
@@ -0,0 +1,213 @@
+"""Unit tests for the incremental benchmark's edit scripts and LSP client."""
+
+from __future__ import annotations
+
+import sys
+import textwrap
+import time
+
+import pytest
+
+from pta_bench.incremental import (
+    EDIT_KINDS,
+    LspTarget,
+    apply_changes,
+    generate_edit_script,
+)
+from pta_bench.lsp import SYNC_INCREMENTAL, LspClient, LspError
+
+LEDGER = textwrap.dedent(
+    """\
+    2020-01-01 open Assets:Bank:Checking
+    2020-01-01 open Expenses:Food
+    2020-01-01 open Expenses:Rent
+
+    2020-01-02 * "Grocer" "Food"
+      Expenses:Food  12.50 USD
+      Expenses:Rent  100.00 USD
+      Assets:Bank:Checking
+
+    2020-01-03 * "Landlord" "Rent"
+      Expenses:Rent  900.00 USD
+      Assets:Bank:Checking  -900.00 USD
+    """
+)
+
+# A language server publishing diagnostics for every didOpen and didChange.
+# After the didOpen ones it publishes diagnostics that do not answer the next
+# didChange: unversioned ones in "unversioned" mode, like a server revalidating
+# in the background, and ones for a later version in "versioned" mode.
+FAKE_SERVER = textwrap.dedent(
+    """\
+    import json, sys
+
+    mode, change = sys.argv[1], int(sys.argv[2])
+
+    def read():
+        length = None
+        while True:
+            line = sys.stdin.buffer.readline()
+            if not line:
+                sys.exit(0)
+            if not line.strip():
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(sys.stdin.buffer.read(length))
+
+    def send(message):
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        sys.stdout.buffer.write(b"Content-Length: %d\\r\\n\\r\\n" % len(body) + body)
+        sys.stdout.buffer.flush()
+
+    def publish(document, label):
+        params = {"uri": document["uri"], "diagnostics": [{"message": label}]}
+        if mode == "versioned":
+            params["version"] = document["version"]
+        send({"method": "textDocument/publishDiagnostics", "params": params})
+
+    while True:
+        message = read()
+        method = message.get("method")
+        if method == "initialize":
+            capabilities = {}
+            if change >= 0:
+                capabilities["textDocumentSync"] = {"openClose": True, "change": change}
+            send({"id": message["id"], "result": {"capabilities": capabilities}})
+        elif method == "shutdown":
+            send({"id": message["id"], "result": None})
+        elif method == "exit":
+            sys.exit(0)
+        elif method == "textDocument/didOpen":
+            document = message["params"]["textDocument"]
+            send({"id": "config", "method": "workspace/configuration", "params": {}})
+            publish(document, "open")
+            if mode == "unversioned":
+                publish(document, "open again")
+            else:
+                publish(dict(document, version=document["version"] + 5), "future")
+        elif method == "textDocument/didChange":
+            document = message["params"]["textDocument"]
+            text = message["params"]["contentChanges"][-1]["text"]
+            publish(document, "change " + text)
+    """
+)
+
+
+class TestApplyChanges:
+    def test_ranges(self):
+        text = "one\ntwo\nthree\n"
+        changes = [
+            {
+                "range": {"start": {"line": 1, "character": 0}, "end": {"line": 2, "character": 0}},
+                "text": "",
+            },
+            {
+                "range": {"start": {"line": 0, "character": 1}, "end": {"line": 0, "character": 3}},
+                "text": "NE",
+            },
+        ]
+        assert apply_changes(text, changes) == "oNE\nthree\n"
+
+    def test_full_replacement(self):
+        assert apply_changes("old", [{"text": "new"}, {"text": "newer"}]) == "newer"
+
+    def test_past_the_end(self):
+        change = {
+            "range": {"start": {"line": 9, "character": 0}, "end": {"line": 9, "character": 0}},
+            "text": "appended\n",
+        }
+        assert apply_changes("one\n", [change]) == "one\nappended\n"
+
+    def test_character_clamped_to_text(self):
+        change = {
+            "range": {"start": {"line": 0, "character": 99}, "end": {"line": 0, "character": 99}},
+            "text": "!",
+        }
+        assert apply_changes("one", [change]) == "one!"
+
+
+class TestGenerateEditScript:
+    @pytest.fixture
+    def source(self, tmp_path):
+        path = tmp_path / "ledger.beancount"
+        path.write_text(LEDGER)
+        return path
+
+    def test_reproducible(self, source):
+        first = generate_edit_script(source, 30, seed=3)
+        assert first == generate_edit_script(source, 30, seed=3)
+        assert first != generate_edit_script(source, 30, seed=4)
+        assert len(first["edits"]) == 30
+        assert first["edits"][0]["kind"] == "append"
+        assert {edit["kind"] for edit in first["edits"]} <= set(EDIT_KINDS)
+
+    def test_mix(self, source):
+        script = generate_edit_script(source, 10, seed=1, mix={"rename-account": 1})
+        assert [edit["kind"] for edit in script["edits"][1:]] == ["rename-account"] * 9
+
+    def test_edits_apply_in_order(self, source):
+        script = generate_edit_script(source, 40, seed=5)
+        text = LEDGER
+        for edit in script["edits"]:
+            before = text
+            text = apply_changes(text, edit["changes"])
+            assert text != before or not edit["changes"]
+        assert text.count("Appended transaction") == sum(
+            edit["kind"] == "append" for edit in script["edits"]
+        )
+
+    def test_needs_accounts(self, tmp_path):
+        path = tmp_path / "empty.beancount"
+        path.write_text("2020-01-01 open Income:Salary\n")
+        with pytest.raises(ValueError):
+            generate_edit_script(path, 1, seed=0)
+
+
+class TestLsp:
+    def target(self, tmp_path, mode: str, change: int = SYNC_INCREMENTAL) -> LspTarget:
+        server = tmp_path / "server.py"
+        server.write_text(FAKE_SERVER)
+        return LspTarget(f"{sys.executable} {server} {mode} {change}", timeout=5)
+
+    def change(self, target: LspTarget, text: str, version: int) -> list[dict]:
+        client: LspClient = target.client
+        params = {
+            "textDocument": {"uri": target.uri, "version": version},
+            "contentChanges": [{"text": text}],
+        }
+        sent = time.perf_counter()
+        client.notify("textDocument/didChange", params)
+        return client.wait_for_diagnostics(target.uri, version, sent)
+
+    @pytest.mark.parametrize("mode", ["versioned", "unversioned"])
+    def test_waits_for_the_changed_version(self, tmp_path, mode):
+        target = self.target(tmp_path, mode)
+        try:
+            target.open(tmp_path / "ledger.beancount", LEDGER)
+            # Let the extra diagnostics arrive before the change is sent.
+            time.sleep(0.2)
+            diagnostics = self.change(target, "edited", 1)
+            assert diagnostics == [{"message": "change edited"}]
+        finally:
+            target.close()
+
+    def test_apply(self, tmp_path):
+        target = self.target(tmp_path, "versioned")
+        try:
+            target.open(tmp_path / "ledger.beancount", LEDGER)
+            elapsed, ok = target.apply(tmp_path / "ledger.beancount", "new", [{"text": "new"}], 1)
+            assert ok and elapsed >= 0
+        finally:
+            target.close()
+
+    # -1 makes the server advertise no textDocumentSync, which means none.
+    @pytest.mark.parametrize("change", [0, -1])
+    def test_rejects_sync_none(self, tmp_path, change):
+        target = self.target(tmp_path, "versioned", change=change)
+        try:
+            with pytest.raises(LspError):
+                target.open(tmp_path / "ledger.beancount", LEDGER)
+        finally:
+            target.close()
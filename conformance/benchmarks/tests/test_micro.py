@@ -0,0 +1,27 @@
+"""Tests for the core primitive micro-benchmarks."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pta_bench.micro import MICROS, calibrate
+
+pytest.importorskip("beancount")
+
+
+class TestMicro:
+    @pytest.mark.parametrize("micro", MICROS, ids=lambda m: m.name)
+    def test_setup_runs(self, micro):
+        fn = micro.setup(20, random.Random(1), 3)
+        fn()
+
+    def test_inputs_are_seeded(self):
+        first = MICROS[0].setup(50, random.Random(7), 3)()
+        second = MICROS[0].setup(50, random.Random(7), 3)()
+        assert first == second
+
+    def test_calibrate_reaches_batch_time(self):
+        assert calibrate(lambda: None, 0.001) > 1
+        assert calibrate(lambda: sum(range(100_000)), 0.0) == 1
@@ -0,0 +1,90 @@
+"""Tests for profile capture and report writing."""
+
+from __future__ import annotations
+
+import json
+import pstats
+
+import pytest
+
+from pta_bench.profiling import Profiler, collapse_pstats
+from pta_bench.runner import MeasureConfig, measure
+
+
+def _work(n: int) -> list[str]:
+    return [str(i) * 10 for i in range(n)]
+
+
+class TestCpuProfiler:
+    def test_aggregates_labels_and_writes_reports(self, tmp_path):
+        profiler = Profiler("cpu", top=5)
+        for _ in range(3):
+            with profiler.capture("first"):
+                _work(20000)
+        with profiler.capture("second"):
+            _work(100)
+
+        written = profiler.write_reports(tmp_path / "results")
+        assert sorted(p.name for p in written) == [
+            "results.cpu.folded",
+            "results.cpu.json",
+            "results.cpu.pstats",
+            "results.cpu.txt",
+        ]
+        summary = json.loads((tmp_path / "results.cpu.json").read_text())
+        assert summary["labels"]["first"]["runs"] == 3
+        assert summary["labels"]["second"]["runs"] == 1
+
+        stats = pstats.Stats(str(tmp_path / "results.cpu.pstats"))
+        calls = {name: entry[1] for (_, _, name), entry in stats.stats.items()}
+        assert calls["_work"] == 4
+
+    def test_folded_stacks_end_in_leaf_functions(self, tmp_path):
+        profiler = Profiler("cpu")
+        with profiler.capture("work"):
+            _work(50000)
+        profiler.write_reports(tmp_path / "results")
+        lines = (tmp_path / "results.cpu.folded").read_text().splitlines()
+        assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+        assert any(line.startswith("_work (test_profiling.py:") for line in lines)
+
+    def test_collapse_conserves_own_time(self):
+        profiler = Profiler("cpu")
+        with profiler.capture("work"):
+            _work(50000)
+        stats = profiler._stats
+        total_us = sum(entry[2] for entry in stats.stats.values()) * 1e6
+        assert sum(collapse_pstats(stats).values()) == pytest.approx(total_us, rel=0.05)
+
+
+class TestAllocProfiler:
+    def test_reports_live_allocation_sites(self, tmp_path):
+        profiler = Profiler("alloc", top=3)
+        kept = []
+        with profiler.capture("work"):
+            kept.append(_work(10000))
+
+        profiler.write_reports(tmp_path / "results")
+        summary = json.loads((tmp_path / "results.alloc.json").read_text())
+        assert summary["labels"]["work"]["net_bytes"] > 100_000
+        assert summary["labels"]["work"]["peak_bytes"] > 100_000
+        assert "test_profiling.py" in (tmp_path / "results.alloc.txt").read_text()
+        folded = (tmp_path / "results.alloc.folded").read_text()
+        assert any(
+            line.split(" ")[0].endswith("test_profiling.py:15") for line in folded.splitlines()
+        )
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        Profiler("wall")
+
+
+def test_measure_profiles_measured_iterations_only():
+    profiler = Profiler("cpu")
+    config = MeasureConfig(
+        warm_up_iterations=2, min_iterations=3, max_iterations=3, profiler=profiler
+    )
+    measure(lambda _: _work(10), config, label="bench")
+    assert profiler.labels["bench"]["runs"] == 3
+    assert config.as_dict()["profile"] == "cpu"
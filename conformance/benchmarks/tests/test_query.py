@@ -0,0 +1,99 @@
+"""Unit tests for the query benchmark catalog."""
+
+from __future__ import annotations
+
+import shlex
+import sys
+import textwrap
+from datetime import date
+
+import pytest
+
+from pta_bench.query import QUERIES, bench_command, date_window, run_query_benchmark
+from pta_bench.runner import MeasureConfig
+
+LEDGER = textwrap.dedent(
+    """\
+    1900-01-01 commodity USD
+    2019-12-31 open Assets:Cash
+    2019-12-31 open Expenses:Food
+
+    2020-01-01 * "First"
+      Expenses:Food  1 USD
+      Assets:Cash
+
+    2020-03-01 balance Assets:Cash  -1 USD
+
+    2020-05-01 txn "Middle"
+      Expenses:Food  2 USD
+      Assets:Cash
+
+    2020-09-01 ! "Last"
+      Expenses:Food  3 USD
+      Assets:Cash
+    """
+)
+
+# Appends the file and query arguments it is given to <file>.args
+RECORD = "import sys; open(sys.argv[1] + '.args', 'a').write(repr(sys.argv[1:]))"
+
+CONFIG = MeasureConfig(warm_up_iterations=0, min_iterations=2, max_iterations=2)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    path = tmp_path / "ledger with spaces.beancount"
+    path.write_text(LEDGER)
+    return path
+
+
+class TestCatalog:
+    def test_ids(self):
+        assert [q.benchmark_id for q in QUERIES] == ["B101", "B102", "B103"]
+        assert len({q.name for q in QUERIES}) == len(QUERIES)
+
+    def test_queries_fit_quoted_templates(self):
+        assert not any("'" in q.bql for q in QUERIES)
+
+    def test_date_window(self, ledger):
+        # The middle half of 2020-01-01..2020-09-01, ignoring other directives
+        assert date_window(ledger) == (date(2020, 3, 2), date(2020, 7, 3))
+
+    def test_single_day(self, tmp_path):
+        path = tmp_path / "one.beancount"
+        path.write_text('2021-06-01 * "Only"\n')
+        assert date_window(path) == (date(2021, 6, 1), date(2021, 6, 2))
+
+    def test_text(self, ledger):
+        simple, dated, _ = QUERIES
+        assert simple.text(ledger) == simple.bql
+        assert dated.text(ledger).endswith("WHERE date >= 2020-03-02 AND date < 2020-07-03")
+
+
+class TestCommands:
+    def test_query_command(self, ledger):
+        template = f"{shlex.quote(sys.executable)} -c {shlex.quote(RECORD)} {{file}} '{{query}}'"
+        results = bench_command({"commands": {"query": template}}, ledger, QUERIES[1], CONFIG)
+        assert "error" not in results
+        assert results["time"] is None
+        recorded = ledger.with_name(ledger.name + ".args").read_text()
+        assert recorded.count(repr([str(ledger), QUERIES[1].bql])) == 2
+
+    def test_failing_command(self, ledger):
+        results = bench_command({"commands": {"query": "exit 3"}}, ledger, QUERIES[0], CONFIG)
+        assert results["error"] == "exit code 3"
+
+    def test_benchmark_records_query_as_run(self, ledger):
+        template = f"{shlex.quote(sys.executable)} -c {shlex.quote(RECORD)} {{file}} '{{query}}'"
+        impl_config = {"commands": {"query": template}}
+        result = run_query_benchmark("cli", impl_config, ledger, QUERIES[1], CONFIG)
+        assert result["status"] == "passed"
+        assert result["query"] == QUERIES[1].text(ledger)
+        recorded = ledger.with_name(ledger.name + ".args").read_text()
+        assert "2020-03-02" in recorded
+
+    def test_ledger_without_transactions(self, tmp_path):
+        path = tmp_path / "empty.beancount"
+        path.write_text("2020-01-01 open Assets:Cash\n")
+        result = run_query_benchmark("cli", {}, path, QUERIES[1], CONFIG)
+        assert result["status"] == "failed"
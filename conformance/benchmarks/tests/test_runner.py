@@ -0,0 +1,30 @@
+"""Tests for measured command execution."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from pta_bench.runner import run_measured
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+
+
+class TestRunMeasured:
+    def test_reports_exit_code_and_output(self):
+        result = run_measured("echo hello; exit 3")
+        assert result.exit_code == 3
+        assert result.stdout == "hello\n"
+        assert result.peak_rss_mb is not None
+
+    def test_peak_excludes_parent_memory(self):
+        ballast = bytearray(256 * 1024 * 1024)
+        result = run_measured([sys.executable, "-c", "x = bytearray(64 * 1024 * 1024)"])
+        assert 64 <= result.peak_rss_mb < 256
+        del ballast
+
+    def test_timeout(self):
+        result = run_measured("sleep 5", timeout=0.2)
+        assert result.exit_code == -1
+        assert result.stderr.startswith("Timeout")
@@ -0,0 +1,59 @@
+"""Unit tests for scaling-curve fitting."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pytest
+
+from pta_bench import scaling
+from pta_bench.scaling import _run_checked, add_arguments, fit_exponent, geometric_sizes
+
+
+class TestScaling:
+    def test_geometric_sizes(self):
+        assert geometric_sizes(1000, 16000, 2) == [1000, 2000, 4000, 8000, 16000]
+        assert geometric_sizes(1000, 15999, 2) == [1000, 2000, 4000, 8000]
+
+    def test_geometric_sizes_rejects_non_growing_factor(self):
+        with pytest.raises(ValueError):
+            geometric_sizes(1000, 16000, 1)
+
+    @pytest.mark.parametrize("exponent", [1.0, 1.5, 2.0])
+    def test_fit_recovers_power_law(self, exponent):
+        sizes = [1000, 2000, 4000, 8000]
+        fit = fit_exponent(sizes, [3.0 * n**exponent for n in sizes])
+        assert fit.exponent == pytest.approx(exponent)
+        assert fit.r_squared == pytest.approx(1.0)
+
+    def test_fit_needs_two_points(self):
+        with pytest.raises(ValueError):
+            fit_exponent([1000], [1.0])
+
+    def test_tail_needs_two_sizes(self):
+        parser = argparse.ArgumentParser()
+        add_arguments(parser)
+        assert parser.parse_args(["--tail", "2"]).tail == 2
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--tail", "1"])
+
+    def test_timeout_with_open_output(self):
+        # A leftover child holding stdout open must not delay the timeout.
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError):
+            _run_checked("(sleep 5; echo late) & sleep 5", timeout=0.3)
+        assert time.perf_counter() - start < 3
+
+    def test_failed_size_exits_with_error(self, tmp_path, monkeypatch):
+        def fail(path, iterations, timeout):
+            raise RuntimeError("Command failed (-1): worker")
+
+        monkeypatch.setattr(scaling, "measure_beancount", fail)
+        parser = argparse.ArgumentParser()
+        add_arguments(parser)
+        args = parser.parse_args(
+            ["--min-size", "10", "--max-size", "20", "--workdir", str(tmp_path)]
+        )
+        with pytest.raises(SystemExit, match="10 transactions: Command failed"):
+            scaling.run(args)
@@ -0,0 +1,55 @@
+"""Tests for import-time profiling in the start-up benchmark."""
+
+from __future__ import annotations
+
+import shlex
+import sys
+
+from pta_bench.startup import parse_import_times, profile_imports, summarize_imports
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       181 |        181 |   _io
+import time:       528 |       1166 | _frozen_importlib_external
+import time:       300 |        300 |     beancount.core.number
+import time:       818 |       1118 |   beancount.core
+import time:       200 |       1318 | beancount
+some unrelated stderr output
+"""
+
+
+class TestImportTimes:
+    def test_parse(self):
+        records = parse_import_times(SAMPLE)
+        assert [r.module for r in records] == [
+            "_io",
+            "_frozen_importlib_external",
+            "beancount.core.number",
+            "beancount.core",
+            "beancount",
+        ]
+        assert records[2].self_us == 300
+        assert records[2].depth == 2
+        assert records[1].cumulative_us == 1166
+
+    def test_summarize(self):
+        records = parse_import_times(SAMPLE)
+        summary = summarize_imports([records, records], top=2)
+        assert summary["runs"] == 2
+        assert summary["total"] == 181 + 528 + 300 + 818 + 200
+        assert summary["packages"] == {"beancount": 1318, "_frozen_importlib_external": 528}
+        assert summary["slowest_modules"][0]["module"] == "beancount.core"
+
+
+class TestProfileImports:
+    def test_python_command(self):
+        command = f"{shlex.quote(sys.executable)} -c 'import json'"
+        profiles = profile_imports(command, runs=2, timeout=30)
+        assert len(profiles) == 2
+        assert "json" in {r.module for r in profiles[0]}
+
+    def test_not_python(self):
+        assert profile_imports("true", runs=2, timeout=30) == []
+
+    def test_timeout(self):
+        assert profile_imports("sleep 5", runs=2, timeout=0.2) is None
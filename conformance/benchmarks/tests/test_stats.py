@@ -0,0 +1,49 @@
+"""Unit tests for benchmark statistics."""
+
+from __future__ import annotations
+
+import pytest
+
+from pta_bench.stats import mann_whitney_greater, percentile, remove_outliers, summarize
+
+
+class TestSummaries:
+    def test_percentile_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+        assert percentile([5.0], 99) == 5.0
+
+    def test_percentile_empty(self):
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+    def test_remove_outliers(self):
+        samples = [10.0] * 20 + [11.0] * 20 + [1000.0]
+        kept, removed = remove_outliers(samples)
+        assert removed == 1
+        assert 1000.0 not in kept
+
+    def test_summarize_keeps_raw_samples(self):
+        summary = summarize([3.0, 1.0, 2.0])
+        assert summary["unit"] == "milliseconds"
+        assert summary["median"] == 2.0
+        assert summary["iterations"] == 3
+        assert summary["samples"] == [3.0, 1.0, 2.0]
+
+
+class TestMannWhitney:
+    def test_exact_small_samples(self):
+        # All candidate samples above all baseline samples: p = 1 / C(6, 3)
+        assert mann_whitney_greater([4.0, 5.0, 6.0], [1.0, 2.0, 3.0]) == pytest.approx(1 / 20)
+
+    def test_no_shift_is_not_significant(self):
+        assert mann_whitney_greater([1.0, 3.0, 5.0], [2.0, 4.0, 6.0]) > 0.5
+
+    def test_ties_use_normal_approximation(self):
+        candidate = [1.0, 2.0, 2.0, 3.0, 3.0, 3.0, 4.0, 9.0]
+        baseline = [1.0, 1.0, 2.0, 2.0, 3.0, 2.0, 1.0, 0.0, 0.0]
+        # Reference value from scipy.stats.mannwhitneyu(alternative="greater")
+        assert mann_whitney_greater(candidate, baseline) == pytest.approx(0.0101614, abs=1e-6)
+
+    def test_empty_sample(self):
+        with pytest.raises(ValueError):
+            mann_whitney_greater([], [1.0])
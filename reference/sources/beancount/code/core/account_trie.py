@@ -0,0 +1,140 @@
+"""A trie of account names, for matching accounts against their parents.
+
+Questions like "is this account under one of these accounts?" are otherwise
+answered with one account.parent_matcher() regular expression per parent
+account, which costs O(accounts × parents) to answer for all the accounts of a
+ledger. An AccountTrie stores a set of account names by their components, once,
+and answers these questions by walking the components of the account, in time
+proportional to its depth.
+"""
+
+from __future__ import annotations
+
+__license__ = "GNU GPLv2"
+
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from beancount.core.account import Account
+from beancount.core.account import sep
+
+# The key under which a node stores the account name it was added as. Account
+# components are strings, so this never collides with a child.
+_NAME = None
+
+
+class AccountTrie:
+    """A set of account names, organized by their components.
+
+    Each node is a dict of account components to child nodes. A node for an
+    account which was added to the set also holds its name under the _NAME key;
+    other nodes are only there to hold the path to their children.
+    """
+
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, accounts: Iterable[Account] = ()):
+        """Create a trie.
+
+        Args:
+          accounts: An optional iterable of account names to add.
+        """
+        self._root: dict = {}
+        self._count = 0
+        for account_name in accounts:
+            self.add(account_name)
+
+    def add(self, account_name: Account) -> None:
+        """Add an account name to the set.
+
+        Args:
+          account_name: A string, the name of the account.
+        """
+        node = self._root
+        for component in account_name.split(sep):
+            child = node.get(component)
+            if child is None:
+                child = node[component] = {}
+            node = child
+        if _NAME not in node:
+            node[_NAME] = account_name
+            self._count += 1
+
+    def _find(self, account_name: Account) -> dict | None:
+        node = self._root
+        for component in account_name.split(sep):
+            node = node.get(component)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, account_name: Account) -> bool:
+        node = self._find(account_name)
+        return node is not None and _NAME in node
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Account]:
+        return self._iter_names(self._root)
+
+    def _iter_names(self, node: dict) -> Iterator[Account]:
+        """Iterate over the account names under a node, in sorted order."""
+        name = node.get(_NAME)
+        if name is not None:
+            yield name
+        for component in sorted(key for key in node if key is not _NAME):
+            yield from self._iter_names(node[component])
+
+    def parents(self, account_name: Account) -> list[Account]:
+        """Return the accounts of the set which are this account or its parents.
+
+        Args:
+          account_name: A string, the name of an account, which need not be in
+            the set.
+        Returns:
+          A list of account names, from the root down to the account itself.
+        """
+        found = []
+        node = self._root
+        for component in account_name.split(sep):
+            node = node.get(component)
+            if node is None:
+                break
+            name = node.get(_NAME)
+            if name is not None:
+                found.append(name)
+        return found
+
+    def is_under(self, account_name: Account) -> bool:
+        """Return true if the account or one of its parents is in the set.
+
+        This is the same as calling the account.parent_matcher() predicates of
+        all the accounts of the set on this account.
+
+        Args:
+          account_name: A string, the name of an account.
+        Returns:
+          A boolean.
+        """
+        node = self._root
+        for component in account_name.split(sep):
+            node = node.get(component)
+            if node is None:
+                return False
+            if _NAME in node:
+                return True
+        return False
+
+    def subaccounts(self, account_name: Account) -> list[Account]:
+        """Return the accounts of the set which are this account or under it.
+
+        Args:
+          account_name: A string, the name of the parent account.
+        Returns:
+          A sorted list of account names.
+        """
+        node = self._find(account_name)
+        if node is None:
+            return []
+        return list(self._iter_names(node))
@@ -0,0 +1,84 @@
+__license__ = "GNU GPLv2"
+
+import random
+import unittest
+
+from beancount.core import account
+from beancount.core.account_trie import AccountTrie
+
+
+class TestAccountTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = AccountTrie(["Assets:A", "Assets:A:Checking", "Liabilities", "Assets:B:Cash"])
+
+    def test_contains(self):
+        for name in ("Assets:A", "Assets:A:Checking", "Liabilities", "Assets:B:Cash"):
+            self.assertIn(name, self.trie)
+        # Intermediate nodes and prefixes of a component are not in the set.
+        for name in ("Assets", "Assets:B", "Assets:AB", "Assets:A:Check", "Liabilities:Card"):
+            self.assertNotIn(name, self.trie)
+
+    def test_empty(self):
+        trie = AccountTrie()
+        self.assertEqual(0, len(trie))
+        self.assertEqual([], list(trie))
+        self.assertNotIn("Assets", trie)
+        self.assertFalse(trie.is_under("Assets"))
+        self.assertEqual([], trie.parents("Assets"))
+        self.assertEqual([], trie.subaccounts("Assets"))
+
+    def test_duplicates(self):
+        self.trie.add("Assets:A")
+        self.trie.add("Assets:B:Cash")
+        self.assertEqual(4, len(self.trie))
+        self.assertEqual(2, len(AccountTrie(["Assets", "Assets", "Assets:A", "Assets:A"])))
+
+    def test_iteration_order(self):
+        trie = AccountTrie(["Assets:A-B", "Assets:A:X", "Assets:A", "Equity", "Assets"])
+        # Sorted by components, so a child comes right after its parent.
+        self.assertEqual(["Assets", "Assets:A", "Assets:A:X", "Assets:A-B", "Equity"], list(trie))
+
+    def test_is_under(self):
+        self.assertTrue(self.trie.is_under("Assets:A"))
+        self.assertTrue(self.trie.is_under("Assets:A:Savings"))
+        self.assertTrue(self.trie.is_under("Assets:B:Cash:Wallet"))
+        self.assertTrue(self.trie.is_under("Liabilities:Card"))
+        self.assertFalse(self.trie.is_under("Assets"))
+        self.assertFalse(self.trie.is_under("Assets:AB"))
+        self.assertFalse(self.trie.is_under("Assets:B"))
+        self.assertFalse(self.trie.is_under("Assets:B:Cashbox"))
+        self.assertFalse(self.trie.is_under("Income"))
+
+    def test_parents(self):
+        self.assertEqual(["Assets:A", "Assets:A:Checking"], self.trie.parents("Assets:A:Checking"))
+        self.assertEqual(["Assets:A"], self.trie.parents("Assets:A:Savings:Old"))
+        self.assertEqual([], self.trie.parents("Assets:AB"))
+        self.assertEqual([], self.trie.parents("Assets"))
+
+    def test_subaccounts(self):
+        self.assertEqual(["Assets:A", "Assets:A:Checking"], self.trie.subaccounts("Assets:A"))
+        self.assertEqual(
+            ["Assets:A", "Assets:A:Checking", "Assets:B:Cash"], self.trie.subaccounts("Assets")
+        )
+        self.assertEqual([], self.trie.subaccounts("Assets:AB"))
+        self.assertEqual([], self.trie.subaccounts("Equity"))
+
+    def test_parent_matcher(self):
+        rng = random.Random(3)
+        components = ["A", "AB", "B", "A-B"]
+        names = [
+            account.join("Assets", *rng.choices(components, k=rng.randint(0, 3)))
+            for _ in range(200)
+        ]
+        for _ in range(50):
+            parents = rng.sample(names, rng.randint(1, 4))
+            trie = AccountTrie(parents)
+            matchers = {parent: account.parent_matcher(parent) for parent in parents}
+            for name in names:
+                expected = sorted(parent for parent, match in matchers.items() if match(name))
+                self.assertEqual(bool(expected), trie.is_under(name), name)
+                self.assertEqual(expected, sorted(trie.parents(name)), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+"""A columnar view of the postings of a list of entries.
+
+Transactions and postings are named tuples holding Amount and Cost tuples and
+Decimal numbers, which costs a few hundred bytes per posting and makes every
+aggregation walk those objects. A PostingTable stores the postings of a list of
+directives in parallel arrays instead, one row per posting:
+
+  dates: The date ordinal of the transaction.
+  accounts: The id of the account, an index in 'account_names'.
+  currencies: The id of the currency of the units, an index in 'currency_names'.
+  numbers: The number of units as an integer, scaled by 10 ** 'scale'.
+  costs: The id of the cost, an index in 'cost_values', or 0 if there is none.
+  transactions: The index of the transaction in the list of entries.
+  postings: The index of the posting in the transaction.
+
+The table is built once and can then be aggregated by any combination of
+columns over a range of dates, without creating an Amount, Position or
+Inventory per posting. Sums are computed on the scaled integers and are exact;
+they compare equal to those of adding the Decimal numbers, although their
+exponent is always that of the table's scale.
+"""
+
+from __future__ import annotations
+
+__license__ = "GNU GPLv2"
+
+import array
+import bisect
+import collections
+import datetime
+import decimal
+import itertools
+from decimal import Decimal
+from typing import Any
+from typing import Iterable
+from typing import Optional
+
+from beancount.core import account
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.core.inventory import Inventory
+from beancount.core.position import Cost
+
+# A context precise enough for scaling numbers to integers and back exactly.
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+# The bounds of the integers stored in a signed 64-bit array.
+_INT64_MAX = (1 << 63) - 1
+
+# The columns rows can be grouped by.
+COLUMNS = ("date", "account", "currency", "cost", "transaction")
+
+
+class PostingTable:
+    """The postings of a list of entries, stored as parallel arrays.
+
+    Attributes:
+      entries: The list of directives the table was built from.
+      dates: An array of the date ordinals of the postings.
+      accounts: An array of account ids.
+      currencies: An array of currency ids.
+      numbers: An array of the numbers of units, as integers scaled by
+        10 ** scale, or a list of integers if some do not fit in 64 bits.
+      costs: An array of cost ids, 0 for postings held without a cost.
+      transactions: An array of the indices of the transactions in entries.
+      postings: An array of the indices of the postings in their transaction.
+      scale: The number of fractional digits of the scaled numbers.
+      account_names: A list of the account names, by id.
+      currency_names: A list of the currencies, by id.
+      cost_values: A list of the Cost instances, by id; the first one is None.
+    """
+
+    def __init__(self, entries: data.Directives):
+        """Build the table from a list of directives.
+
+        Args:
+          entries: A list of directives, sorted by date. Only the postings of
+            transactions are stored; they must have been booked, that is, have
+            a number of units.
+        Raises:
+          ValueError: If the entries are not sorted by date or a posting has
+            no number of units.
+        """
+        self.entries = entries
+        self.dates = array.array("l")
+        self.accounts = array.array("L")
+        self.currencies = array.array("L")
+        self.costs = array.array("L")
+        self.transactions = array.array("L")
+        self.postings = array.array("L")
+        self.account_names: list[str] = []
+        self.currency_names: list[str] = []
+        self.cost_values: list[Optional[Cost]] = [None]
+
+        account_ids: dict[str, int] = {}
+        currency_ids: dict[str, int] = {}
+        cost_ids: dict[Optional[Cost], int] = {None: 0}
+        numbers = []
+        scale = 0
+        last_ordinal = None
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, data.Transaction):
+                continue
+            ordinal = entry.date.toordinal()
+            if last_ordinal is not None and ordinal < last_ordinal:
+                raise ValueError("Entries are not sorted by date: {}".format(entry.date))
+            last_ordinal = ordinal
+            for posting_index, posting in enumerate(entry.postings):
+                units = posting.units
+                number = units.number if units is not None else None
+                if not isinstance(number, Decimal) or not number.is_finite():
+                    raise ValueError(
+                        "Posting has no number of units: {} {}".format(posting.account, entry.meta)
+                    )
+                exponent = number.as_tuple().exponent
+                if exponent < -scale:
+                    scale = -exponent
+                numbers.append(number)
+                self.dates.append(ordinal)
+                self.accounts.append(_get_id(account_ids, self.account_names, posting.account))
+                self.currencies.append(_get_id(currency_ids, self.currency_names, units.currency))
+                self.costs.append(_get_id(cost_ids, self.cost_values, posting.cost))
+                self.transactions.append(index)
+                self.postings.append(posting_index)
+
+        self._account_ids = account_ids
+        self.scale = scale
+        integers = [int(_EXACT.scaleb(number, scale)) for number in numbers]
+        if all(-_INT64_MAX <= integer <= _INT64_MAX for integer in integers):
+            self.numbers: array.array | list[int] = array.array("q", integers)
+        else:
+            self.numbers = integers
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def number(self, row: int) -> Decimal:
+        """Return the number of units of a row as a Decimal."""
+        return self._decimal(self.numbers[row])
+
+    def posting(self, row: int) -> data.Posting:
+        """Return the posting a row was built from."""
+        return self.entries[self.transactions[row]].postings[self.postings[row]]
+
+    def _decimal(self, integer: int) -> Decimal:
+        return _EXACT.scaleb(Decimal(integer), -self.scale)
+
+    def rows(self, start_date=None, end_date=None) -> range:
+        """Return the rows of the postings dated within a range.
+
+        Args:
+          start_date: A datetime.date, the first date included, or None.
+          end_date: A datetime.date, the first date excluded, or None.
+        Returns:
+          A range of row indices.
+        """
+        lo = 0 if start_date is None else bisect.bisect_left(self.dates, start_date.toordinal())
+        hi = len(self) if end_date is None else bisect.bisect_left(self.dates, end_date.toordinal())
+        return range(lo, max(lo, hi))
+
+    def subaccounts(self, parent: str) -> list[str]:
+        """Return the names of an account and all its descendants in the table."""
+        match = account.parent_matcher(parent)
+        return [name for name in self.account_names if match(name)]
+
+    def sum(
+        self,
+        by: Iterable[str] = ("account", "currency"),
+        start_date=None,
+        end_date=None,
+        accounts: Optional[Iterable[str]] = None,
+    ) -> dict[Any, Decimal]:
+        """Sum the numbers of units, grouped by some of the columns.
+
+        Numbers of different currencies are only meaningful apart, so 'by'
+        should normally include "currency"; adding "cost" keeps the lots apart,
+        as an inventory does.
+
+        Args:
+          by: A sequence of column names from COLUMNS.
+          start_date: A datetime.date, the first date included, or None.
+          end_date: A datetime.date, the first date excluded, or None.
+          accounts: An optional collection of account names; only their
+            postings are summed.
+        Returns:
+          A dict of the group keys to the sums of their numbers. Keys are
+          tuples of the values of the columns in 'by', or single values if
+          there is only one column: account names, currencies, Cost instances
+          or None, datetime.date instances and entry indices.
+        Raises:
+          ValueError: If there are no columns or a column name is invalid.
+        """
+        by = tuple(by)
+        if not by:
+            raise ValueError("No columns to group by")
+        for name in by:
+            if name not in COLUMNS:
+                raise ValueError("Invalid column: {}".format(name))
+        rows = self.rows(start_date, end_date)
+        lo, hi = rows.start, rows.stop
+        numbers = self.numbers[lo:hi]
+        columns = [self._column(name)[lo:hi] for name in by]
+        if accounts is not None:
+            wanted = {self._account_ids[name] for name in accounts if name in self._account_ids}
+            selected = [ident in wanted for ident in self.accounts[lo:hi]]
+            numbers = list(itertools.compress(numbers, selected))
+            columns = [list(itertools.compress(column, selected)) for column in columns]
+
+        totals: dict[Any, int] = collections.defaultdict(int)
+        keys = columns[0] if len(columns) == 1 else zip(*columns)
+        for key, number in zip(keys, numbers):
+            totals[key] += number
+
+        decoders = [self._decoder(name) for name in by]
+        if len(decoders) == 1:
+            (decode,) = decoders
+            return {decode(key): self._decimal(total) for key, total in totals.items()}
+        return {
+            tuple(decode(value) for decode, value in zip(decoders, key)): self._decimal(total)
+            for key, total in totals.items()
+        }
+
+    def inventories(self, start_date=None, end_date=None) -> dict[str, Inventory]:
+        """Compute the balance of every account over a range of dates.
+
+        Args:
+          start_date: A datetime.date, the first date included, or None.
+          end_date: A datetime.date, the first date excluded, or None.
+        Returns:
+          A dict of account names to Inventory instances, the same as adding
+          the positions of the postings of each account.
+        """
+        inventories: dict[str, Inventory] = {}
+        sums = self.sum(("account", "currency", "cost"), start_date, end_date)
+        for (account_name, currency, cost), number in sums.items():
+            inventory = inventories.get(account_name)
+            if inventory is None:
+                inventory = inventories[account_name] = Inventory()
+            inventory.add_amount(Amount(number, currency), cost)
+        return inventories
+
+    def _column(self, name: str) -> array.array:
+        return {
+            "date": self.dates,
+            "account": self.accounts,
+            "currency": self.currencies,
+            "cost": self.costs,
+            "transaction": self.transactions,
+        }[name]
+
+    def _decoder(self, name: str):
+        return {
+            "date": datetime.date.fromordinal,
+            "account": self.account_names.__getitem__,
+            "currency": self.currency_names.__getitem__,
+            "cost": self.cost_values.__getitem__,
+            "transaction": int,
+        }[name]
+
+
+def _get_id(ids: dict, values: list, value) -> int:
+    """Return the id of a value, allocating the next one if it is new."""
+    ident = ids.get(value)
+    if ident is None:
+        ident = ids[value] = len(values)
+        values.append(value)
+    return ident
@@ -0,0 +1,161 @@
+__license__ = "GNU GPLv2"
+
+import collections
+import datetime
+import itertools
+import random
+import unittest
+from decimal import Decimal
+
+from beancount import loader
+from beancount.core import columnar
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.core.inventory import Inventory
+
+ACCOUNTS = ["Assets:Cash", "Assets:Bank:Checking", "Assets:Bank:Savings", "Expenses:Food"]
+
+
+def _ledger(seed, count):
+    """Return a random ledger of cash and stock transactions."""
+    rng = random.Random(seed)
+    lines = ["2020-01-01 open {}".format(name) for name in ACCOUNTS + ["Assets:Stock"]]
+    date = datetime.date(2020, 1, 2)
+    for _ in range(count):
+        date += datetime.timedelta(days=rng.choice([0, 0, 1, 3]))
+        lines.append('{} * "Random"'.format(date))
+        if rng.random() < 0.2:
+            units = rng.randint(1, 5)
+            cost = Decimal(rng.randint(1, 100000)).scaleb(-rng.randint(0, 4))
+            lines.append("  Assets:Stock  {} HOOL {{{} USD}}".format(units, cost))
+            lines.append("  Assets:Cash  {} USD".format(-units * cost))
+        else:
+            currency = rng.choice(["USD", "CAD"])
+            number = Decimal(rng.randint(-10**6, 10**6)).scaleb(-rng.randint(0, 3))
+            first, second = rng.sample(ACCOUNTS, 2)
+            lines.append("  {}  {} {}".format(first, number, currency))
+            lines.append("  {}  {} {}".format(second, -number, currency))
+    return "\n".join(lines) + "\n"
+
+
+def _column_value(name, index, entry, posting):
+    return {
+        "date": entry.date,
+        "account": posting.account,
+        "currency": posting.units.currency,
+        "cost": posting.cost,
+        "transaction": index,
+    }[name]
+
+
+def _decimal_sums(entries, by, start_date=None, end_date=None, accounts=None):
+    """Sum the numbers of the postings with Decimals."""
+    sums = collections.defaultdict(Decimal)
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, data.Transaction):
+            continue
+        if start_date is not None and entry.date < start_date:
+            continue
+        if end_date is not None and entry.date >= end_date:
+            continue
+        for posting in entry.postings:
+            if accounts is not None and posting.account not in accounts:
+                continue
+            key = tuple(_column_value(name, index, entry, posting) for name in by)
+            sums[key[0] if len(by) == 1 else key] += posting.units.number
+    return dict(sums)
+
+
+class TestPostingTable(unittest.TestCase):
+    def setUp(self):
+        self.entries, errors, _ = loader.load_string(_ledger(1, 300))
+        self.assertEqual([], errors)
+        self.table = columnar.PostingTable(self.entries)
+
+    def test_rows(self):
+        postings = [
+            posting
+            for entry in self.entries
+            if isinstance(entry, data.Transaction)
+            for posting in entry.postings
+        ]
+        self.assertEqual(len(postings), len(self.table))
+        for row, posting in enumerate(postings):
+            self.assertIs(posting, self.table.posting(row))
+            self.assertEqual(posting.units.number, self.table.number(row))
+
+    def test_sum_equals_decimal_sums(self):
+        dates = sorted({entry.date for entry in self.entries})
+        ranges = [(None, None), (dates[10], None), (None, dates[-10]), (dates[5], dates[40])]
+        for count in range(1, len(columnar.COLUMNS) + 1):
+            for by in itertools.combinations(columnar.COLUMNS, count):
+                for start_date, end_date in ranges:
+                    self.assertEqual(
+                        _decimal_sums(self.entries, by, start_date, end_date),
+                        self.table.sum(by, start_date, end_date),
+                    )
+
+    def test_sum_accounts(self):
+        accounts = {"Assets:Stock", "Assets:Bank:Savings", "Assets:Unknown"}
+        by = ("account", "currency")
+        self.assertEqual(
+            _decimal_sums(self.entries, by, accounts=accounts),
+            self.table.sum(by, accounts=accounts),
+        )
+
+    def test_sum_invalid_columns(self):
+        with self.assertRaises(ValueError):
+            self.table.sum(())
+        with self.assertRaises(ValueError):
+            self.table.sum(("payee",))
+
+    def test_inventories(self):
+        expected = {}
+        for entry in self.entries:
+            if isinstance(entry, data.Transaction):
+                for posting in entry.postings:
+                    inventory = expected.setdefault(posting.account, Inventory())
+                    inventory.add_position(posting)
+        self.assertEqual(expected, self.table.inventories())
+
+    def test_large_numbers(self):
+        date = datetime.date(2020, 1, 1)
+        numbers = [Decimal("12345678901234567890.5"), Decimal("-0.000000001"), Decimal("7")]
+        entries = [
+            data.Transaction(
+                data.new_metadata("<test>", index),
+                date,
+                "*",
+                None,
+                "Large",
+                data.EMPTY_SET,
+                data.EMPTY_SET,
+                [data.Posting("Assets:Cash", Amount(number, "USD"), None, None, None, None)],
+            )
+            for index, number in enumerate(numbers)
+        ]
+        table = columnar.PostingTable(entries)
+        self.assertIsInstance(table.numbers, list)
+        # Exact, where adding the Decimals would round to 28 digits.
+        self.assertEqual(
+            {"USD": Decimal("12345678901234567897.499999999")}, table.sum(("currency",))
+        )
+
+    def test_invalid_entries(self):
+        entries = list(reversed([e for e in self.entries if isinstance(e, data.Transaction)]))
+        with self.assertRaises(ValueError):
+            columnar.PostingTable(entries)
+        entry = self.entries[-1]
+        posting = entry.postings[0]._replace(units=Amount(None, "USD"))
+        with self.assertRaises(ValueError):
+            columnar.PostingTable([entry._replace(postings=[posting])])
+
+    def test_subaccounts(self):
+        self.assertEqual(
+            ["Assets:Bank:Checking", "Assets:Bank:Savings"],
+            sorted(self.table.subaccounts("Assets:Bank")),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
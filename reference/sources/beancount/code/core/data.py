@@ -504,9 +504,23 @@ class dtypes:
 Options = dict[str, Any]
 
 
+class _Location:
+    """The source location of a directive or posting.
+
+    Instances are only used for their __dict__: the attribute dicts of the
+    instances of a class share a single table of keys, which makes them much
+    smaller than dicts created otherwise, and they are still plain dicts.
+    """
+
+
 def new_metadata(filename: str, lineno: int, kvlist: Meta | None = None) -> Meta:
     """Create a new metadata container from the filename and line number.
 
+    The parser creates one of these for every directive and posting, so the
+    dict is made compact: it shares its keys with all the others created here
+    and the filename is interned. Adding keys to it, like the parser does for
+    user metadata, is cheap as long as they are added in the same order.
+
     Args:
       filename: A string, the filename for the creator of this directive.
       lineno: An integer, the line number where the directive has been created.
@@ -514,7 +528,10 @@ def new_metadata(filename: str, lineno: int, kvlist: Meta | None = None) -> Meta
     Returns:
       A metadata dict.
     """
-    meta = {"filename": filename, "lineno": lineno}
+    location = _Location()
+    location.filename = sys.intern(filename) if type(filename) is str else filename
+    location.lineno = lineno
+    meta = location.__dict__
     if kvlist:
         meta.update(kvlist)
     return meta
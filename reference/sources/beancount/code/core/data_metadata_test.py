@@ -0,0 +1,59 @@
+__license__ = "GNU GPLv2"
+
+import copy
+import pickle
+import sys
+import unittest
+
+from beancount.core import data
+from beancount.parser import parser
+
+
+class TestNewMetadata(unittest.TestCase):
+    def test_plain_dict(self):
+        meta = data.new_metadata("ledger.beancount", 12)
+        self.assertIs(dict, type(meta))
+        self.assertEqual({"filename": "ledger.beancount", "lineno": 12}, meta)
+        self.assertEqual(["filename", "lineno"], list(meta))
+
+    def test_kvlist(self):
+        meta = data.new_metadata("ledger.beancount", 12, {"key": "value"})
+        self.assertEqual({"filename": "ledger.beancount", "lineno": 12, "key": "value"}, meta)
+
+    def test_user_keys(self):
+        meta = data.new_metadata("ledger.beancount", 12)
+        meta["key"] = "value"
+        meta["filename"] = "other.beancount"
+        del meta["lineno"]
+        self.assertEqual({"filename": "other.beancount", "key": "value"}, meta)
+        # Other dicts are not affected by the keys added to one of them.
+        self.assertEqual(["filename", "lineno"], list(data.new_metadata("a", 1)))
+
+    def test_interned_filename(self):
+        first = data.new_metadata("".join(["ledger", ".beancount"]), 1)
+        second = data.new_metadata("".join(["ledger", ".beancount"]), 2)
+        self.assertIs(first["filename"], second["filename"])
+        self.assertIs(sys.intern("ledger.beancount"), first["filename"])
+
+    def test_non_string_filename(self):
+        self.assertIsNone(data.new_metadata(None, 0)["filename"])
+
+    def test_pickle_and_copy(self):
+        meta = data.new_metadata("ledger.beancount", 12, {"key": "value"})
+        for clone in (pickle.loads(pickle.dumps(meta)), copy.deepcopy(meta), meta.copy()):
+            self.assertIs(dict, type(clone))
+            self.assertEqual(meta, clone)
+
+    def test_parsed_entries(self):
+        entries, errors, _ = parser.parse_string(
+            '2020-01-01 open Assets:Cash\n  note: "x"\n', "ledger.beancount"
+        )
+        self.assertEqual([], errors)
+        meta = entries[0].meta
+        self.assertIs(dict, type(meta))
+        self.assertEqual({"filename": "ledger.beancount", "lineno": 1, "note": "x"}, meta)
+        self.assertEqual(entries, pickle.loads(pickle.dumps(entries)))
+
+
+if __name__ == "__main__":
+    unittest.main()
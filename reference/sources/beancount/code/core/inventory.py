@@ -528,6 +528,121 @@ def from_string(string: str) -> Inventory:
 from_string = Inventory.from_string
 
 
+class Accumulator:
+    """A mutable running total of positions, e.g. the balance of an account.
+
+    Amounts and positions are added to it with the same strict lot matching as
+    Inventory.add_amount(), and the same MatchResult values, but the number of
+    each lot is updated in place instead of replacing an immutable Position, so
+    an update does not allocate. Positions are only created when read, and the
+    same numbers added to an Inventory in the same order give the same lots, in
+    the same order, down to the exponents of their numbers.
+    """
+
+    __slots__ = ("_numbers",)
+
+    def __init__(self) -> None:
+        # A mapping of (currency, cost) keys to the number of units of the lot.
+        self._numbers: dict[tuple[str, Cost | None], Decimal] = {}
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __iter__(self):
+        """Iterate over the positions, created on the fly."""
+        for (currency, cost), number in self._numbers.items():
+            yield Position(Amount(number, currency), cost)
+
+    def __str__(self):
+        return self.to_inventory().to_string()
+
+    __repr__ = __str__
+
+    def is_empty(self):
+        """Return true if there are no positions."""
+        return not self._numbers
+
+    def items(self):
+        """Return the (currency, cost) keys and numbers of units of the lots."""
+        return self._numbers.items()
+
+    def add_number(self, currency: str, cost: Cost | None, number: Decimal) -> MatchResult:
+        """Add a number of units to the lot of a currency and cost.
+
+        Args:
+          currency: A string, the currency of the units.
+          cost: An instance of Cost or None, the cost of the lot.
+          number: A Decimal, the number of units to add.
+        Returns:
+          A MatchResult enum that hints at how the lot was booked.
+        """
+        key = (currency, cost)
+        numbers = self._numbers
+        total = numbers.get(key)
+        if total is None:
+            if number == ZERO:
+                return MatchResult.IGNORED
+            numbers[key] = number
+            return MatchResult.CREATED
+        booking = MatchResult.AUGMENTED if same_sign(total, number) else MatchResult.REDUCED
+        total += number
+        if total == ZERO:
+            del numbers[key]
+        else:
+            numbers[key] = total
+        return booking
+
+    def add_amount(self, units: Amount, cost: Cost | None = None) -> MatchResult:
+        """Add using an amount and cost, as Inventory.add_amount().
+
+        Unlike Inventory.add_amount(), only the MatchResult is returned: the
+        position before the change does not exist as an object.
+
+        Args:
+          units: An Amount instance to add.
+          cost: An instance of Cost or None, as a key to the lots.
+        Returns:
+          A MatchResult enum that hints at how the lot was booked.
+        """
+        return self.add_number(units.currency, cost, units.number)  # type: ignore[arg-type]
+
+    def add_position(self, position: Position | data.Posting) -> MatchResult:
+        """Add a Position or Posting, as Inventory.add_position().
+
+        Args:
+          position: The Posting or Position to add.
+        Returns:
+          A MatchResult enum that hints at how the lot was booked.
+        """
+        units = position.units
+        return self.add_number(units.currency, position.cost, units.number)  # type: ignore
+
+    def get_currency_units(self, currency: str) -> Amount:
+        """Fetch the total amount across all the lots in the given currency.
+
+        Args:
+          currency: A string, the currency to filter the lots with.
+        Returns:
+          An instance of Amount, the same as Inventory.get_currency_units().
+        """
+        total_units = ZERO
+        for (lot_currency, _), number in self._numbers.items():
+            if lot_currency == currency:
+                total_units += number
+        return Amount(total_units, currency)
+
+    def to_inventory(self) -> Inventory:
+        """Create an Inventory with the positions of the accumulated lots.
+
+        Returns:
+          A new instance of Inventory.
+        """
+        inventory = Inventory()
+        for (currency, cost), number in self._numbers.items():
+            inventory[(currency, cost)] = Position(Amount(number, currency), cost)
+        return inventory
+
+
 def check_invariants(inv: Inventory) -> None:
     """Check the invariants of the Inventory.
 
@@ -0,0 +1,110 @@
+__license__ = "GNU GPLv2"
+
+import datetime
+import random
+import unittest
+from decimal import Decimal
+
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.core.inventory import Accumulator
+from beancount.core.inventory import Inventory
+from beancount.core.inventory import MatchResult
+from beancount.core.position import Cost
+from beancount.core.position import Position
+
+COST = Cost(Decimal("5.00"), "USD", datetime.date(2020, 1, 1), None)
+OTHER_COST = Cost(Decimal("5.0"), "USD", datetime.date(2020, 1, 2), "lot")
+
+
+def _lots(positions):
+    """Return the lots of positions, in order, with their numbers as tuples."""
+    return [
+        (position.units.currency, position.cost, position.units.number.as_tuple())
+        for position in positions
+    ]
+
+
+class TestAccumulator(unittest.TestCase):
+    def check(self, additions):
+        """Add (number, currency, cost) triples to both; return the accumulator."""
+        inventory = Inventory()
+        accumulator = Accumulator()
+        for number, currency, cost in additions:
+            units = Amount(Decimal(number), currency)
+            _, expected = inventory.add_amount(units, cost)
+            self.assertIs(expected, accumulator.add_amount(units, cost))
+        self.assertEqual(_lots(inventory), _lots(accumulator))
+        self.assertEqual(_lots(inventory), _lots(accumulator.to_inventory()))
+        self.assertEqual(len(inventory), len(accumulator))
+        self.assertEqual(inventory.is_empty(), accumulator.is_empty())
+        for currency in ("USD", "EUR", "HOOL"):
+            self.assertEqual(
+                inventory.get_currency_units(currency).number.as_tuple(),
+                accumulator.get_currency_units(currency).number.as_tuple(),
+            )
+        return accumulator
+
+    def test_match_results(self):
+        accumulator = Accumulator()
+        units = Amount(Decimal("1.0"), "USD")
+        self.assertIs(MatchResult.IGNORED, accumulator.add_amount(Amount(Decimal("0"), "USD")))
+        self.assertIs(MatchResult.CREATED, accumulator.add_amount(units))
+        self.assertIs(MatchResult.AUGMENTED, accumulator.add_amount(units))
+        self.assertIs(MatchResult.REDUCED, accumulator.add_amount(-units))
+
+    def test_zero_lots(self):
+        self.assertTrue(self.check([("0", "USD", None), ("0.00", "HOOL", COST)]).is_empty())
+
+    def test_reduced_to_zero(self):
+        accumulator = self.check([("1.50", "USD", None), ("-1.5", "USD", None)])
+        self.assertTrue(accumulator.is_empty())
+        # A lot reduced to zero is created anew, at the end.
+        self.check(
+            [
+                ("1.50", "USD", None),
+                ("2", "EUR", None),
+                ("-1.5", "USD", None),
+                ("0.250", "USD", None),
+            ]
+        )
+
+    def test_exponents(self):
+        self.check([("1", "USD", None), ("0.10", "USD", None), ("-0.100", "USD", None)])
+
+    def test_cost_lots(self):
+        self.check(
+            [
+                ("10", "HOOL", COST),
+                ("5", "HOOL", OTHER_COST),
+                ("3", "HOOL", None),
+                ("-10", "HOOL", COST),
+                ("-2.0", "HOOL", OTHER_COST),
+                ("1", "HOOL", COST),
+            ]
+        )
+
+    def test_add_position(self):
+        inventory = Inventory()
+        accumulator = Accumulator()
+        for position in (
+            Position(Amount(Decimal("10"), "HOOL"), COST),
+            data.Posting("Assets:Stock", Amount(Decimal("-4.0"), "HOOL"), COST, None, None, None),
+        ):
+            _, expected = inventory.add_position(position)
+            self.assertIs(expected, accumulator.add_position(position))
+        self.assertEqual(_lots(inventory), _lots(accumulator))
+
+    def test_random(self):
+        rng = random.Random(7)
+        numbers = ["0", "0.0", "1", "1.0", "1.00", "-1", "-1.00", "2.5", "-2.50", "3"]
+        lots = [("USD", None), ("EUR", None), ("HOOL", COST), ("HOOL", OTHER_COST)]
+        for _ in range(300):
+            additions = [
+                (rng.choice(numbers), *rng.choice(lots)) for _ in range(rng.randint(1, 12))
+            ]
+            self.check(additions)
+
+
+if __name__ == "__main__":
+    unittest.main()
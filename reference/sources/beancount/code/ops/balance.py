@@ -4,9 +4,10 @@
 __license__ = "GNU GPLv2"
 
 
-from beancount.core import account
+from beancount.core import account_trie
 from beancount.core import amount
 from beancount.core import getters
+from beancount.core import inventory
 from beancount.core import realization
 from beancount.core.data import Balance
 from beancount.core.data import Transaction
@@ -45,6 +46,32 @@ def get_balance_tolerance(balance_entry, options_map):
     return tolerance
 
 
+def _subtree_units(real_account, balances, currency):
+    """Sum the units of a currency held in an account and its subaccounts.
+
+    This returns the same as get_currency_units() on the balance computed by
+    realization.compute_balance(), without building the subtree inventory: the
+    lots of the currency are added up in the same order, including dropping
+    lots that come back to zero, so the resulting number is identical.
+
+    Args:
+      real_account: The RealAccount of the account to sum.
+      balances: A dict of account names to their inventory.Accumulator.
+      currency: A string, the currency to sum.
+    Returns:
+      An Amount instance.
+    """
+    lots = inventory.Accumulator()
+    for real_child in realization.iter_children(real_account):
+        balance = balances.get(real_child.account)
+        if balance is None:
+            continue
+        for (lot_currency, cost), number in balance.items():
+            if lot_currency == currency:
+                lots.add_number(currency, cost, number)
+    return lots.get_currency_units(currency)
+
+
 def check(entries, options_map):
     """Process the balance assertion directives.
 
@@ -65,22 +92,46 @@ def check(entries, options_map):
     # where we only accumulate inventories for accounts that have balance
     # assertions in them (this saves on time). Here we process the entries one
     # by one along with the balance checks. We use a temporary realization in
-    # order to hold the incremental tree of balances, so that we can easily get
-    # the amounts of an account's subaccounts for making checks on parent
-    # accounts.
+    # order to hold the tree of accounts, so that we can easily get the amounts
+    # of an account's subaccounts for making checks on parent accounts. The
+    # running balances are kept in accumulators, which update their lots in
+    # place.
     real_root = realization.RealAccount("")
+    balances = {}
 
     # Figure out the set of accounts for which we need to compute a running
     # inventory balance.
-    asserted_accounts = {entry.account for entry in entries if isinstance(entry, Balance)}
+    asserted_accounts = account_trie.AccountTrie(
+        entry.account for entry in entries if isinstance(entry, Balance)
+    )
+
+    # Keep a running total of the units of each asserted currency for each
+    # asserted account and its subaccounts, so that checking an assertion does
+    # not have to sum up its subtree.
+    subtree_totals = {}
+    asserted_currencies = {}
+    for entry in entries:
+        if isinstance(entry, Balance) and entry.amount is not None:
+            key = (entry.account, entry.amount.currency)
+            if key not in subtree_totals:
+                subtree_totals[key] = ZERO
+                asserted_currencies.setdefault(entry.account, []).append(key)
 
     # Add all children accounts of an asserted account to be calculated as well,
     # and pre-create these accounts, and only those (we're just being tight to
-    # make sure).
-    asserted_match_list = [account.parent_matcher(account_) for account_ in asserted_accounts]
+    # make sure). For each of them, map the currencies to the keys of the totals
+    # that a posting in that currency must update, one per asserted account on
+    # the path to the root.
+    total_keys = {}
     for account_ in getters.get_accounts(entries):
-        if account_ in asserted_accounts or any(match(account_) for match in asserted_match_list):
+        parents = asserted_accounts.parents(account_)
+        if parents:
             realization.get_or_create(real_root, account_)
+            balances[account_] = inventory.Accumulator()
+            keys_by_currency = total_keys[account_] = {}
+            for parent in parents:
+                for key in asserted_currencies.get(parent, ()):
+                    keys_by_currency.setdefault(key[1], []).append(key)
 
     # Get the Open directives for each account.
     open_close_map = getters.get_account_open_close(entries)
@@ -89,13 +140,16 @@ def check(entries, options_map):
         if isinstance(entry, Transaction):
             # For each of the postings' accounts, update the balance inventory.
             for posting in entry.postings:
-                real_account = realization.get(real_root, posting.account)
+                balance = balances.get(posting.account)
 
                 # The account will have been created only if we're meant to track it.
-                if real_account is not None:
+                if balance is not None:
                     # Note: Always allow negative lots for the purpose of balancing.
                     # This error should show up somewhere else than here.
-                    real_account.balance.add_position(posting)
+                    balance.add_position(posting)
+                    units = posting.units
+                    for key in total_keys[posting.account].get(units.currency, ()):
+                        subtree_totals[key] += units.number
 
         elif isinstance(entry, Balance):
             # Check that the currency of the balance check is one of the allowed
@@ -129,30 +183,25 @@ def check(entries, options_map):
                     )
                 )
 
-            # Sum up the current balances for this account and its
-            # sub-accounts. We want to support checks for parent accounts
-            # for the total sum of their subaccounts.
-            #
-            # FIXME: Improve the performance further by computing the balance
-            # for the desired currency only. This won't allow us to cache in
-            # this way but may be faster, if we're not asserting all the
-            # currencies. Furthermore, we could probably avoid recomputing the
-            # balance if a subtree of positions hasn't been invalidated by a new
-            # position added to the realization. Do this.
-            real_account = realization.get(real_root, entry.account)
-            assert real_account is not None, "Missing {}".format(entry.account)
-            subtree_balance = realization.compute_balance(real_account, leaf_only=False)
-
-            # Get only the amount in the desired currency.
-            balance_amount = subtree_balance.get_currency_units(expected_amount.currency)
-
-            # Check if the amount is within bounds of the expected amount.
-            diff_amount = amount.sub(balance_amount, expected_amount)
+            # Get the current balance for this account and its sub-accounts,
+            # only in the desired currency. We want to support checks for
+            # parent accounts for the total sum of their subaccounts.
+            total = subtree_totals[(entry.account, expected_amount.currency)]
 
             # Use the specified tolerance or automatically infer it.
             tolerance = get_balance_tolerance(entry, options_map)
 
-            if abs(diff_amount.number) > tolerance:
+            if abs(total - expected_amount.number) > tolerance:
+                # The running total has the right value but not necessarily
+                # the exponent that summing up the lots of the subtree
+                # produces, so recompute the balance in order to report it.
+                real_account = realization.get(real_root, entry.account)
+                assert real_account is not None, "Missing {}".format(entry.account)
+                balance_amount = _subtree_units(real_account, balances, expected_amount.currency)
+
+                # Compute the difference from the expected amount.
+                diff_amount = amount.sub(balance_amount, expected_amount)
+
                 check_errors.append(
                     BalanceError(
                         entry.meta,
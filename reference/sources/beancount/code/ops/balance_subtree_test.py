@@ -0,0 +1,66 @@
+__license__ = "GNU GPLv2"
+
+import unittest
+
+from beancount import loader
+from beancount.core.amount import A
+from beancount.ops import balance
+
+
+class TestSubtreeBalance(unittest.TestCase):
+    @loader.load_doc(expect_errors=True)
+    def test_failed_parent_exponent(self, entries, errors, __):
+        """
+        2013-05-01 open Assets:Cash
+        2013-05-01 open Assets:Cash:A
+        2013-05-01 open Assets:Cash:B
+        2013-05-01 open Equity:Opening-Balances
+
+        2013-05-02 *
+          Assets:Cash:A                1.000 USD
+          Equity:Opening-Balances
+
+        2013-05-03 *
+          Assets:Cash:A               -1.000 USD
+          Equity:Opening-Balances
+
+        2013-05-04 *
+          Assets:Cash:A                  1.5 USD
+          Assets:Cash:B                 0.25 USD
+          Equity:Opening-Balances
+
+        2013-05-05 balance Assets:Cash   2 USD
+        """
+        # The running total of the subtree is 1.750 USD, but the lot of A came
+        # back to zero and was recreated, so summing the lots gives 1.75 USD.
+        self.assertEqual([balance.BalanceError], list(map(type, errors)))
+        self.assertIn("accumulated 1.75 USD (0.25 too little)", errors[0].message)
+        entry = entries[-1]
+        self.assertIsInstance(entry, balance.Balance)
+        self.assertEqual(A("-0.25 USD"), entry.diff_amount)
+        self.assertEqual(-2, entry.diff_amount.number.as_tuple().exponent)
+
+    @loader.load_doc()
+    def test_passed_parent_exponent(self, entries, errors, __):
+        """
+        2013-05-01 open Assets:Cash
+        2013-05-01 open Assets:Cash:A
+        2013-05-01 open Assets:Cash:B
+        2013-05-01 open Equity:Opening-Balances
+
+        2013-05-02 *
+          Assets:Cash:A                1.000 USD
+          Assets:Cash:B                 0.25 USD
+          Equity:Opening-Balances
+
+        2013-05-03 *
+          Assets:Cash:A               -1.000 USD
+          Equity:Opening-Balances
+
+        2013-05-05 balance Assets:Cash   0.25 USD
+        """
+        self.assertIsNone(entries[-1].diff_amount)
+
+
+if __name__ == "__main__":
+    unittest.main()
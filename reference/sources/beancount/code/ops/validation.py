@@ -11,18 +11,28 @@
 __copyright__ = "Copyright (C) 2013-2017, 2020, 2022-2024  Martin Blais"
 __license__ = "GNU GPLv2"
 
+import concurrent.futures
+import multiprocessing
+import os
+from decimal import Decimal
 from os import path
+from time import perf_counter
 from typing import NamedTuple
 
 from beancount.core import data
 from beancount.core import getters
 from beancount.core import interpolate
+from beancount.core.amount import Amount
 from beancount.core.data import Balance
 from beancount.core.data import Close
 from beancount.core.data import Document
 from beancount.core.data import Note
 from beancount.core.data import Open
 from beancount.core.data import Transaction
+from beancount.core.inventory import Inventory
+from beancount.core.number import ZERO
+from beancount.core.position import Cost
+from beancount.core.position import Position
 from beancount.utils import misc_utils
 
 
@@ -47,84 +57,206 @@ class ValidationError(NamedTuple):
 ALLOW_AFTER_CLOSE = (Balance, Document, Note)
 
 
-def validate_open_close(entries, unused_options_map):
-    """Check constraints on open and close directives themselves.
+class _Context:
+    """The state shared by the checks of a single pass over the entries.
 
-    This method checks two kinds of constraints:
+    The checks see the state as it was before the entry they are visiting; it
+    is updated once all of them have visited it.
 
-    1. An open or a close directive may only show up once for each account. If a
-       duplicate is detected, an error is generated.
+    Attributes:
+      entries: The list of directives being validated.
+      options_map: An options map.
+      open_map: A dict of account names to their first Open directive.
+      opened_accounts: A set of the accounts which have been opened.
+      active_set: A set of the accounts which are open and not yet closed.
+      max_workers: The number of worker processes to check the balances of
+        transactions with, or None for one per CPU.
+      parallel_threshold: The number of transactions from which to check their
+        balances in parallel, or None for PARALLEL_BALANCES_THRESHOLD.
+    """
 
-    2. Close directives may only appear if an open directive has been seen
-       previously (chronologically).
+    def __init__(self, entries, options_map, max_workers=None, parallel_threshold=None):
+        self.entries = entries
+        self.options_map = options_map
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self.open_map = {}
+        self.opened_accounts = set()
+        self.active_set = set()
+
+    def update(self, entry):
+        """Account for an entry which all the checks have visited.
+
+        Args:
+          entry: A directive.
+        """
+        if isinstance(entry, Open):
+            self.open_map.setdefault(entry.account, entry)
+            self.opened_accounts.add(entry.account)
+            self.active_set.add(entry.account)
+        elif isinstance(entry, Close):
+            self.active_set.discard(entry.account)
 
-    3. The date of close directives must be strictly greater than their
-       corresponding open directive.
+
+class _Check:
+    """A check run as part of a single pass over the entries.
+
+    Subclasses register the directive types they visit in visitors() and
+    accumulate their errors in 'errors', in the order of the entries.
+
+    Attributes:
+      context: The _Context shared with the other checks.
+      errors: A list of ValidationError instances.
+      elapsed: The time spent in this check, in seconds, if it is timed.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.errors = []
+        self.elapsed = 0.0
+
+    def visitors(self):
+        """Return the directive types this check visits.
+
+        Returns:
+          A list of (type, callable) pairs. The callable is called with each
+          entry which is an instance of the type.
+        """
+        raise NotImplementedError
+
+    def finish(self):
+        """Complete the check once all entries have been visited.
+
+        Returns:
+          A list of ValidationError instances.
+        """
+        return self.errors
+
+    def timed(self, function):
+        """Wrap a callable of this check to add up the time spent in it."""
+
+        def timed_function(*args):
+            start = perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.elapsed += perf_counter() - start
+
+        return timed_function
+
+
+def _run_checks(
+    check_classes, entries, options_map, timed=False, max_workers=None, parallel_threshold=None
+):
+    """Run a list of checks in a single pass over the entries.
 
     Args:
+      check_classes: A list of _Check subclasses.
       entries: A list of directives.
-      unused_options_map: An options map.
+      options_map: An options map.
+      timed: A boolean, true to measure the time spent in each check.
+      max_workers: See _Context.
+      parallel_threshold: See _Context.
     Returns:
-      A list of new errors, if any were found.
+      A list of the finished checks, one per class, with their errors.
     """
-    errors = []
-    open_map = {}
-    close_map = {}
+    context = _Context(entries, options_map, max_workers, parallel_threshold)
+    checks = [check_class(context) for check_class in check_classes]
+    registered = []
+    for check in checks:
+        for directive_type, function in check.visitors():
+            registered.append((directive_type, check.timed(function) if timed else function))
+
+    # The callables to apply to each type of entry.
+    handlers_map = {}
     for entry in entries:
-        if isinstance(entry, Open):
-            if entry.account in open_map:
-                errors.append(
-                    ValidationError(
-                        entry.meta,
-                        "Duplicate open directive for {}".format(entry.account),
-                        entry,
-                    )
+        entry_type = type(entry)
+        handlers = handlers_map.get(entry_type)
+        if handlers is None:
+            handlers = handlers_map[entry_type] = [
+                function
+                for directive_type, function in registered
+                if issubclass(entry_type, directive_type)
+            ]
+        for handler in handlers:
+            handler(entry)
+        context.update(entry)
+
+    for check in checks:
+        check.errors = check.timed(check.finish)() if timed else check.finish()
+    return checks
+
+
+def _run_check(check_class, entries, options_map, **kwargs):
+    """Run a single check over the entries and return its errors."""
+    (check,) = _run_checks([check_class], entries, options_map, **kwargs)
+    return check.errors
+
+
+class _OpenCloseCheck(_Check):
+    def __init__(self, context):
+        super().__init__(context)
+        self.close_map = {}
+
+    def visitors(self):
+        return [(Open, self.visit_open), (Close, self.visit_close)]
+
+    def visit_open(self, entry):
+        if entry.account in self.context.open_map:
+            self.errors.append(
+                ValidationError(
+                    entry.meta,
+                    "Duplicate open directive for {}".format(entry.account),
+                    entry,
                 )
-            else:
-                open_map[entry.account] = entry
-
-        elif isinstance(entry, Close):
-            if entry.account in close_map:
-                errors.append(
-                    ValidationError(
-                        entry.meta,
-                        "Duplicate close directive for {}".format(entry.account),
-                        entry,
-                    )
+            )
+
+    def visit_close(self, entry):
+        if entry.account in self.close_map:
+            self.errors.append(
+                ValidationError(
+                    entry.meta,
+                    "Duplicate close directive for {}".format(entry.account),
+                    entry,
                 )
-            else:
-                try:
-                    open_entry = open_map[entry.account]
-                    if entry.date < open_entry.date:
-                        errors.append(
-                            ValidationError(
-                                entry.meta,
-                                "Internal error: closing date for {} "
-                                "appears before opening date".format(entry.account),
-                                entry,
-                            )
-                        )
-                except KeyError:
-                    errors.append(
+            )
+        else:
+            try:
+                open_entry = self.context.open_map[entry.account]
+                if entry.date < open_entry.date:
+                    self.errors.append(
                         ValidationError(
                             entry.meta,
-                            "Unopened account {} is being closed".format(entry.account),
+                            "Internal error: closing date for {} "
+                            "appears before opening date".format(entry.account),
                             entry,
                         )
                     )
+            except KeyError:
+                self.errors.append(
+                    ValidationError(
+                        entry.meta,
+                        "Unopened account {} is being closed".format(entry.account),
+                        entry,
+                    )
+                )
 
-                close_map[entry.account] = entry
+            self.close_map[entry.account] = entry
 
-    return errors
 
+def validate_open_close(entries, unused_options_map):
+    """Check constraints on open and close directives themselves.
 
-def validate_duplicate_balances(entries, unused_options_map):
-    """Check that balance entries occur only once per day.
+    This method checks two kinds of constraints:
 
-    Because we do not support time, and the declaration order of entries is
-    meant to be kept irrelevant, two balance entries with different amounts
-    should not occur in the file. We do allow two identical balance assertions,
-    however, because this may occur during import.
+    1. An open or a close directive may only show up once for each account. If a
+       duplicate is detected, an error is generated.
+
+    2. Close directives may only appear if an open directive has been seen
+       previously (chronologically).
+
+    3. The date of close directives must be strictly greater than their
+       corresponding open directive.
 
     Args:
       entries: A list of directives.
@@ -132,19 +264,24 @@ def validate_duplicate_balances(entries, unused_options_map):
     Returns:
       A list of new errors, if any were found.
     """
-    errors = []
+    return _run_check(_OpenCloseCheck, entries, unused_options_map)
 
-    # Mapping of (account, currency, date) to Balance entry.
-    balance_entries = {}
-    for entry in entries:
-        if not isinstance(entry, data.Balance):
-            continue
 
+class _DuplicateBalancesCheck(_Check):
+    def __init__(self, context):
+        super().__init__(context)
+        # Mapping of (account, currency, date) to Balance entry.
+        self.balance_entries = {}
+
+    def visitors(self):
+        return [(data.Balance, self.visit_balance)]
+
+    def visit_balance(self, entry):
         key = (entry.account, entry.amount.currency, entry.date)
         try:
-            previous_entry = balance_entries[key]
+            previous_entry = self.balance_entries[key]
             if entry.amount != previous_entry.amount:
-                errors.append(
+                self.errors.append(
                     ValidationError(
                         entry.meta,
                         "Duplicate balance assertion with different amounts",
@@ -152,13 +289,16 @@ def validate_duplicate_balances(entries, unused_options_map):
                     )
                 )
         except KeyError:
-            balance_entries[key] = entry
+            self.balance_entries[key] = entry
 
-    return errors
 
+def validate_duplicate_balances(entries, unused_options_map):
+    """Check that balance entries occur only once per day.
 
-def validate_duplicate_commodities(entries, unused_options_map):
-    """Check that commodity entries are unique for each commodity.
+    Because we do not support time, and the declaration order of entries is
+    meant to be kept irrelevant, two balance entries with different amounts
+    should not occur in the file. We do allow two identical balance assertions,
+    however, because this may occur during import.
 
     Args:
       entries: A list of directives.
@@ -166,19 +306,24 @@ def validate_duplicate_commodities(entries, unused_options_map):
     Returns:
       A list of new errors, if any were found.
     """
-    errors = []
+    return _run_check(_DuplicateBalancesCheck, entries, unused_options_map)
 
-    # Mapping of (account, currency, date) to Balance entry.
-    commodity_entries = {}
-    for entry in entries:
-        if not isinstance(entry, data.Commodity):
-            continue
 
+class _DuplicateCommoditiesCheck(_Check):
+    def __init__(self, context):
+        super().__init__(context)
+        # Mapping of currency to Commodity entry.
+        self.commodity_entries = {}
+
+    def visitors(self):
+        return [(data.Commodity, self.visit_commodity)]
+
+    def visit_commodity(self, entry):
         key = entry.currency
         try:
-            previous_entry = commodity_entries[key]
+            previous_entry = self.commodity_entries[key]
             if previous_entry:
-                errors.append(
+                self.errors.append(
                     ValidationError(
                         entry.meta,
                         "Duplicate commodity directives for '{}'".format(key),
@@ -186,9 +331,56 @@ def validate_duplicate_commodities(entries, unused_options_map):
                     )
                 )
         except KeyError:
-            commodity_entries[key] = entry
+            self.commodity_entries[key] = entry
 
-    return errors
+
+def validate_duplicate_commodities(entries, unused_options_map):
+    """Check that commodity entries are unique for each commodity.
+
+    Args:
+      entries: A list of directives.
+      unused_options_map: An options map.
+    Returns:
+      A list of new errors, if any were found.
+    """
+    return _run_check(_DuplicateCommoditiesCheck, entries, unused_options_map)
+
+
+class _ActiveAccountsCheck(_Check):
+    def __init__(self, context):
+        super().__init__(context)
+        self.error_pairs = []
+
+    def visitors(self):
+        return [(object, self.visit_entry)]
+
+    def visit_entry(self, entry):
+        if isinstance(entry, (data.Open, data.Close)):
+            return
+        active_set = self.context.active_set
+        for account in getters.get_entry_accounts(entry):
+            if account not in active_set:
+                # Allow document and note directives that occur after an
+                # account is closed.
+                if isinstance(entry, ALLOW_AFTER_CLOSE) and account in self.context.opened_accounts:
+                    continue
+
+                # Register an error to be logged later, with an appropriate
+                # message.
+                self.error_pairs.append((account, entry))
+
+    def finish(self):
+        # Refine the error message to disambiguate between the case of an
+        # account that has never been seen and one that was simply not active
+        # at the time.
+        opened_accounts = self.context.opened_accounts
+        for account, entry in self.error_pairs:
+            if account in opened_accounts:
+                message = "Invalid reference to inactive account '{}'".format(account)
+            else:
+                message = "Invalid reference to unknown account '{}'".format(account)
+            self.errors.append(ValidationError(entry.meta, message, entry))
+        return self.errors
 
 
 def validate_active_accounts(entries, unused_options_map):
@@ -211,57 +403,66 @@ def validate_active_accounts(entries, unused_options_map):
     Returns:
       A list of new errors, if any were found.
     """
-    error_pairs = []
-    active_set = set()
-    opened_accounts = set()
-    for entry in entries:
-        if isinstance(entry, data.Open):
-            active_set.add(entry.account)
-            opened_accounts.add(entry.account)
+    return _run_check(_ActiveAccountsCheck, entries, unused_options_map)
 
-        elif isinstance(entry, data.Close):
-            active_set.discard(entry.account)
 
-        else:
-            for account in getters.get_entry_accounts(entry):
-                if account not in active_set:
-                    # Allow document and note directives that occur after an
-                    # account is closed.
-                    if isinstance(entry, ALLOW_AFTER_CLOSE) and account in opened_accounts:
-                        continue
-
-                    # Register an error to be logged later, with an appropriate
-                    # message.
-                    error_pairs.append((account, entry))
-
-    # Refine the error message to disambiguate between the case of an account
-    # that has never been seen and one that was simply not active at the time.
-    errors = []
-    for account, entry in error_pairs:
-        if account in opened_accounts:
-            message = "Invalid reference to inactive account '{}'".format(account)
-        else:
-            message = "Invalid reference to unknown account '{}'".format(account)
-        errors.append(ValidationError(entry.meta, message, entry))
+class _CurrencyConstraintsCheck(_Check):
+    """Check the currency constraints in a single pass.
 
-    return errors
+    The constraints are those of the last Open directive of each account with
+    currencies, wherever it appears in the list of entries. In a single pass, a
+    posting is checked against the constraints seen so far, which are final
+    unless an account is opened again later, or not opened before it is posted
+    to. Both of these are already errors; they make this check go over the
+    entries again once the constraints are known.
+    """
 
+    def __init__(self, context):
+        super().__init__(context)
+        self.open_map = {}
+        self.recheck = False
 
-def validate_currency_constraints(entries, options_map):
-    """Check the currency constraints from account open declarations.
+    def visitors(self):
+        return [(Open, self.visit_open), (Transaction, self.visit_transaction)]
 
-    Open directives admit an optional list of currencies that specify the only
-    types of commodities that the running inventory for this account may
-    contain. This function checks that all postings are only made in those
-    commodities.
+    def visit_open(self, entry):
+        if entry.currencies:
+            if entry.account in self.context.opened_accounts:
+                self.recheck = True
+            self.open_map[entry.account] = entry
+
+    def visit_transaction(self, entry):
+        for posting in entry.postings:
+            open_entry = self.open_map.get(posting.account)
+            if open_entry is None:
+                if posting.account not in self.context.opened_accounts:
+                    self.recheck = True
+                continue
+            if posting.units.currency not in open_entry.currencies:
+                self.errors.append(_currency_error(entry, posting))
+
+    def finish(self):
+        if self.recheck:
+            return _check_currency_constraints(self.context.entries)
+        return self.errors
+
+
+def _currency_error(entry, posting):
+    return ValidationError(
+        entry.meta,
+        "Invalid currency {} for account '{}'".format(posting.units.currency, posting.account),
+        entry,
+    )
+
+
+def _check_currency_constraints(entries):
+    """Check the currency constraints, with two passes over the entries.
 
     Args:
       entries: A list of directives.
-      unused_options_map: An options map.
     Returns:
       A list of new errors, if any were found.
     """
-
     # Get all the open entries with currency constraints.
     open_map = {
         entry.account: entry for entry in entries if isinstance(entry, Open) and entry.currencies
@@ -285,19 +486,39 @@ def validate_currency_constraints(entries, options_map):
 
             # Perform the check.
             if posting.units.currency not in valid_currencies:
-                errors.append(
-                    ValidationError(
-                        entry.meta,
-                        "Invalid currency {} for account '{}'".format(
-                            posting.units.currency, posting.account
-                        ),
-                        entry,
-                    )
-                )
+                errors.append(_currency_error(entry, posting))
 
     return errors
 
 
+def validate_currency_constraints(entries, options_map):
+    """Check the currency constraints from account open declarations.
+
+    Open directives admit an optional list of currencies that specify the only
+    types of commodities that the running inventory for this account may
+    contain. This function checks that all postings are only made in those
+    commodities.
+
+    Args:
+      entries: A list of directives.
+      unused_options_map: An options map.
+    Returns:
+      A list of new errors, if any were found.
+    """
+    return _run_check(_CurrencyConstraintsCheck, entries, options_map)
+
+
+class _DocumentsPathsCheck(_Check):
+    def visitors(self):
+        return [(Document, self.visit_document)]
+
+    def visit_document(self, entry):
+        if not path.isabs(entry.filename):
+            self.errors.append(
+                ValidationError(entry.meta, "Invalid relative path for entry", entry)
+            )
+
+
 def validate_documents_paths(entries, options_map):
     """Check that all filenames in resolved Document entries are absolute filenames.
 
@@ -311,11 +532,22 @@ def validate_documents_paths(entries, options_map):
     Returns:
       A list of new errors, if any were found.
     """
-    return [
-        ValidationError(entry.meta, "Invalid relative path for entry", entry)
-        for entry in entries
-        if (isinstance(entry, Document) and not path.isabs(entry.filename))
-    ]
+    return _run_check(_DocumentsPathsCheck, entries, options_map)
+
+
+class _DataTypesCheck(_Check):
+    def visitors(self):
+        return [(object, self.visit_entry)]
+
+    def visit_entry(self, entry):
+        try:
+            data.sanity_check_types(
+                entry, self.context.options_map["allow_deprecated_none_for_tags_and_links"]
+            )
+        except AssertionError as exc:
+            self.errors.append(
+                ValidationError(entry.meta, "Invalid data types: {}".format(exc), entry)
+            )
 
 
 def validate_data_types(entries, options_map):
@@ -332,52 +564,543 @@ def validate_data_types(entries, options_map):
     Returns:
       A list of new errors, if any were found.
     """
-    errors = []
-    for entry in entries:
+    return _run_check(_DataTypesCheck, entries, options_map)
+
+
+def compute_residual(postings):
+    """Compute the residual of a set of complete postings.
+
+    This returns the same as interpolate.compute_residual() but accumulates the
+    weights as plain numbers per currency rather than adding Amount and
+    Position objects to an Inventory. The numbers go through the same Decimal
+    operations in the same order, including dropping a currency whose total
+    comes back to zero, so the result is identical, down to the exponents of
+    the numbers. Postings whose numbers are not all Decimal instances take the
+    general path.
+
+    Args:
+      postings: A list of Posting instances.
+    Returns:
+      An instance of Inventory, with the residual of the given list of postings.
+    """
+    residual = {}
+    for posting in postings:
+        # Skip auto-postings inserted to absorb the residual (rounding error).
+        if posting.meta and posting.meta.get(interpolate.AUTOMATIC_RESIDUAL, False):
+            continue
+        units = posting.units
+        cost = posting.cost
+        price = posting.price
+        if units.__class__ is not Amount or units.number.__class__ is not Decimal:
+            return interpolate.compute_residual(postings)
+        if isinstance(cost, Cost) and isinstance(cost.number, Decimal):
+            number = cost.number * units.number
+            currency = cost.currency
+        elif price is not None:
+            if price.number.__class__ is not Decimal:
+                return interpolate.compute_residual(postings)
+            number = price.number * units.number
+            currency = price.currency
+        else:
+            number = units.number
+            currency = units.currency
+
+        total = residual.get(currency)
+        if total is not None:
+            number = total + number
+            if number == ZERO:
+                del residual[currency]
+                continue
+        elif number == ZERO:
+            continue
+        residual[currency] = number
+
+    inventory = Inventory()
+    for currency, number in residual.items():
+        inventory[(currency, None)] = Position(Amount(number, currency), None)
+    return inventory
+
+
+# Check the balances of transactions in worker processes when there are at
+# least this many of them. Set this to None to always check them serially.
+PARALLEL_BALANCES_THRESHOLD = 100_000
+
+# The number of transactions sent to a worker process at a time.
+PARALLEL_BALANCES_CHUNK_SIZE = 10_000
+
+# The options which are not sent to the worker processes, being large and not
+# needed to check balances.
+_LARGE_OPTIONS = ("symbols", "dcontext", "balance_fingerprints")
+
+# The options needed to infer tolerances.
+_TOLERANCE_OPTIONS = (
+    "infer_tolerance_from_cost",
+    "inferred_tolerance_multiplier",
+    "inferred_tolerance_default",
+)
+
+
+def _portable_options(options_map):
+    """Return the options to send to the worker processes.
+
+    Args:
+      options_map: An options map.
+    Returns:
+      A copy of the options map, without the _LARGE_OPTIONS.
+    """
+    return {name: value for name, value in options_map.items() if name not in _LARGE_OPTIONS}
+
+
+# The metadata of decoded postings, by the flags of their encoded form.
+_FLAGS_META = {
+    0: None,
+    1: {interpolate.AUTOMATIC_META: True},
+    2: {interpolate.AUTOMATIC_RESIDUAL: True},
+    3: {interpolate.AUTOMATIC_META: True, interpolate.AUTOMATIC_RESIDUAL: True},
+}
+
+
+def _balance_error_message(postings, options_map, fingerprints=None):
+    """Check that the postings of a transaction balance.
+
+    Args:
+      postings: A list of Posting instances.
+      options_map: An options map, possibly without the _LARGE_OPTIONS.
+      fingerprints: An optional BalanceFingerprints instance, to look up and
+        record the transaction in.
+    Returns:
+      The error message if they do not balance, or None.
+    """
+    # IMPORTANT: This validation is _crucial_ and cannot be skipped.
+    # This is where we actually detect and warn on unbalancing
+    # transactions. This _must_ come after the user routines, because
+    # unbalancing input is legal, as those types of transactions may be
+    # "fixed up" by a user-plugin. In other words, we want to allow
+    # users to input unbalancing transactions as long as the final
+    # transactions objects that appear on the stream (after processing
+    # the plugins) are balanced. See {9e6c14b51a59}.
+    #
+    # Detect complete sets of postings that have residual balance;
+    residual = compute_residual(postings)
+    # An empty residual is small whatever the tolerances; inferring
+    # them is the most expensive part of the check.
+    if residual.is_empty():
+        return None
+    fingerprint = None
+    if fingerprints is not None:
+        fingerprint = balance_fingerprint(postings)
+        if fingerprints.seen(fingerprint):
+            return None
+    tolerances = interpolate.infer_tolerances(postings, options_map)
+    if not residual.is_small(tolerances):
+        return "Transaction does not balance: {}".format(residual)
+    if fingerprint is not None:
+        fingerprints.add(fingerprint)
+    return None
+
+
+def _posting_flags(meta):
+    """Return the flags of the automatic posting markers in posting metadata.
+
+    Args:
+      meta: The metadata of a posting, or None.
+    Returns:
+      An integer, with 1 set if the posting was inferred automatically and 2 if
+      it absorbs the residual of its transaction, as in _FLAGS_META.
+    """
+    flags = 0
+    if meta:
+        if interpolate.AUTOMATIC_META in meta:
+            flags |= 1
+        if meta.get(interpolate.AUTOMATIC_RESIDUAL, False):
+            flags |= 2
+    return flags
+
+
+def balance_fingerprint(postings):
+    """Return a fingerprint of what the balance check of a transaction depends on.
+
+    Two transactions with equal fingerprints either both balance or both do not,
+    given the same tolerance options. The fingerprint holds the units, with
+    their numbers as strings since their exponent determines the tolerance, the
+    costs and prices and the automatic posting markers of the postings; it
+    leaves out the accounts, the metadata and anything else that can be edited
+    without affecting the balance.
+
+    Args:
+      postings: A list of Posting instances.
+    Returns:
+      A tuple. It is not hashable if some of the numbers are not, e.g. NaNs.
+    """
+    return tuple(
+        [
+            (
+                str(posting.units.number),
+                posting.units.currency,
+                posting.cost,
+                posting.price,
+                _posting_flags(posting.meta),
+            )
+            for posting in postings
+        ]
+    )
+
+
+class BalanceFingerprints:
+    """The fingerprints of the transactions which were found to balance.
+
+    Setting an instance as the "balance_fingerprints" option of a ledger makes
+    the balance check remember the transactions which balance, and skip them
+    when it validates the ledger again, as long as their fingerprint and the
+    tolerance options have not changed. This is meant for tools which validate
+    the same ledger repeatedly, e.g. after each incremental edit of a Document,
+    where most of the transactions are booked again to the same postings.
+
+    Only the transactions which do not balance exactly are fingerprinted: for
+    the others, computing the residual is all the check does, and it costs
+    about as much as a fingerprint. Only the fingerprints seen in the last
+    validation are kept.
+
+    Attributes:
+      checked: The number of transactions with a residual whose tolerances were
+        checked.
+      skipped: The number of transactions with a residual which were not
+        checked again.
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.skipped = 0
+        self._tolerance_options = None
+        self._fingerprints = set()
+        self._kept = set()
+
+    def start(self, options_map):
+        """Start a validation, forgetting everything if the tolerances changed.
+
+        Args:
+          options_map: An options map.
+        """
+        tolerance_options = {name: options_map[name] for name in _TOLERANCE_OPTIONS}
+        tolerance_options["inferred_tolerance_default"] = dict(
+            tolerance_options["inferred_tolerance_default"]
+        )
+        if tolerance_options != self._tolerance_options:
+            self._tolerance_options = tolerance_options
+            self._fingerprints = set()
+        self._kept = set()
+
+    def seen(self, fingerprint):
+        """Return true if a transaction balanced in the previous validation.
+
+        Args:
+          fingerprint: A tuple, as returned by balance_fingerprint().
+        Returns:
+          A boolean.
+        """
         try:
-            data.sanity_check_types(entry, options_map["allow_deprecated_none_for_tags_and_links"])
-        except AssertionError as exc:
-            errors.append(ValidationError(entry.meta, "Invalid data types: {}".format(exc), entry))
+            if fingerprint in self._fingerprints:
+                self._kept.add(fingerprint)
+                self.skipped += 1
+                return True
+        except TypeError:
+            pass
+        self.checked += 1
+        return False
+
+    def add(self, fingerprint):
+        """Remember a transaction which balances.
+
+        Args:
+          fingerprint: A tuple, as returned by balance_fingerprint().
+        """
+        try:
+            self._kept.add(fingerprint)
+        except TypeError:
+            pass
+
+    def finish(self):
+        """Complete a validation, keeping only the fingerprints it saw."""
+        self._fingerprints = self._kept
+        self._kept = set()
+
+
+def _encode_postings(postings):
+    """Encode the postings of a transaction in a compact form for pickling.
+
+    Only the parts of the postings which the balance check uses are kept: the
+    numbers, as strings, which round-trip exactly, their currencies, and two
+    flags from the metadata.
+
+    Args:
+      postings: A list of Posting instances.
+    Returns:
+      A tuple with a tuple of strings and integers per posting, or None if
+      some of the postings are not complete enough to be encoded.
+    """
+    encoded = []
+    for posting in postings:
+        units = posting.units
+        if units.__class__ is not Amount or units.number.__class__ is not Decimal:
+            return None
+        cost = posting.cost
+        if cost is None:
+            cost_number = cost_currency = None
+        elif cost.__class__ is Cost and cost.number.__class__ is Decimal:
+            cost_number, cost_currency = str(cost.number), cost.currency
+        else:
+            return None
+        price = posting.price
+        if price is None:
+            price_number = price_currency = None
+        elif price.__class__ is Amount and price.number.__class__ is Decimal:
+            price_number, price_currency = str(price.number), price.currency
+        else:
+            return None
+        flags = _posting_flags(posting.meta)
+        encoded.append(
+            (
+                str(units.number),
+                units.currency,
+                cost_number,
+                cost_currency,
+                price_number,
+                price_currency,
+                flags,
+            )
+        )
+    return tuple(encoded)
+
+
+def _decode_postings(encoded):
+    """Rebuild the postings encoded by _encode_postings().
+
+    Args:
+      encoded: A tuple of encoded postings.
+    Returns:
+      A list of Posting instances, without accounts nor flags.
+    """
+    return [
+        data.Posting(
+            None,
+            Amount(Decimal(number), currency),
+            Cost(Decimal(cost_number), cost_currency, None, None)
+            if cost_number is not None
+            else None,
+            Amount(Decimal(price_number), price_currency) if price_number is not None else None,
+            None,
+            _FLAGS_META[flags],
+        )
+        for (
+            number,
+            currency,
+            cost_number,
+            cost_currency,
+            price_number,
+            price_currency,
+            flags,
+        ) in encoded
+    ]
+
+
+def _check_encoded_balances(encoded_transactions, options_map):
+    """Check the balances of a chunk of encoded transactions, in a worker.
+
+    Args:
+      encoded_transactions: A list of the encoded postings of transactions, or
+        None for those which the caller checks itself.
+      options_map: An options map, as returned by _portable_options().
+    Returns:
+      A list of (index, error message) pairs, for the transactions which do not
+      balance, with their index in the chunk.
+    """
+    messages = []
+    for index, encoded in enumerate(encoded_transactions):
+        if encoded is None:
+            continue
+        message = _balance_error_message(_decode_postings(encoded), options_map)
+        if message is not None:
+            messages.append((index, message))
+    return messages
+
+
+# The transactions being checked in parallel, which worker processes started
+# with fork inherit rather than receive pickled.
+_forked_transactions = None
+
+
+def _check_forked_balances(start, stop, options_map):
+    """Check the balances of a range of the inherited transactions, in a worker.
+
+    Args:
+      start: The index of the first transaction of the chunk.
+      stop: The index of the transaction after the chunk.
+      options_map: An options map, as returned by _portable_options().
+    Returns:
+      Same as _check_encoded_balances().
+    """
+    messages = []
+    for index, entry in enumerate(_forked_transactions[start:stop]):
+        message = _balance_error_message(entry.postings, options_map)
+        if message is not None:
+            messages.append((index, message))
+    return messages
+
+
+def _check_transaction_balances(
+    transactions, options_map, max_workers=None, threshold=None, fingerprints=None
+):
+    """Check the balances of a list of transactions.
+
+    From a threshold number of transactions on, they are checked in chunks
+    by a pool of worker processes, the first chunk and any chunk no worker has
+    started on yet being checked here. Workers started with fork inherit the
+    transactions; otherwise their postings are sent in the compact form of
+    _encode_postings(). The errors are the same and in the same order as when
+    checking them serially. Transactions are always checked here when there
+    are fingerprints to look them up in.
+
+    Args:
+      transactions: A list of Transaction instances.
+      options_map: An options map.
+      max_workers: The number of worker processes, or None for one per CPU.
+      threshold: The number of transactions from which to check them in
+        parallel, or None for PARALLEL_BALANCES_THRESHOLD.
+      fingerprints: An optional BalanceFingerprints instance.
+    Returns:
+      A list of ValidationError instances.
+    """
+    global _forked_transactions
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if threshold is None:
+        threshold = PARALLEL_BALANCES_THRESHOLD
+    errors = []
+    if (
+        max_workers < 2
+        or threshold is None
+        or len(transactions) < threshold
+        or fingerprints is not None
+    ):
+        _check_balances_serially(transactions, options_map, errors, fingerprints)
+        return errors
+
+    chunk_size = PARALLEL_BALANCES_CHUNK_SIZE
+    bounds = [
+        (start, min(start + chunk_size, len(transactions)))
+        for start in range(0, len(transactions), chunk_size)
+    ]
+    worker_options = _portable_options(options_map)
+    # Leave the process-wide start method unset for the embedding application.
+    method = multiprocessing.get_start_method(allow_none=True)
+    context = multiprocessing.get_context(method or multiprocessing.get_all_start_methods()[0])
+    forked = context.get_start_method() == "fork"
+    if forked:
+        _forked_transactions = transactions
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=context
+        ) as pool:
+            jobs = []
+            for start, stop in bounds[1:]:
+                if forked:
+                    encoded_transactions = None
+                    future = pool.submit(_check_forked_balances, start, stop, worker_options)
+                else:
+                    encoded_transactions = [
+                        _encode_postings(entry.postings) for entry in transactions[start:stop]
+                    ]
+                    future = pool.submit(
+                        _check_encoded_balances, encoded_transactions, worker_options
+                    )
+                jobs.append((future, transactions[start:stop], encoded_transactions))
+
+            start, stop = bounds[0]
+            _check_balances_serially(transactions[start:stop], options_map, errors)
+            for future, chunk, encoded_transactions in jobs:
+                # Check here rather than wait if no worker has started on it.
+                if future.cancel():
+                    _check_balances_serially(chunk, options_map, errors)
+                    continue
+                messages = dict(future.result())
+                for index, entry in enumerate(chunk):
+                    if encoded_transactions is not None and encoded_transactions[index] is None:
+                        message = _balance_error_message(entry.postings, options_map)
+                    else:
+                        message = messages.get(index)
+                    if message is not None:
+                        errors.append(ValidationError(entry.meta, message, entry))
+    finally:
+        _forked_transactions = None
     return errors
 
 
-def validate_check_transaction_balances(entries, options_map):
+def _check_balances_serially(transactions, options_map, errors, fingerprints=None):
+    """Check the balances of transactions, appending to a list of errors."""
+    for entry in transactions:
+        message = _balance_error_message(entry.postings, options_map, fingerprints)
+        if message is not None:
+            errors.append(ValidationError(entry.meta, message, entry))
+
+
+class _TransactionBalancesCheck(_Check):
+    def __init__(self, context):
+        super().__init__(context)
+        self.transactions = []
+
+    def visitors(self):
+        return [(Transaction, self.transactions.append)]
+
+    def finish(self):
+        # The transactions are gathered first so that the number of them is
+        # known, which decides whether to check them in parallel.
+        context = self.context
+        options_map = context.options_map
+        fingerprints = options_map.get("balance_fingerprints")
+        if not isinstance(fingerprints, BalanceFingerprints):
+            fingerprints = None
+        else:
+            fingerprints.start(options_map)
+        errors = _check_transaction_balances(
+            self.transactions,
+            options_map,
+            context.max_workers,
+            context.parallel_threshold,
+            fingerprints,
+        )
+        if fingerprints is not None:
+            fingerprints.finish()
+        return errors
+
+
+def validate_check_transaction_balances(
+    entries, options_map, max_workers=None, parallel_threshold=None
+):
     """Check again that all transaction postings balance, as users may have
     transformed transactions.
 
+    Lists of at least parallel_threshold transactions are checked in parallel
+    by max_workers worker processes. If the "balance_fingerprints" option is set
+    to a BalanceFingerprints instance, the transactions which balanced in an
+    earlier validation and have not changed are not checked again.
+
     Args:
       entries: A list of directives.
       unused_options_map: An options map.
+      max_workers: The number of worker processes, or None for one per CPU.
+      parallel_threshold: The number of transactions from which to check them
+        in parallel, or None for PARALLEL_BALANCES_THRESHOLD.
     Returns:
       A list of new errors, if any were found.
     """
-    # Note: this is a bit slow; we could limit our checks to the original
-    # transactions by using the hash function in the loader.
-    errors = []
-    for entry in entries:
-        if isinstance(entry, Transaction):
-            # IMPORTANT: This validation is _crucial_ and cannot be skipped.
-            # This is where we actually detect and warn on unbalancing
-            # transactions. This _must_ come after the user routines, because
-            # unbalancing input is legal, as those types of transactions may be
-            # "fixed up" by a user-plugin. In other words, we want to allow
-            # users to input unbalancing transactions as long as the final
-            # transactions objects that appear on the stream (after processing
-            # the plugins) are balanced. See {9e6c14b51a59}.
-            #
-            # Detect complete sets of postings that have residual balance;
-            residual = interpolate.compute_residual(entry.postings)
-            tolerances = interpolate.infer_tolerances(entry.postings, options_map)
-            if not residual.is_small(tolerances):
-                errors.append(
-                    ValidationError(
-                        entry.meta,
-                        "Transaction does not balance: {}".format(residual),
-                        entry,
-                    )
-                )
-
-    return errors
+    return _run_check(
+        _TransactionBalancesCheck,
+        entries,
+        options_map,
+        max_workers=max_workers,
+        parallel_threshold=parallel_threshold,
+    )
 
 
 # A list of reasonably fast validations to always run by default.
@@ -400,8 +1123,28 @@ def validate_check_transaction_balances(entries, options_map):
 # The list of validations to run.
 VALIDATIONS = BASIC_VALIDATIONS
 
-
-def validate(entries, options_map, log_timings=None, extra_validations=None):
+# The validations which validate() runs together in a single pass over the
+# entries, and the checks implementing them.
+_CHECKS = {
+    validate_open_close: _OpenCloseCheck,
+    validate_active_accounts: _ActiveAccountsCheck,
+    validate_currency_constraints: _CurrencyConstraintsCheck,
+    validate_duplicate_balances: _DuplicateBalancesCheck,
+    validate_duplicate_commodities: _DuplicateCommoditiesCheck,
+    validate_documents_paths: _DocumentsPathsCheck,
+    validate_check_transaction_balances: _TransactionBalancesCheck,
+    validate_data_types: _DataTypesCheck,
+}
+
+
+def validate(
+    entries,
+    options_map,
+    log_timings=None,
+    extra_validations=None,
+    max_workers=None,
+    parallel_threshold=None,
+):
     """Perform all the standard checks on parsed contents.
 
     Args:
@@ -411,6 +1154,10 @@ def validate(entries, options_map, log_timings=None, extra_validations=None):
         operations.
       extra_validations: A list of extra validation functions to run after loading
         this list of entries.
+      max_workers: The number of worker processes to check the balances of
+        transactions with, or None for one per CPU.
+      parallel_threshold: The number of transactions from which to check their
+        balances in parallel, or None for PARALLEL_BALANCES_THRESHOLD.
     Returns:
       A list of new errors, if any were found.
     """
@@ -418,13 +1165,36 @@ def validate(entries, options_map, log_timings=None, extra_validations=None):
     if extra_validations:
         validation_tests += extra_validations
 
-    # Run various validation routines define above.
+    # Run the validation routines defined above in a single pass over the
+    # entries, and the others one after the other, keeping the errors in the
+    # order of the list of validations.
+    check_classes = [_CHECKS[function] for function in validation_tests if function in _CHECKS]
+    checks = iter(
+        _run_checks(
+            check_classes,
+            entries,
+            options_map,
+            bool(log_timings),
+            max_workers,
+            parallel_threshold,
+        )
+    )
+
     errors = []
     for validation_function in validation_tests:
-        with misc_utils.log_time(
-            "function: {}".format(validation_function.__name__), log_timings, indent=2
-        ):
-            new_errors = validation_function(entries, options_map)
+        operation_name = "function: {}".format(validation_function.__name__)
+        if validation_function in _CHECKS:
+            check = next(checks)
+            new_errors = check.errors
+            if log_timings:
+                log_timings(
+                    "Operation: {:48} Time: {}{:6.0f} ms".format(
+                        "'{}'".format(operation_name), "      " * 2, check.elapsed * 1000
+                    )
+                )
+        else:
+            with misc_utils.log_time(operation_name, log_timings, indent=2):
+                new_errors = validation_function(entries, options_map)
         errors.extend(new_errors)
 
     return errors
@@ -0,0 +1,98 @@
+__license__ = "GNU GPLv2"
+
+import unittest
+from decimal import Decimal
+
+from beancount import loader
+from beancount.core import amount
+from beancount.core import data
+from beancount.ops import validation
+from beancount.parser import options
+
+LEDGER = """
+2020-01-01 open Assets:Stock
+2020-01-01 open Assets:Cash
+
+2020-01-02 * "Within tolerance"
+  Assets:Stock  3 HOOL @ 1.3333 USD
+  Assets:Cash  -4.00 USD
+
+2020-01-03 * "Exactly balanced"
+  Assets:Stock  1 HOOL @ 2 USD
+  Assets:Cash  -2 USD
+
+2020-01-04 * "Within tolerance"
+  Assets:Stock  6 HOOL @ 0.3333 USD
+  Assets:Cash  -2.00 USD
+"""
+
+
+def _unbalance(entries):
+    """Make the last transaction not balance."""
+    entry = entries[-1]
+    posting = entry.postings[-1]
+    units = amount.Amount(Decimal("-2.50"), "USD")
+    return entries[:-1] + [
+        entry._replace(postings=[entry.postings[0], posting._replace(units=units)])
+    ]
+
+
+class TestBalanceFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.entries, errors, self.options_map = loader.load_string(LEDGER)
+        self.assertEqual([], errors)
+
+    def check(self, entries, options_map):
+        errors = validation.validate_check_transaction_balances(entries, options_map)
+        return [(error.message, error.entry.meta["lineno"]) for error in errors]
+
+    def test_skip_unchanged(self):
+        fingerprints = validation.BalanceFingerprints()
+        options_map = dict(self.options_map, balance_fingerprints=fingerprints)
+        self.assertEqual([], self.check(self.entries, options_map))
+        self.assertEqual((2, 0), (fingerprints.checked, fingerprints.skipped))
+        self.assertEqual([], self.check(self.entries, options_map))
+        self.assertEqual((2, 2), (fingerprints.checked, fingerprints.skipped))
+
+    def test_recheck_changed(self):
+        fingerprints = validation.BalanceFingerprints()
+        options_map = dict(self.options_map, balance_fingerprints=fingerprints)
+        self.check(self.entries, options_map)
+        entries = _unbalance(self.entries)
+        expected = self.check(entries, self.options_map)
+        self.assertEqual(1, len(expected))
+        self.assertEqual(expected, self.check(entries, options_map))
+        self.assertEqual(expected, self.check(entries, options_map))
+        self.assertEqual((2, 4), (fingerprints.skipped, fingerprints.checked))
+
+    def test_reset_on_tolerance_change(self):
+        fingerprints = validation.BalanceFingerprints()
+        options_map = dict(self.options_map, balance_fingerprints=fingerprints)
+        self.check(self.entries, options_map)
+        options_map["inferred_tolerance_default"] = {"USD": Decimal("0.00001")}
+        options_map["inferred_tolerance_multiplier"] = Decimal("0.00001")
+        expected = self.check(self.entries, dict(options_map, balance_fingerprints=None))
+        self.assertEqual(2, len(expected))
+        self.assertEqual(expected, self.check(self.entries, options_map))
+        self.assertEqual(0, fingerprints.skipped)
+
+    def test_ignore_other_values(self):
+        options_map = dict(self.options_map, balance_fingerprints="yes")
+        self.assertEqual([], self.check(self.entries, options_map))
+
+    def test_option_is_read_only(self):
+        self.assertIn("balance_fingerprints", options.READ_ONLY_OPTIONS)
+        entries, errors, options_map = loader.load_string(
+            'option "balance_fingerprints" "yes"\n' + LEDGER
+        )
+        self.assertEqual(
+            ["Option 'balance_fingerprints' may not be set"], [e.message for e in errors]
+        )
+        self.assertIsNone(options_map["balance_fingerprints"])
+        self.assertEqual(
+            3, len([entry for entry in entries if isinstance(entry, data.Transaction)])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+__license__ = "GNU GPLv2"
+
+import random
+import unittest
+from unittest import mock
+
+from beancount import loader
+from beancount.ops import validation
+
+LEDGER = """
+2020-01-01 commodity USD
+2020-01-01 commodity USD
+
+2020-01-01 open Assets:Cash  USD
+2020-01-01 open Assets:Stock  HOOL,USD
+2020-01-01 open Expenses:Food
+2020-01-01 open Expenses:Food
+2020-01-05 close Expenses:Unknown
+
+2020-01-02 * "Wrong currency"
+  Assets:Cash  10 CAD
+  Expenses:Food
+
+2020-01-03 * "Before open"
+  Assets:Other  10 USD
+  Expenses:Food
+
+2020-01-03 open Assets:Other  EUR
+
+2020-01-04 * "Unbalanced"
+  Assets:Cash  -10.00 USD
+  Expenses:Food  9.00 USD
+
+2020-01-04 * "Stock"
+  Assets:Stock  3 HOOL {1.3333 USD}
+  Assets:Cash  -4.00 USD
+
+2020-01-05 balance Assets:Cash  -14.00 USD
+2020-01-05 balance Assets:Cash  -15.00 USD
+
+2020-01-06 close Assets:Cash
+
+2020-01-07 * "After close"
+  Assets:Cash  -1 USD
+  Expenses:Food
+
+2020-01-08 close Assets:Cash
+
+2020-01-09 document Assets:Stock "/does/not/exist.pdf"
+2020-01-09 note Assets:Closed "Never opened"
+"""
+
+
+class TestFusedValidation(unittest.TestCase):
+    def setUp(self):
+        self.entries, _, self.options_map = loader.load_string(LEDGER)
+
+    def summarize(self, errors):
+        return [
+            (type(error).__name__, error.message, error.source["lineno"]) for error in errors
+        ]
+
+    def per_function(self, entries, validations):
+        errors = []
+        for function in validations:
+            errors.extend(function(entries, self.options_map))
+        return self.summarize(errors)
+
+    def assertSameErrors(self, entries, validations=None):
+        if validations is None:
+            validations = validation.VALIDATIONS
+        with mock.patch.object(validation, "VALIDATIONS", validations):
+            fused = self.summarize(validation.validate(entries, self.options_map))
+        self.assertEqual(self.per_function(entries, validations), fused)
+        return fused
+
+    def test_basic(self):
+        errors = self.assertSameErrors(self.entries)
+        # All the validations but the one of document paths find errors in it.
+        self.assertEqual(10, len(errors))
+
+    def test_hardcore(self):
+        self.assertSameErrors(
+            self.entries, validation.BASIC_VALIDATIONS + validation.HARDCORE_VALIDATIONS
+        )
+
+    def test_extra_validations(self):
+        def validate_nothing(entries, options_map):
+            return []
+
+        validations = [validation.validate_data_types, validate_nothing]
+        # validate() extends the list of validations in place.
+        with mock.patch.object(validation, "VALIDATIONS", list(validation.VALIDATIONS)):
+            fused = validation.validate(
+                self.entries, self.options_map, extra_validations=validations
+            )
+        self.assertEqual(
+            self.per_function(self.entries, validation.VALIDATIONS + validations),
+            self.summarize(fused),
+        )
+
+    def test_shuffled(self):
+        rng = random.Random(4)
+        for _ in range(20):
+            entries = list(self.entries)
+            rng.shuffle(entries)
+            self.assertSameErrors(entries)
+
+    def test_duplicated_and_truncated(self):
+        rng = random.Random(5)
+        for _ in range(20):
+            entries = list(self.entries)
+            entries += rng.sample(entries, 5)
+            del entries[rng.randrange(len(entries)) :]
+            self.assertSameErrors(entries)
+
+    def test_log_timings(self):
+        messages = []
+        validation.validate(self.entries, self.options_map, log_timings=messages.append)
+        self.assertEqual(
+            ["validate_open_close", "validate_active_accounts"],
+            [message.split("'")[1].split(" ")[1] for message in messages[:2]],
+        )
+        self.assertEqual(len(validation.VALIDATIONS), len(messages))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+__license__ = "GNU GPLv2"
+
+import multiprocessing
+import unittest
+from unittest import mock
+
+from beancount import loader
+from beancount.core import data
+from beancount.ops import validation
+
+
+def _ledger(count):
+    """Return a ledger of transactions, some of which do not balance."""
+    lines = [
+        'option "inferred_tolerance_default" "USD:0.01"',
+        "2020-01-01 open Assets:Stock",
+        "2020-01-01 open Assets:Cash",
+        "2020-01-01 open Expenses:Food",
+    ]
+    for index in range(count):
+        if index % 5 == 0:
+            # Does not balance.
+            postings = ["  Expenses:Food  10.00 USD", "  Assets:Cash  -9.90 USD"]
+        elif index % 5 == 1:
+            # Balances within the tolerance inferred from the cost.
+            postings = ["  Assets:Stock  3 HOOL {1.3333 USD}", "  Assets:Cash  -4.00 USD"]
+        elif index % 5 == 2:
+            # Does not balance with the default tolerance.
+            postings = ["  Assets:Stock  6 HOOL @ 0.3333 USD", "  Assets:Cash  -2.05 USD"]
+        else:
+            postings = ["  Expenses:Food  {}.25 USD".format(index), "  Assets:Cash"]
+        lines.append('2020-01-02 * "Transaction {}"'.format(index))
+        lines.extend(postings)
+    return "\n".join(lines) + "\n"
+
+
+class TestParallelBalances(unittest.TestCase):
+    def setUp(self):
+        self.entries, errors, self.options_map = loader.load_string(_ledger(50))
+        self.assertEqual([], [e for e in errors if "balance" not in e.message])
+        self.transactions = [e for e in self.entries if isinstance(e, data.Transaction)]
+
+    def summarize(self, errors):
+        return [(error.message, error.entry.meta["lineno"]) for error in errors]
+
+    def test_serial_and_parallel_errors(self):
+        serial = validation.validate_check_transaction_balances(
+            self.entries, self.options_map, max_workers=1
+        )
+        self.assertEqual(20, len(serial))
+        with mock.patch.object(validation, "PARALLEL_BALANCES_CHUNK_SIZE", 7):
+            parallel = validation.validate_check_transaction_balances(
+                self.entries, self.options_map, max_workers=2, parallel_threshold=1
+            )
+        self.assertEqual(self.summarize(serial), self.summarize(parallel))
+
+    def test_validate_passes_parallel_arguments(self):
+        serial = validation.validate(self.entries, self.options_map, max_workers=1)
+        with mock.patch.object(validation, "PARALLEL_BALANCES_CHUNK_SIZE", 7):
+            parallel = validation.validate(
+                self.entries, self.options_map, max_workers=2, parallel_threshold=1
+            )
+        self.assertEqual(self.summarize(serial), self.summarize(parallel))
+
+    def check_parallel(self):
+        serial = validation.validate_check_transaction_balances(
+            self.entries, self.options_map, max_workers=1
+        )
+        with mock.patch.object(validation, "PARALLEL_BALANCES_CHUNK_SIZE", 20):
+            parallel = validation.validate_check_transaction_balances(
+                self.entries, self.options_map, max_workers=2, parallel_threshold=1
+            )
+        self.assertEqual(self.summarize(serial), self.summarize(parallel))
+
+    def test_leaves_start_method_unset(self):
+        default = multiprocessing.context._default_context
+        with mock.patch.object(default, "_actual_context", None):
+            self.check_parallel()
+            self.assertIsNone(multiprocessing.get_start_method(allow_none=True))
+
+    def test_spawned_workers(self):
+        default = multiprocessing.context._default_context
+        with mock.patch.object(default, "_actual_context", multiprocessing.get_context("spawn")):
+            self.check_parallel()
+
+    def test_below_threshold(self):
+        with mock.patch.object(validation.concurrent.futures, "ProcessPoolExecutor") as executor:
+            validation.validate_check_transaction_balances(
+                self.entries, self.options_map, max_workers=2, parallel_threshold=51
+            )
+        executor.assert_not_called()
+
+    def test_encoded_balances(self):
+        serial = []
+        validation._check_balances_serially(self.transactions, self.options_map, serial)
+        encoded = [validation._encode_postings(entry.postings) for entry in self.transactions]
+        messages = validation._check_encoded_balances(
+            encoded, validation._portable_options(self.options_map)
+        )
+        self.assertEqual(
+            [(error.message, error.entry) for error in serial],
+            [(message, self.transactions[index]) for index, message in messages],
+        )
+
+    def test_portable_options(self):
+        options_map = dict(self.options_map, tolerance_multiplier=2)
+        portable = validation._portable_options(options_map)
+        for name in validation._LARGE_OPTIONS:
+            self.assertNotIn(name, portable)
+        self.assertEqual(2, portable["tolerance_multiplier"])
+        self.assertEqual(
+            options_map["inferred_tolerance_default"], portable["inferred_tolerance_default"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+__license__ = "GNU GPLv2"
+
+import random
+import unittest
+from decimal import Decimal
+
+from beancount.core import data
+from beancount.core import interpolate
+from beancount.core.amount import Amount
+from beancount.core.position import Cost
+from beancount.core.position import CostSpec
+from beancount.ops import validation
+
+
+def _posting(number, currency, cost=None, price=None, meta=None):
+    return data.Posting(
+        "Assets:Account", Amount(Decimal(number), currency), cost, price, None, meta
+    )
+
+
+def _cost(number, currency):
+    return Cost(Decimal(number), currency, None, None)
+
+
+def _amount(number, currency):
+    return Amount(Decimal(number), currency)
+
+
+def _positions(inventory):
+    """Return the positions of an inventory with their numbers as tuples."""
+    return [
+        (position.units.number.as_tuple(), position.units.currency, position.cost)
+        for position in inventory
+    ]
+
+
+class TestComputeResidual(unittest.TestCase):
+    def check(self, postings):
+        expected = interpolate.compute_residual(postings)
+        residual = validation.compute_residual(postings)
+        self.assertEqual(_positions(expected), _positions(residual))
+        return residual
+
+    def test_empty(self):
+        self.assertTrue(self.check([]).is_empty())
+
+    def test_units(self):
+        self.check([_posting("10.00", "USD"), _posting("-9.995", "USD")])
+        self.check([_posting("10", "USD"), _posting("-3.3", "EUR"), _posting("-7.000", "USD")])
+
+    def test_cost(self):
+        residual = self.check(
+            [_posting("3", "HOOL", cost=_cost("1.3333", "USD")), _posting("-4.00", "USD")]
+        )
+        self.assertEqual([_amount("-0.0001", "USD")], [pos.units for pos in residual])
+
+    def test_cost_spec(self):
+        cost_spec = CostSpec(Decimal("1.50"), None, "USD", None, None, False)
+        self.check([_posting("2", "HOOL", cost=cost_spec), _posting("-3.00", "USD")])
+
+    def test_cost_and_price(self):
+        self.check(
+            [
+                _posting("10", "HOOL", cost=_cost("5.0", "USD"), price=_amount("6.00", "USD")),
+                _posting("-50.000", "USD"),
+            ]
+        )
+
+    def test_price(self):
+        self.check([_posting("10.00", "EUR", price=_amount("1.1", "USD")), _posting("-11", "USD")])
+        self.check([_posting("10.00", "EUR", price=_amount("1.1", "USD")), _posting("-10", "USD")])
+
+    def test_zero(self):
+        self.assertTrue(self.check([_posting("0.00", "USD")]).is_empty())
+        self.assertTrue(self.check([_posting("0", "USD"), _posting("0.0", "EUR")]).is_empty())
+
+    def test_back_to_zero(self):
+        # A currency whose total cancels out is dropped, then starts over.
+        self.check(
+            [
+                _posting("1.5", "USD"),
+                _posting("2", "EUR"),
+                _posting("-1.50", "USD"),
+                _posting("0.250", "USD"),
+            ]
+        )
+
+    def test_automatic_residual(self):
+        meta = {interpolate.AUTOMATIC_RESIDUAL: True}
+        residual = self.check(
+            [
+                _posting("10.00", "USD"),
+                _posting("-9.99", "USD"),
+                _posting("-0.01", "USD", meta=meta),
+            ]
+        )
+        self.assertEqual([_amount("0.01", "USD")], [pos.units for pos in residual])
+
+    def test_random(self):
+        rng = random.Random(42)
+        numbers = ["0", "0.0", "1", "1.0", "1.00", "-1", "-1.00", "2.5", "-2.50", "0.333", "3"]
+        currencies = ["USD", "EUR", "HOOL"]
+        for _ in range(500):
+            postings = []
+            for _ in range(rng.randint(1, 6)):
+                cost = price = None
+                kind = rng.randrange(3)
+                if kind == 1:
+                    cost = _cost(rng.choice(numbers), rng.choice(currencies))
+                elif kind == 2:
+                    price = _amount(rng.choice(numbers), rng.choice(currencies))
+                postings.append(_posting(rng.choice(numbers), rng.choice(currencies), cost, price))
+            self.check(postings)
+
+
+if __name__ == "__main__":
+    unittest.main()
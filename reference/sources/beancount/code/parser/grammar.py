@@ -7,6 +7,7 @@
 
 import collections
 import copy
+import sys
 import traceback
 from datetime import date
 from decimal import Decimal
@@ -161,8 +162,10 @@ def __init__(self):
         # Accumulated and unprocessed options.
         self.options = copy.deepcopy(options.OPTIONS_DEFAULTS)
 
-        # A mapping of all the accounts created.
-        self.accounts = {}
+        # A table of the accounts, currencies, tags, links and metadata keys
+        # seen, each mapped to itself. These strings are repeated liberally;
+        # interning them through this table keeps a single instance of each.
+        self.symbols = {}
 
         # Make the account regexp more restrictive than the default: check
         # types. Warning: This overrides the value in the base class.
@@ -172,6 +175,18 @@ def __init__(self):
         self.dcontext = display_context.DisplayContext()
         self.display_context_update = self.dcontext.update
 
+    def _symbol(self, string):
+        """Return the symbol table's instance of a string, adding it if new.
+
+        New symbols are also interned process-wide: metadata dicts share their
+        key objects across all entries (see data.new_metadata()), so a key is
+        only the same object as its symbol if both are the interned string.
+        """
+        symbol = self.symbols.get(string)
+        if symbol is None:
+            symbol = self.symbols[string] = sys.intern(string)
+        return symbol
+
     def _dcupdate(self, number, currency):
         """Update the display context."""
         if isinstance(number, Decimal) and currency and currency is not MISSING:
@@ -225,6 +240,7 @@ def get_options(self):
         """
         # Build and store the inferred DisplayContext instance.
         self.options["dcontext"] = self.dcontext
+        self.options["symbols"] = self.symbols
 
         return self.options
 
@@ -275,9 +291,7 @@ def account(self, filename, lineno, account):
         if not self.account_regexp.match(account):
             meta = new_metadata(filename, lineno)
             self.errors.append(ParserError(meta, "Invalid account name: {}".format(account)))
-        # Intern account names. This should reduces memory usage a
-        # fair bit because these strings are repeated liberally.
-        return self.accounts.setdefault(account, account)
+        return self._symbol(account)
 
     def pipe_deprecated_error(self, filename, lineno):
         """Issue a 'Pipe deprecated' error.
@@ -299,7 +313,7 @@ def pushtag(self, filename, lineno, tag):
         Args:
           tag: A string, a tag to be added.
         """
-        self.tags.append(tag)
+        self.tags.append(self._symbol(tag))
 
     def poptag(self, filename, lineno, tag):
         """Pop a tag off the current set of stacks.
@@ -447,6 +461,8 @@ def amount(self, filename, lineno, number, currency):
         # Update the mapping that stores the parsed precisions.
         # Note: This is relatively slow, adds about 70ms because of number.as_tuple().
         self._dcupdate(number, currency)
+        if currency.__class__ is str:
+            currency = self._symbol(currency)
         return Amount(number, currency)
 
     def compound_amount(self, filename, lineno, number_per, number_total, currency):
@@ -464,6 +480,8 @@ def compound_amount(self, filename, lineno, number_per, number_total, currency):
         # Note: This is relatively slow, adds about 70ms because of number.as_tuple().
         self._dcupdate(number_per, currency)
         self._dcupdate(number_total, currency)
+        if currency.__class__ is str:
+            currency = self._symbol(currency)
 
         # Note that we are not able to reduce the value to a number per-share
         # here because we only get the number of units in the full lot spec.
@@ -622,6 +640,8 @@ def open(self, filename, lineno, date, account, currencies, booking_str, kvlist)
         else:
             booking = None
 
+        if currencies:
+            currencies = [self._symbol(currency) for currency in currencies]
         entry = Open(meta, date, account, currencies, booking)
         if error:
             self.errors.append(
@@ -657,6 +677,7 @@ def commodity(self, filename, lineno, date, currency, kvlist):
           A new Close object.
         """
         meta = new_metadata(filename, lineno, kvlist)
+        currency = self._symbol(currency)
         return Commodity(meta, date, currency)
 
     def pad(self, filename, lineno, date, account, source_account, kvlist):
@@ -743,6 +764,7 @@ def price(self, filename, lineno, date, currency, amount, kvlist):
           A new Price object.
         """
         meta = new_metadata(filename, lineno, kvlist)
+        currency = self._symbol(currency)
         return Price(meta, date, currency, amount)
 
     def note(self, filename, lineno, date, account, comment, tags_links, kvlist):
@@ -823,7 +845,7 @@ def key_value(self, filename, lineno, key, value):
         Returns:
           A new KeyValue object.
         """
-        return KeyValue(key, value)
+        return KeyValue(self._symbol(key), value)
 
     def posting(self, filename, lineno, account, units, cost, price, istotal, flag):
         """Process a posting grammar rule.
@@ -924,7 +946,7 @@ def tag_link_TAG(self, filename, lineno, tags_links, tag):
         Returns:
           An updated TagsLinks instance.
         """
-        tags_links.tags.add(tag)
+        tags_links.tags.add(self._symbol(tag))
         return tags_links
 
     def tag_link_LINK(self, filename, lineno, tags_links, link):
@@ -936,7 +958,7 @@ def tag_link_LINK(self, filename, lineno, tags_links, link):
         Returns:
           An updated TagsLinks instance.
         """
-        tags_links.links.add(link)
+        tags_links.links.add(self._symbol(link))
         return tags_links
 
     def _unpack_txn_strings(self, txn_strings, meta):
@@ -0,0 +1,297 @@
+"""Incremental reparsing of a single Beancount document.
+
+A Document holds the contents of one file together with its parsed entries,
+errors and options, and the byte span of every directive. A text edit only
+reparses the directives it touches: the rest of the entries are kept, their
+line numbers shifted if needed, and the sorted list of entries is patched in
+place. This is meant for editors and watch-mode tools, which need to
+revalidate after every keystroke.
+
+The document is split into blocks, each starting at a line that begins a
+directive (a date or a state directive like pushtag or option) and running to
+the start of the next one, including trailing comments and blank lines. An
+edit reparses the blocks it overlaps, with the parser state (pushed tags and
+metadata, options) replayed from the preceding state directives. Edits whose
+effect may not be local reparse the whole document: those touching text that
+contains a state directive keyword (the parser accepts them in the middle of
+a line after a syntax error), leaving an unterminated string, or made while
+the document has lexer errors, which may hide the start of a string.
+
+After any sequence of edits, the entries, errors and options are the same as
+those of parsing the current contents with parse_string(), except for the
+display context and the symbol table, which are only ever extended by
+incremental edits, and the "balance_fingerprints" option, which is kept across
+edits once set.
+"""
+
+from __future__ import annotations
+
+__license__ = "GNU GPLv2"
+
+import bisect
+import io
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+from beancount.core import data
+from beancount.parser import lexer
+from beancount.parser import parser
+
+if TYPE_CHECKING:
+    from beancount.loader import OptionsMap
+
+# The keywords of the directives that modify the parser state.
+_STATE_RE = re.compile(rb"pushtag|poptag|pushmeta|popmeta|option|plugin|include")
+
+
+class Change(NamedTuple):
+    """The directives changed by an edit.
+
+    Attributes:
+      removed: A list of the directives that were removed from the entries.
+      added: A list of the directives that were added to the entries.
+      full: True if the whole document was reparsed.
+    """
+
+    removed: data.Directives
+    added: data.Directives
+    full: bool
+
+
+class _Block:
+    """A directive and its trailing lines, and what parsing it produced."""
+
+    __slots__ = ("end", "entries", "errors", "lineno", "start", "state")
+
+    def __init__(self, start: int, end: int, lineno: int, state: bytes | None):
+        self.start = start
+        self.end = end
+        self.lineno = lineno
+        # The text of the directive, for pushtag, option and the like.
+        self.state = state
+        self.entries: data.Directives = []
+        self.errors: list[data.BeancountError] = []
+
+
+def _split_blocks(contents: bytes, offset: int, lineno: int) -> tuple[list[_Block], bool]:
+    """Split text into blocks.
+
+    Args:
+      contents: The bytes to split, starting at the beginning of a line.
+      offset: The byte offset of contents in the document.
+      lineno: The line number of the first line of contents.
+    Returns:
+      A tuple of the list of blocks and a boolean, true if there is an
+      unterminated string.
+    """
+    blocks = [_Block(offset, offset + len(contents), lineno, None)]
+    has_quote = False
+    position = 0
+    for match in parser._SPLIT_RE.finditer(contents):
+        kind = match.lastgroup
+        if kind == "quote":
+            has_quote = True
+        elif kind in ("date", "state"):
+            start = match.start()
+            lineno += contents.count(b"\n", position, start)
+            position = start
+            state = match.group() if kind == "state" else None
+            if start == 0:
+                blocks[0].state = state
+            else:
+                blocks[-1].end = offset + start
+                blocks.append(_Block(offset + start, offset + len(contents), lineno, state))
+    return blocks, has_quote
+
+
+def _lineno(item: data.Directive | data.BeancountError) -> int:
+    meta = item.meta if hasattr(item, "meta") else item.source
+    return meta["lineno"] if meta else 0
+
+
+def _assign(blocks: list[_Block], entries: data.Directives, errors: list[data.BeancountError]):
+    """Attach entries and errors to the blocks their line numbers fall in.
+
+    A syntax error at the end of a directive is reported on the next line, so
+    errors on the first line of a block are attached to the previous one.
+
+    Returns:
+      The list of errors without a line number, that is, those reported at the
+      end of the parse.
+    """
+    linenos = [block.lineno for block in blocks]
+    for entry in entries:
+        index = max(bisect.bisect_right(linenos, _lineno(entry)) - 1, 0)
+        blocks[index].entries.append(entry)
+    final_errors = []
+    for error in errors:
+        lineno = _lineno(error)
+        if not lineno:
+            final_errors.append(error)
+            continue
+        index = max(bisect.bisect_left(linenos, lineno) - 1, 0)
+        blocks[index].errors.append(error)
+    return final_errors
+
+
+def _reports(block: _Block, lineno: int) -> bool:
+    """Return true if a block has errors reported on the given line."""
+    return any(_lineno(error) == lineno for error in block.errors)
+
+
+def _shift(blocks: list[_Block], delta_bytes: int, delta_lines: int):
+    """Move blocks and the line numbers of what they produced."""
+    metas = {}
+    for block in blocks:
+        block.start += delta_bytes
+        block.end += delta_bytes
+        if not delta_lines:
+            continue
+        block.lineno += delta_lines
+        for entry in block.entries:
+            metas[id(entry.meta)] = entry.meta
+            for posting in getattr(entry, "postings", None) or ():
+                if posting.meta and "lineno" in posting.meta:
+                    metas[id(posting.meta)] = posting.meta
+        for error in block.errors:
+            if error.source and error.source.get("lineno"):
+                metas[id(error.source)] = error.source
+    # Errors may share the metadata of the directive they are about, so update
+    # each dict once.
+    for meta in metas.values():
+        meta["lineno"] += delta_lines
+
+
+class Document:
+    """A Beancount document that can be edited and reparsed incrementally.
+
+    Attributes:
+      filename: The filename stored in the metadata of the entries.
+      contents: The bytes of the document.
+      entries: A list of the parsed directives, sorted by data.entry_sortkey.
+        The list is patched in place by edits.
+      options_map: The options parsed from the document.
+    """
+
+    def __init__(self, contents: str | bytes, filename: str = "<string>"):
+        self.filename = filename
+        self.contents = contents.encode("utf8") if isinstance(contents, str) else contents
+        self.entries: data.Directives = []
+        self.options_map: OptionsMap = {}
+        self._blocks: list[_Block] = []
+        self._final_errors: list[data.BeancountError] = []
+        # True if edits must reparse the whole document, see the module docstring.
+        self._whole = False
+        self._reparse()
+
+    @property
+    def errors(self) -> list[data.BeancountError]:
+        """The parse errors, in the order parse_string() would report them."""
+        errors = [error for block in self._blocks for error in block.errors]
+        return errors + self._final_errors
+
+    def span(self, entry: data.Directive) -> tuple[int, int]:
+        """Return the byte span of a directive in the contents.
+
+        Args:
+          entry: A directive from the entries.
+        Returns:
+          A pair of the start and end byte offsets of the directive, including
+          the comments and blank lines that follow it.
+        Raises:
+          KeyError: If the entry is not part of this document.
+        """
+        index = self._block_index(_lineno(entry))
+        block = self._blocks[index]
+        if not any(other is entry for other in block.entries):
+            raise KeyError(entry)
+        return block.start, block.end
+
+    def _block_index(self, lineno: int) -> int:
+        return max(bisect.bisect_right(self._blocks, lineno, key=lambda b: b.lineno) - 1, 0)
+
+    def _reparse(self) -> Change:
+        """Parse the whole document again."""
+        removed = self.entries[:]
+        fingerprints = self.options_map.get("balance_fingerprints")
+        entries, errors, self.options_map = parser.parse_file(
+            io.BytesIO(self.contents), report_filename=self.filename
+        )
+        if fingerprints is not None:
+            self.options_map["balance_fingerprints"] = fingerprints
+        self._blocks, has_quote = _split_blocks(self.contents, 0, 1)
+        self._final_errors = _assign(self._blocks, entries, errors)
+        self._whole = has_quote or any(isinstance(error, lexer.LexerError) for error in errors)
+        self.entries[:] = entries
+        return Change(removed, entries[:], True)
+
+    def edit(self, start: int, end: int, text: str | bytes) -> Change:
+        """Replace a byte range of the contents and reparse what it touches.
+
+        Args:
+          start: The byte offset of the start of the replaced range.
+          end: The byte offset of the end of the replaced range.
+          text: The replacement text.
+        Returns:
+          A Change instance with the directives removed and added.
+        """
+        if isinstance(text, str):
+            text = text.encode("utf8")
+        if not 0 <= start <= end <= len(self.contents):
+            raise ValueError(f"Invalid edit range: {start}-{end}")
+        blocks = self._blocks
+
+        # Find the blocks overlapping the edit, and the one before: the edit may
+        # remove the date that starts a block, or add a posting to the previous
+        # one when inserting at the start of a block.
+        first = max(bisect.bisect_right(blocks, start, key=lambda b: b.start) - 2, 0)
+        last = max(bisect.bisect_right(blocks, end, key=lambda b: b.start) - 1, first)
+        # Errors reported on the first line of a block may come from either
+        # side of it, so reparse both. The region must also end at the start of
+        # a line for the next block to still start a directive.
+        contents = self.contents[:start] + text + self.contents[end:]
+        delta_bytes = len(text) - (end - start)
+        while first > 0 and _reports(blocks[first - 1], blocks[first].lineno):
+            first -= 1
+        while last + 1 < len(blocks) and (
+            _reports(blocks[last], blocks[last + 1].lineno)
+            or contents[blocks[last].end + delta_bytes - 1] != ord("\n")
+        ):
+            last += 1
+        old_region = self.contents[blocks[first].start : blocks[last].end]
+        region = contents[blocks[first].start : blocks[last].end + delta_bytes]
+        delta_lines = region.count(b"\n") - old_region.count(b"\n")
+
+        self.contents = contents
+        if self._whole or _STATE_RE.search(old_region) or _STATE_RE.search(region):
+            return self._reparse()
+        lineno = blocks[first].lineno
+        new_blocks, has_quote = _split_blocks(region, blocks[first].start, lineno)
+        if has_quote:
+            return self._reparse()
+
+        # Parse the region with the state left by the preceding directives.
+        preamble = b"\n".join(block.state for block in blocks[:first] if block.state)
+        added, errors, _, _, _, dcontext, _ = parser._parse_chunk(
+            region, self.filename, lineno, preamble, self.options_map["symbols"]
+        )
+        if any(isinstance(error, lexer.LexerError) for error in errors):
+            return self._reparse()
+        _assign(new_blocks, added, errors)
+        self.options_map["dcontext"].update_from(dcontext)
+
+        # Remove the old entries while the sort keys are still valid, then shift
+        # the following blocks and insert the new entries.
+        removed = [entry for block in blocks[first : last + 1] for entry in block.entries]
+        for entry in removed:
+            index = bisect.bisect_left(
+                self.entries, data.entry_sortkey(entry), key=data.entry_sortkey
+            )
+            while self.entries[index] is not entry:
+                index += 1
+            del self.entries[index]
+        _shift(blocks[last + 1 :], delta_bytes, delta_lines)
+        blocks[first : last + 1] = new_blocks
+        for entry in added:
+            bisect.insort(self.entries, entry, key=data.entry_sortkey)
+        return Change(removed, added, False)
@@ -0,0 +1,209 @@
+__license__ = "GNU GPLv2"
+
+import io
+import random
+import textwrap
+import unittest
+
+from beancount.parser import incremental
+from beancount.parser import parser
+
+LEDGER = textwrap.dedent(
+    """\
+    option "title" "Incremental"
+    2020-01-01 open Assets:Cash
+    2020-01-01 open Equity:Opening
+    2020-01-01 open Expenses:Food
+
+    * Heading
+
+    2020-01-02 * "First"
+      Expenses:Food  1.00 USD
+      Assets:Cash
+
+    pushtag #trip
+    2020-01-03 * "Tagged"
+      Expenses:Food  2.00 USD
+      Assets:Cash
+    2020-01-03 * "Also tagged"
+      Expenses:Food  2.50 USD
+      Assets:Cash
+    poptag #trip
+
+    pushmeta location: "Home"
+    2020-01-04 note Assets:Cash "A note
+    spanning lines
+    2020-01-05 * with a date"
+    popmeta location:
+
+    ; A comment.
+    2020-01-06 * "Last"
+      Expenses:Food  3.00 USD
+      Assets:Cash
+    """
+).encode("utf8")
+
+SNIPPETS = [
+    b"",
+    b"1",
+    b"x",
+    b"\n",
+    b"  ",
+    b'"',
+    b'2021-03-04 * "New"\n  Assets:Cash  5 USD\n  Equity:Opening\n',
+    b"  Expenses:Food  1.00 USD\n",
+    b"pushtag #p\n",
+    b"; comment\n",
+    b"2020-01-01 open Assets:New\n",
+    b"2020-01-01 open\n",
+    b'  key: "value"\n',
+    b"garbage line\n",
+    b"* heading\n",
+    b"{",
+    b"@ 1 EUR",
+]
+
+# Whole lines which do not cause lexer errors, after which every edit would
+# reparse the whole document.
+LINE_SNIPPETS = [
+    b"",
+    b"\n",
+    b'2021-03-04 * "New"\n  Assets:Cash  5 USD\n  Equity:Opening\n',
+    b"  Expenses:Food  1.00 USD\n",
+    b"; comment\n",
+    b"2020-01-01 open Assets:New\n",
+    b"2020-01-01 open\n",
+    b'  key: "value"\n',
+    b"* heading\n",
+    b"2019-01-01 balance Assets:Cash  0 USD\n",
+]
+
+FILLER = b"".join(
+    b'2020-02-%02d * "Filler"\n  Expenses:Food  1 USD\n  Assets:Cash\n\n' % day
+    for day in range(1, 29)
+)
+
+
+class TestDocument(unittest.TestCase):
+    def assertSameAsFullParse(self, document, message=None):
+        entries, errors, options_map = parser.parse_file(
+            io.BytesIO(document.contents), report_filename=document.filename
+        )
+        self.assertEqual(entries, document.entries, message)
+        self.assertEqual(errors, document.errors, message)
+        for name, value in options_map.items():
+            if name not in ("dcontext", "symbols"):
+                self.assertEqual(value, document.options_map[name], message)
+
+    def random_edits(self, seed, count, lines, snippets):
+        """Apply random edits, checking the document after each one.
+
+        Returns:
+          The number of edits which reparsed the whole document.
+        """
+        rng = random.Random(seed)
+        document = incremental.Document(LEDGER + FILLER)
+        self.assertSameAsFullParse(document)
+        full = 0
+        for index in range(count):
+            size = len(document.contents)
+            start = rng.randrange(size + 1)
+            if lines:
+                start = document.contents.rfind(b"\n", 0, start) + 1
+                end = start
+                for _ in range(rng.choice([0, 0, 1, 1, 2, 4])):
+                    end = document.contents.find(b"\n", end) + 1 or size
+            else:
+                end = min(size, start + rng.choice([0, 0, 1, 2, 5, 20, 80]))
+            text = rng.choice(snippets)
+            full += document.edit(start, end, text).full
+            self.assertSameAsFullParse(document, (index, start, end, text))
+            if len(document.contents) < 500:
+                # Keep the document from wearing away.
+                size = len(document.contents)
+                full += document.edit(size, size, FILLER).full
+        return full
+
+    def test_random_edits(self):
+        for seed in range(5):
+            self.random_edits(seed, 100, False, SNIPPETS)
+
+    def test_random_line_edits(self):
+        full = sum(self.random_edits(seed, 100, True, LINE_SNIPPETS) for seed in range(5))
+        # Edits leaving an unterminated string reparse the whole document until
+        # it is closed, but many are reparsed incrementally.
+        self.assertLess(full, 350)
+
+    def test_local_edit(self):
+        document = incremental.Document(LEDGER)
+        offset = LEDGER.index(b"1.00 USD")
+        change = document.edit(offset, offset + 4, b"4.50")
+        self.assertFalse(change.full)
+        # The edit also reparses the directive before it.
+        self.assertEqual(2, len(change.removed))
+        self.assertEqual(change.removed[0], change.added[0])
+        self.assertEqual("First", change.added[1].narration)
+        self.assertSameAsFullParse(document)
+
+    def test_edit_shifts_lines(self):
+        document = incremental.Document(LEDGER)
+        offset = LEDGER.index(b"2020-01-02")
+        change = document.edit(offset, offset, b"2020-01-02 open Assets:Other\n\n")
+        self.assertFalse(change.full)
+        self.assertSameAsFullParse(document)
+        last = document.entries[-1]
+        start, end = document.span(last)
+        self.assertTrue(document.contents[start:end].startswith(b'2020-01-06 * "Last"'))
+
+    def test_edit_inside_pushed_state(self):
+        document = incremental.Document(LEDGER)
+        offset = LEDGER.index(b"2.50 USD")
+        change = document.edit(offset, offset + 1, b"7")
+        self.assertFalse(change.full)
+        self.assertEqual({"trip"}, change.added[-1].tags)
+        self.assertSameAsFullParse(document)
+
+    def test_edit_state_directive(self):
+        document = incremental.Document(LEDGER)
+        offset = LEDGER.index(b"#trip")
+        change = document.edit(offset, offset + 5, b"#holiday")
+        self.assertTrue(change.full)
+        self.assertSameAsFullParse(document)
+
+    def test_unterminated_string(self):
+        document = incremental.Document(LEDGER)
+        offset = LEDGER.index(b'"First"')
+        self.assertTrue(document.edit(offset, offset + 1, b"").full)
+        self.assertSameAsFullParse(document)
+        # Edits reparse the whole document until the string is closed.
+        self.assertTrue(document.edit(offset, offset, b'"').full)
+        self.assertSameAsFullParse(document)
+        offset = document.contents.index(b"1.00 USD")
+        self.assertFalse(document.edit(offset, offset, b"").full)
+
+    def test_trailing_errors(self):
+        document = incremental.Document(LEDGER + b"2020-01-07 open\n")
+        self.assertTrue(document.errors)
+        self.assertSameAsFullParse(document)
+        size = len(document.contents)
+        document.edit(size, size, b"2020-01-08 * unquoted\n  Assets:Cash 1 USD\n")
+        self.assertSameAsFullParse(document)
+        document.edit(size - len(b"2020-01-07 open\n"), size, b"")
+        self.assertSameAsFullParse(document)
+
+    def test_invalid_range(self):
+        document = incremental.Document(LEDGER)
+        with self.assertRaises(ValueError):
+            document.edit(10, 5, b"")
+        with self.assertRaises(ValueError):
+            document.edit(0, len(LEDGER) + 1, b"")
+
+    def test_span_of_unknown_entry(self):
+        document = incremental.Document(LEDGER)
+        entry = parser.parse_string(LEDGER.decode("utf8"))[0][-1]
+        with self.assertRaises(KeyError):
+            document.span(entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
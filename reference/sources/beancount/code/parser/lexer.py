@@ -5,9 +5,13 @@
 __copyright__ = "Copyright (C) 2014-2021, 2024  Martin Blais"
 __license__ = "GNU GPLv2"
 
+import array
 import contextlib
 import io
+import itertools
+import operator
 from typing import TYPE_CHECKING
+from typing import Any
 from typing import NamedTuple
 
 from beancount.core.data import Meta
@@ -18,6 +22,84 @@
     from beancount.core.data import BeancountError
 
 
+# The names of the token kinds, as returned by lex_iter(). lex_arrays() stores
+# the kind of a token as its index in this tuple.
+TOKEN_NAMES = (
+    "error",
+    "INDENT",
+    "EOL",
+    "PIPE",
+    "ATAT",
+    "AT",
+    "LCURLCURL",
+    "RCURLCURL",
+    "LCURL",
+    "RCURL",
+    "COMMA",
+    "TILDE",
+    "HASH",
+    "ASTERISK",
+    "SLASH",
+    "COLON",
+    "PLUS",
+    "MINUS",
+    "LPAREN",
+    "RPAREN",
+    "FLAG",
+    "CAPITAL",
+    "TXN",
+    "BALANCE",
+    "OPEN",
+    "CLOSE",
+    "COMMODITY",
+    "PAD",
+    "EVENT",
+    "PRICE",
+    "NOTE",
+    "DOCUMENT",
+    "QUERY",
+    "CUSTOM",
+    "PUSHTAG",
+    "POPTAG",
+    "PUSHMETA",
+    "POPMETA",
+    "OPTION",
+    "INCLUDE",
+    "PLUGIN",
+    "NONE",
+    "BOOL",
+    "DATE",
+    "ACCOUNT",
+    "CURRENCY",
+    "STRING",
+    "NUMBER",
+    "TAG",
+    "LINK",
+    "KEY",
+)
+TOKEN_CODES = {name: code for code, name in enumerate(TOKEN_NAMES)}
+
+# The codes of the kinds of tokens that have a semantic value.
+VALUE_CODES = frozenset(
+    TOKEN_CODES[name]
+    for name in (
+        "NONE",
+        "BOOL",
+        "DATE",
+        "ACCOUNT",
+        "CURRENCY",
+        "STRING",
+        "NUMBER",
+        "TAG",
+        "LINK",
+        "KEY",
+    )
+)
+
+# The number of tokens converted to arrays at once.
+_BATCH_SIZE = 1 << 16
+
+
 class LexerError(NamedTuple):
     """A named tuple to represent lexer errors."""
 
@@ -83,3 +165,131 @@ def lex_iter_string(string, builder=None, **kwargs):
         string = string.encode("utf8")
     file = io.BytesIO(string)
     yield from lex_iter(file, builder=builder, **kwargs)
+
+
+class TokenArrays:
+    """The tokens of a file, stored as parallel arrays.
+
+    Tokens do not hold a copy of their text: their offsets refer to the lexed
+    bytes, and their semantic values are decoded when asked for.
+
+    Attributes:
+      buffer: The bytes that were lexed.
+      kinds: An array of token kinds, as indexes in TOKEN_NAMES.
+      starts: An array of the byte offsets of the start of the tokens.
+      ends: An array of the byte offsets of the end of the tokens.
+      linenos: An array of line numbers, as reported by lex_iter().
+    """
+
+    def __init__(self, buffer: bytes):
+        self.buffer = buffer
+        self.kinds = array.array("B")
+        self.starts = array.array("Q")
+        self.ends = array.array("Q")
+        self.linenos = array.array("L")
+        self._parser = None
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> tuple[str, int, bytes, Any]:
+        """Return a token as the tuple that lex_iter() yields for it."""
+        return (self.kind(index), self.linenos[index], bytes(self.text(index)), self.value(index))
+
+    def kind(self, index: int) -> str:
+        """Return the name of the kind of a token."""
+        return TOKEN_NAMES[self.kinds[index]]
+
+    def text(self, index: int) -> memoryview:
+        """Return the text of a token, without copying it."""
+        return memoryview(self.buffer)[self.starts[index] : self.ends[index]]
+
+    def value(self, index: int) -> Any:
+        """Decode the semantic value of a token.
+
+        Args:
+          index: The index of the token.
+        Returns:
+          The value lex_iter() yields for the token, or None if its kind has
+          no value.
+        """
+        code = self.kinds[index]
+        if code not in VALUE_CODES:
+            return None
+        text = bytes(self.text(index))
+        if code == TOKEN_CODES["KEY"]:
+            # A key is only lexed as such when followed by a colon.
+            text += b":"
+        # Run the lexer on the text of the token alone, which is enough to
+        # build its value the same way.
+        if self._parser is None:
+            self._parser = _parser.Parser(LexBuilder())
+        token = next(self._parser.lex(io.BytesIO(text)))
+        return token[3]
+
+
+def lex_arrays(file, builder=None, filename=None):
+    """Lex a whole file into parallel arrays.
+
+    This is a compact alternative to lex_iter() for tools that only need the
+    kinds and positions of the tokens, like formatters, highlighters or
+    linters. Each token takes a few machine integers instead of a tuple, a
+    copy of its text and its value.
+
+    It saves memory, not time: the tokens still come from the scanner, which
+    builds all their values, and their byte offsets, which it does not report,
+    are recovered by searching the buffer for their text. Lexing a file this
+    way takes two to three times as long as list(lex_iter()); use lex_iter()
+    when speed matters more than the memory taken by the tokens.
+
+    Args:
+      file: A string, the filename to run the lexer on, or a binary file
+        object.
+      builder: A builder of your choice. If not specified, a LexBuilder is
+        used and discarded (along with its errors).
+      filename: The filename to report errors with, if not that of the file.
+    Returns:
+      A TokenArrays instance.
+    """
+    if isinstance(file, io.IOBase):
+        buffer = file.read()
+        filename = filename or getattr(file, "name", None)
+    else:
+        with open(file, "rb") as infile:
+            buffer = infile.read()
+        filename = filename or file
+    if builder is None:
+        builder = LexBuilder()
+    parser = _parser.Parser(builder)
+    tokens = parser.lex(io.BytesIO(buffer), filename=filename)
+    arrays = TokenArrays(buffer)
+    starts = arrays.starts
+    find = buffer.find
+    position = 0
+    while batch := list(itertools.islice(tokens, _BATCH_SIZE)):
+        arrays.kinds.extend(map(TOKEN_CODES.__getitem__, map(operator.itemgetter(0), batch)))
+        arrays.linenos.extend(map(operator.itemgetter(1), batch))
+        texts = list(map(operator.itemgetter(2), batch))
+        first = len(starts)
+        for text in texts:
+            # Tokens are separated by whitespace, comments and ignored lines,
+            # none of which starts like the token that follows them.
+            if buffer[position] != text[0]:
+                position = find(text, position)
+            starts.append(position)
+            position += len(text)
+        arrays.ends.extend(map(operator.add, starts[first:], map(len, texts)))
+    return arrays
+
+
+def lex_arrays_string(string, builder=None, **kwargs):
+    """Lex a string into parallel arrays.
+
+    Args:
+      string: a str or bytes, the contents of the ledger to be parsed.
+    Returns:
+      A TokenArrays instance, see ``lex_arrays()`` for details.
+    """
+    if not isinstance(string, bytes):
+        string = string.encode("utf8")
+    return lex_arrays(io.BytesIO(string), builder=builder, **kwargs)
@@ -0,0 +1,85 @@
+__license__ = "GNU GPLv2"
+
+import io
+import textwrap
+import unittest
+
+from beancount.parser import lexer
+
+LEDGER = textwrap.dedent(
+    """\
+    ;; A comment
+    option "title" "Arrays"
+    pushtag #trip
+
+    * Org-mode heading
+    2014-01-01 open Assets:Cash  USD,EUR
+    2014-01-02 * "Payee" "A narration
+    spanning lines" #tag ^link
+      key: TRUE
+      other: NULL
+      Assets:Cash   -10.50 USD @@ 11.25 EUR ; trailing
+      Expenses:Óthяr   {1,000.00 USD, 2014-01-01, "label"}
+      | pipe
+    2014-01-03 balance Assets:Cash  (1 + 2) * 3 / 4 USD ~ 0.01
+    2014-01-04 custom "budget" Assets:Cash FALSE 2014-01-01
+    2014-13-45 open Assets:Bad
+      abc1:abc1 1.2.3 USD
+    poptag #trip
+    """
+)
+
+
+class TestLexArrays(unittest.TestCase):
+    def check(self, string):
+        """Lex a string both ways and check that the tokens and errors are the same."""
+        expected_builder = lexer.LexBuilder()
+        expected = list(lexer.lex_iter_string(string, expected_builder))
+        builder = lexer.LexBuilder()
+        arrays = lexer.lex_arrays_string(string, builder)
+        self.assertEqual(len(expected), len(arrays))
+        self.assertEqual(expected, [arrays[index] for index in range(len(arrays))])
+        kinds, linenos, texts, values = zip(*expected) if expected else ((), (), (), ())
+        self.assertEqual(list(kinds), [arrays.kind(index) for index in range(len(arrays))])
+        self.assertEqual(list(linenos), arrays.linenos.tolist())
+        self.assertEqual(
+            list(texts), [arrays.text(index).tobytes() for index in range(len(arrays))]
+        )
+        self.assertEqual(list(values), [arrays.value(index) for index in range(len(arrays))])
+        self.assertEqual(expected_builder.errors, builder.errors)
+        return arrays, builder.errors
+
+    def test_same_as_lex_iter(self):
+        arrays, errors = self.check(LEDGER)
+        self.assertTrue(errors)
+        kinds = {arrays.kind(index) for index in range(len(arrays))}
+        for kind in ("error", "STRING", "NUMBER", "DATE", "KEY", "BOOL", "NONE", "TAG", "LINK"):
+            self.assertIn(kind, kinds)
+
+    def test_offsets(self):
+        arrays, _ = self.check(LEDGER)
+        buffer = LEDGER.encode("utf8")
+        for index in range(len(arrays)):
+            start, end = arrays.starts[index], arrays.ends[index]
+            self.assertEqual(buffer[start:end], arrays.text(index).tobytes())
+            if index:
+                self.assertLessEqual(arrays.ends[index - 1], start)
+
+    def test_empty(self):
+        arrays, errors = self.check("")
+        self.assertEqual(0, len(arrays))
+        self.assertEqual([], errors)
+
+    def test_file(self):
+        builder = lexer.LexBuilder()
+        arrays = lexer.lex_arrays(io.BytesIO(b"2014-01-01 open 12\n"), builder, "ledger.beancount")
+        self.assertEqual(["DATE", "OPEN", "NUMBER", "EOL"], [arrays.kind(i) for i in range(4)])
+        self.assertEqual([], builder.errors)
+        lexer.lex_arrays(io.BytesIO(b"2014-01-01 open \x01\n"), builder, "ledger.beancount")
+        self.assertEqual(
+            ["ledger.beancount"], [error.source["filename"] for error in builder.errors]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -263,6 +263,26 @@ def Opt(
     """,
         [Opt("dcontext", display_context.DisplayContext())],
     ),
+    OptGroup(
+        """
+      A dict of the account names, currencies, tags, links and metadata keys
+      seen by the parser, each mapped to itself. The parser interns these
+      strings through this table, so the entries all share the single instance
+      of each that is stored here. This is created automatically by the parser.
+    """,
+        [Opt("symbols", {})],
+    ),
+    OptGroup(
+        """
+      An optional record of the transactions which were found to balance, an
+      instance of beancount.ops.validation.BalanceFingerprints. If it is set,
+      validating the ledger again skips the balance check of the transactions
+      which have not changed since. This is left unset by the parser; tools
+      which validate a ledger repeatedly set it, and Document keeps it when it
+      reparses the whole document. It cannot be set from an input file.
+    """,
+        [Opt("balance_fingerprints", None)],
+    ),
     OptGroup(
         """
       A set of all the commodities that we have seen in the file.
@@ -662,7 +682,7 @@ def Opt(
 
 
 # A list of options that cannot be modified.
-READ_ONLY_OPTIONS = {"filename", "plugin"}
+READ_ONLY_OPTIONS = {"filename", "plugin", "balance_fingerprints"}
 
 
 def get_account_types(options):
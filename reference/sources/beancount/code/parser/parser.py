@@ -113,24 +113,33 @@
 __license__ = "GNU GPLv2"
 
 import codecs
+import concurrent.futures
 import contextlib
 import functools
+import glob
 import inspect
 import io
+import os
+import pickle
+import re
 import sys
 import textwrap
+from collections.abc import Callable
+from os import path
 from typing import TYPE_CHECKING
 from typing import Any
 
 from beancount.core import data
+from beancount.core import display_context
 from beancount.core.number import MISSING
 from beancount.parser import _parser
 from beancount.parser import grammar
 from beancount.parser import hashsrc
+from beancount.parser import lexer
 from beancount.parser import printer
 from beancount.parser.grammar import DeprecatedError  # noqa: F401
 from beancount.parser.grammar import ParserError  # noqa: F401
-from beancount.parser.grammar import ParserSyntaxError  # noqa: F401
+from beancount.parser.grammar import ParserSyntaxError
 
 if TYPE_CHECKING:
     from beancount.loader import OptionsMap
@@ -249,6 +258,425 @@ def parse_string(
     return parse_file(file, report_filename=report_filename, **kw)
 
 
+def parse_sources(
+    sources: list[tuple[str, bool]],
+    parse_filename: Callable[[str], tuple[data.Directives, list[data.BeancountError], OptionsMap]],
+    log_timings: Any = None,
+    encoding: str | None = None,
+    on_include: Callable[[str], None] | None = None,
+) -> tuple[data.Directives, list[data.BeancountError], OptionsMap]:
+    """Parse Beancount input and its include files, with a given file parser.
+
+    This is the walk of loader._parse_recursive(), which it matches step for
+    step: files and strings are parsed breadth-first, duplicates and missing
+    files are reported as errors, and only the options of the top-level source
+    are kept. The parsing of files from disk is delegated to a callable, so that
+    it can be done elsewhere, e.g. in a worker process. Keep the two in sync.
+
+    Args:
+      sources: A list of (filename-or-string, is-filename), as for
+        loader._parse_recursive(). Filenames must be absolute paths.
+      parse_filename: A function which parses a normalized, absolute filename
+        and returns its (entries, errors, options_map), as parse_file() does.
+        Encrypted files are not passed to it but parsed as strings.
+      log_timings: A function to write timings to, or None, if it should remain quiet.
+      encoding: A string or None, the encoding to decode the input filename with.
+      on_include: An optional function called with the normalized filename of
+        each include file as soon as it is queued to be parsed.
+    Returns:
+      A tuple of (entries, parse_errors, options_map).
+    """
+    # The loader imports this module; import it lazily to reuse its errors and
+    # options aggregation.
+    from beancount import loader
+    from beancount.parser import options
+    from beancount.utils import encryption
+    from beancount.utils import misc_utils
+
+    assert isinstance(sources, list) and all(isinstance(el, tuple) for el in sources)
+
+    entries = []
+    parse_errors: list[data.BeancountError] = []
+    options_map = None
+    other_options_map = []
+    source_stack = list(sources)
+    filenames_seen = set()
+
+    with misc_utils.log_time("beancount.parser.parser", log_timings, indent=1):
+        while source_stack:
+            source, is_file = source_stack.pop(0)
+            is_top_level = options_map is None
+
+            if is_file:
+                cwd = path.dirname(source)
+                source_filename = source
+                if encryption.is_encrypted_file(source):
+                    source = encryption.read_encrypted_file(source)
+                    is_file = False
+            else:
+                cwd = os.getcwd()
+                source_filename = None
+
+            if is_file:
+                assert path.isabs(source)
+                filename = path.normpath(source)
+
+                if filename in filenames_seen:
+                    parse_errors.append(
+                        loader.LoadError(
+                            data.new_metadata("<load>", 0),
+                            'Duplicate filename parsed: "{}"'.format(filename),
+                        )
+                    )
+                    continue
+
+                if not path.exists(filename):
+                    parse_errors.append(
+                        loader.LoadError(
+                            data.new_metadata("<load>", 0),
+                            'File "{}" does not exist'.format(filename),
+                        )
+                    )
+                    continue
+
+                filenames_seen.add(filename)
+                with misc_utils.log_time(
+                    "beancount.parser.parser.parse_file", log_timings, indent=2
+                ):
+                    (src_entries, src_errors, src_options_map) = parse_filename(filename)
+
+                cwd = path.dirname(filename)
+            else:
+                if encoding:
+                    if isinstance(source, bytes):
+                        source = source.decode(encoding)
+                    source = source.encode("ascii", "replace")  # type: ignore[assignment]
+
+                with misc_utils.log_time(
+                    "beancount.parser.parser.parse_string", log_timings, indent=2
+                ):
+                    (src_entries, src_errors, src_options_map) = parse_string(
+                        source, source_filename
+                    )
+
+            entries.extend(src_entries)
+            parse_errors.extend(src_errors)
+
+            if is_top_level:
+                options_map = src_options_map
+            else:
+                other_options_map.append(src_options_map)
+
+            include_expanded = []
+            for include_filename in src_options_map["include"]:
+                search_path = include_filename
+                if not os.path.isabs(include_filename):
+                    search_path = os.path.join(cwd, include_filename)
+                matched_filenames = glob.glob(search_path, recursive=True)
+                if matched_filenames:
+                    include_expanded.extend(matched_filenames)
+                else:
+                    parse_errors.append(
+                        loader.LoadError(
+                            data.new_metadata("<load>", 0),
+                            'File glob "{}" does not match any files'.format(include_filename),
+                        )
+                    )
+            for include_filename in include_expanded:
+                if not path.isabs(include_filename):
+                    include_filename = path.join(cwd, include_filename)
+                include_filename = path.normpath(include_filename)
+                source_stack.append((include_filename, True))
+                if on_include is not None and include_filename not in filenames_seen:
+                    on_include(include_filename)
+
+    if options_map is None:
+        options_map = options.OPTIONS_DEFAULTS.copy()
+
+    options_map["include"] = sorted(filenames_seen)
+
+    options_map = loader.aggregate_options_map(options_map, other_options_map)
+
+    return entries, parse_errors, options_map
+
+
+def _parse_file_worker(
+    filename: str, encoding: str | None
+) -> tuple[data.Directives, list[data.BeancountError], OptionsMap]:
+    """Parse a file in a worker process. See parse_recursive_parallel()."""
+    return parse_file(filename, encoding=encoding)
+
+
+def parse_recursive_parallel(
+    sources: list[tuple[str, bool]],
+    log_timings: Any = None,
+    encoding: str | None = None,
+    max_workers: int | None = None,
+) -> tuple[data.Directives, list[data.BeancountError], OptionsMap]:
+    """Parse Beancount input and its include files, parsing files in parallel.
+
+    This is a drop-in replacement for loader._parse_recursive() and produces
+    exactly the same entries, errors and options map, in the same order. The
+    include graph is walked by parse_sources() in the same breadth-first order
+    as the serial loader, but every file is submitted to a process pool as soon
+    as the file including it has been parsed, so sibling files (e.g. one file
+    per year or per account) are parsed concurrently while the results are
+    still merged in serial order. Encrypted files and string sources are parsed
+    in this process.
+
+    Args:
+      sources: A list of (filename-or-string, is-filename), as for
+        loader._parse_recursive(). Filenames must be absolute paths.
+      log_timings: A function to write timings to, or None, if it should remain quiet.
+      encoding: A string or None, the encoding to decode the input filename with.
+      max_workers: The number of worker processes, or None for one per CPU. With
+        a value of 1 or less, or with no include files, no pool is started and
+        all files are parsed in this process.
+    Returns:
+      A tuple of (entries, parse_errors, options_map).
+    """
+    from beancount.utils import encryption
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1:
+        return parse_sources(
+            sources, functools.partial(parse_file, encoding=encoding), log_timings, encoding
+        )
+
+    # Pending parses by normalized filename, and the pool, created on the first
+    # include.
+    futures: dict[str, concurrent.futures.Future] = {}
+    pool = None
+
+    def submit(filename: str) -> None:
+        nonlocal pool
+        if (
+            filename in futures
+            or not path.exists(filename)
+            or encryption.is_encrypted_file(filename)
+        ):
+            return
+        if pool is None:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        futures[filename] = pool.submit(_parse_file_worker, filename, encoding)
+
+    def parse_filename(
+        filename: str,
+    ) -> tuple[data.Directives, list[data.BeancountError], OptionsMap]:
+        future = futures.pop(filename, None)
+        # Parse here rather than wait if no worker has started on it.
+        if future is None or future.cancel():
+            return parse_file(filename, encoding=encoding)
+        return future.result()
+
+    try:
+        return parse_sources(sources, parse_filename, log_timings, encoding, submit)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+# A scanner for the few lexical features needed to split a file: strings (which
+# may span lines), comments, lines ignored by the lexer, directives that modify
+# the parser state, lines starting with a date, i.e., with a new directive, and
+# unterminated quotes.
+_SPLIT_RE = re.compile(
+    rb'"(?:[^"\\]|\\.)*"'
+    rb"|;[^\n]*"
+    rb"|^[*:!&?%][^\n]*"
+    rb"|^#(?![A-Za-z0-9\-_/.])[^\n]*"
+    rb"|(?P<state>^(?:pushtag|poptag|pushmeta|popmeta|option|plugin|include)\b"
+    rb'(?:[^"\n;]|"(?:[^"\\]|\\.)*")*)'
+    rb"|(?P<date>^(?=[0-9]{4,}[\-/][0-9]+[\-/][0-9]+))"
+    rb'|(?P<quote>")',
+    re.MULTILINE,
+)
+
+
+def split_chunks(contents: bytes, chunk_size: int) -> list[tuple[int, int, bytes]]:
+    """Find the boundaries to parse a file in chunks of about chunk_size bytes.
+
+    A chunk starts at a line beginning with a date (so at a directive) that is
+    outside of any string. The parser state at that point (pushed tags and
+    metadata, options) is described by the state directives found before it,
+    which are returned as a preamble to be replayed before parsing the chunk.
+
+    Args:
+      contents: The bytes of the file.
+      chunk_size: The minimum number of bytes in a chunk.
+    Returns:
+      A list of (offset, lineno, preamble) tuples, one per chunk, where offset is
+      the byte offset of the start of the chunk, lineno its line number and
+      preamble the state directives preceding it, separated by newlines.
+    """
+    chunks = [(0, 1, b"")]
+    if len(contents) < 2 * chunk_size:
+        return chunks
+    state = []
+    next_offset = chunk_size
+    offset, lineno = 0, 1
+    for match in _SPLIT_RE.finditer(contents):
+        if match.lastgroup == "state":
+            state.append(match.group())
+        elif match.lastgroup == "date" and match.start() >= next_offset:
+            if len(contents) - match.start() < chunk_size:
+                break
+            lineno += contents.count(b"\n", offset, match.start())
+            offset = match.start()
+            chunks.append((offset, lineno, b"\n".join(state)))
+            next_offset = offset + chunk_size
+    return chunks
+
+
+def _parse_chunk(
+    contents: bytes,
+    filename: str,
+    lineno: int,
+    preamble: bytes,
+    symbols: dict[str, str] | None = None,
+) -> tuple[data.Directives, list[data.BeancountError], OptionsMap, list, dict, Any, dict]:
+    """Parse one chunk of a file. See parse_file_parallel().
+
+    Args:
+      symbols: An optional symbol table to intern strings with, as the one
+        in the "symbols" option of an earlier parse. It is updated in place.
+    Returns:
+      A tuple of the entries, errors, options, tags and metadata stacks,
+      display context and symbol table of the builder after parsing the chunk.
+    """
+    builder = grammar.Builder()
+    if symbols is not None:
+        builder.symbols = symbols
+    if preamble:
+        # Replay the state directives that precede the chunk and drop whatever
+        # else they produced; those errors belong to earlier chunks.
+        _parser.Parser(builder).parse(io.BytesIO(preamble), filename=filename)
+        builder.entries = []
+        builder.errors = []
+        builder.dcontext = display_context.DisplayContext()
+        builder.display_context_update = builder.dcontext.update
+    _parser.Parser(builder).parse(io.BytesIO(contents), filename=filename, lineno=lineno)
+    return (
+        builder.entries,
+        builder.errors,
+        builder.options,
+        builder.tags,
+        builder.meta,
+        builder.dcontext,
+        builder.symbols,
+    )
+
+
+class _SymbolPickler(pickle.Pickler):
+    """A pickler which writes the strings of a symbol table as persistent IDs."""
+
+    def __init__(self, file: io.BytesIO, symbols: dict[str, str]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.symbols = symbols
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if obj.__class__ is str and obj in self.symbols:
+            return obj
+        return None
+
+
+class _SymbolUnpickler(pickle.Unpickler):
+    """An unpickler which resolves the persistent IDs of symbols with a function."""
+
+    def __init__(self, file: io.BytesIO, intern: Callable[[str], str]):
+        super().__init__(file)
+        self.intern = intern
+
+    def persistent_load(self, pid: str) -> str:
+        return self.intern(pid)
+
+
+def _parse_chunk_worker(contents: bytes, filename: str, lineno: int, preamble: bytes) -> bytes:
+    """Parse one chunk of a file in a worker process. See parse_file_parallel().
+
+    Returns:
+      The result of _parse_chunk(), pickled with its accounts, currencies, tags,
+      links and metadata keys as persistent IDs, so that they can be replaced
+      by the parent's instances while unpickling rather than copied.
+    """
+    result = _parse_chunk(contents, filename, lineno, preamble)
+    file = io.BytesIO()
+    _SymbolPickler(file, result[-1]).dump(result)
+    return file.getvalue()
+
+
+def parse_file_parallel(
+    filename: str,
+    encoding: str | None = None,
+    max_workers: int | None = None,
+    chunk_size: int = 1 << 20,
+) -> tuple[data.Directives, list[data.BeancountError], OptionsMap]:
+    """Parse a single large file in chunks, in parallel.
+
+    The file is split at directive boundaries (see split_chunks()), each chunk
+    is parsed in a worker process with its line number offset and the parser
+    state replayed from the preceding directives, and the builders' results are
+    merged in file order. The output is the same as that of parse_file(),
+    including the order and positions of errors. The splitter only models the
+    lexer approximately; if any chunk reports a syntax or lexer error, which is
+    how a bad split would show, the file is parsed again serially.
+
+    Args:
+      filename: The path of the file to be parsed.
+      encoding: A string or None, the encoding of the file, as for parse_file().
+      max_workers: The number of worker processes, or None for one per CPU.
+      chunk_size: The minimum number of bytes in a chunk. Smaller files are
+        parsed serially.
+    Returns:
+      Same as the output of parse_file().
+    """
+    if encoding is not None and codecs.lookup(encoding).name != "utf-8":
+        raise ValueError("Only UTF-8 encoded files are supported.")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    with open(filename, "rb") as file:
+        contents = file.read()
+    chunks = split_chunks(contents, chunk_size) if max_workers > 1 else []
+    if len(chunks) < 2:
+        return parse_file(io.BytesIO(contents), report_filename=filename)
+
+    ends = [offset for offset, _, _ in chunks[1:]] + [len(contents)]
+    # All the chunks share one symbol table: those parsed here intern their
+    # strings through it, and the strings of those parsed by the workers are
+    # replaced by its instances as their results are unpickled.
+    builder = grammar.Builder()
+    symbols = builder.symbols
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_parse_chunk_worker, contents[offset:end], filename, lineno, preamble)
+            for (offset, lineno, preamble), end in zip(chunks[1:], ends[1:])
+        ]
+        results = [_parse_chunk(contents[: ends[0]], filename, 1, b"", symbols)]
+        for future, (offset, lineno, preamble), end in zip(futures, chunks[1:], ends[1:]):
+            # Parse here rather than wait if no worker has started on it.
+            if future.cancel():
+                results.append(
+                    _parse_chunk(contents[offset:end], filename, lineno, preamble, symbols)
+                )
+            else:
+                unpickler = _SymbolUnpickler(io.BytesIO(future.result()), builder._symbol)
+                results.append(unpickler.load())
+
+    dcontext = display_context.DisplayContext()
+    for entries, errors, _, _, _, chunk_dcontext, _ in results:
+        builder.entries.extend(entries)
+        builder.errors.extend(errors)
+        dcontext.update_from(chunk_dcontext)
+    if any(isinstance(error, (ParserSyntaxError, lexer.LexerError)) for error in builder.errors):
+        return parse_file(io.BytesIO(contents), report_filename=filename)
+
+    # The last chunk's builder has seen all the state directives.
+    _, _, builder.options, builder.tags, builder.meta, _, _ = results[-1]
+    builder.dcontext = dcontext
+    return builder.finalize()
+
+
 def parse_doc(expect_errors=False, allow_incomplete=False):
     """Factory of decorators that parse the function's docstring as an argument.
 
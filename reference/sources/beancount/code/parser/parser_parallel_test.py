@@ -0,0 +1,244 @@
+__license__ = "GNU GPLv2"
+
+import concurrent.futures
+import random
+import textwrap
+import unittest
+from os import path
+from unittest import mock
+
+from beancount import loader
+from beancount.parser import parser
+from beancount.parser import parser_symbols_test
+from beancount.utils import test_utils
+
+
+class ParallelTestBase(unittest.TestCase):
+    def assertSameParse(self, expected, actual):
+        """Check that two (entries, errors, options_map) tuples are the same."""
+        expected_entries, expected_errors, expected_options = expected
+        entries, errors, options_map = actual
+        self.assertEqual(expected_entries, entries)
+        self.assertEqual(expected_errors, errors)
+        self.assertEqual(sorted(expected_options), sorted(options_map))
+        for name, value in expected_options.items():
+            if name == "dcontext":
+                self.assertEqual(str(value), str(options_map[name]))
+            else:
+                self.assertEqual(value, options_map[name], name)
+
+
+class TestParseRecursiveParallel(ParallelTestBase):
+    FILES = {
+        "main.beancount": """
+            option "title" "Main"
+            option "operating_currency" "USD"
+            include "accounts.beancount"
+            include "years/*.beancount"
+            include "missing/*.beancount"
+            include "accounts.beancount"
+
+            2020-01-01 * "Main"
+              Assets:Cash  1 USD
+              Equity:Opening
+        """,
+        "accounts.beancount": """
+            option "operating_currency" "CAD"
+            2020-01-01 open Assets:Cash
+            2020-01-01 open Equity:Opening
+            2020-01-01 open Expenses:Food
+        """,
+        "years/2020.beancount": """
+            include "../nested/2020-q1.beancount"
+            2020-06-01 * "2020"
+              Expenses:Food  2.50 USD
+              Assets:Cash
+        """,
+        "years/2021.beancount": """
+            pushtag #y2021
+            2021-06-01 * "2021"
+              Expenses:Food  3.125 USD
+              Assets:Cash
+            2021-06-02 * "Bad syntax
+              Expenses:Food  3 USD
+        """,
+        "nested/2020-q1.beancount": """
+            include "../years/2021.beancount"
+            2020-02-01 * "Q1"
+              Expenses:Food  4 USD
+              Assets:Cash
+        """,
+    }
+
+    def parse(self, root, max_workers):
+        sources = [(path.join(root, "main.beancount"), True)]
+        if max_workers is None:
+            return loader._parse_recursive(sources, None)
+        return parser.parse_recursive_parallel(sources, max_workers=max_workers)
+
+    def test_same_as_serial(self):
+        with test_utils.tempdir() as root:
+            test_utils.create_temporary_files(root, self.FILES)
+            expected = self.parse(root, None)
+            self.assertTrue(any("Duplicate filename" in e.message for e in expected[1]))
+            self.assertTrue(any("does not match" in e.message for e in expected[1]))
+            self.assertEqual(5, len(expected[2]["include"]))
+            for max_workers in (1, 2, 4):
+                self.assertSameParse(expected, self.parse(root, max_workers))
+
+    def test_parse_sources(self):
+        with test_utils.tempdir() as root:
+            test_utils.create_temporary_files(root, self.FILES)
+            sources = [(path.join(root, "main.beancount"), True)]
+            included = []
+
+            def parse_filename(filename):
+                self.assertIn(filename, included)
+                return parser.parse_file(filename)
+
+            included.append(sources[0][0])
+            self.assertSameParse(
+                loader._parse_recursive(sources, None),
+                parser.parse_sources(sources, parse_filename, on_include=included.append),
+            )
+
+    def test_string_source(self):
+        with test_utils.tempdir() as root:
+            test_utils.create_temporary_files(root, self.FILES)
+            source = textwrap.dedent(
+                """
+                include "{}"
+                2020-01-01 open Assets:Other
+                """
+            ).format(path.join(root, "accounts.beancount"))
+            sources = [(source, False)]
+            self.assertSameParse(
+                loader._parse_recursive(sources, None),
+                parser.parse_recursive_parallel(sources, max_workers=2),
+            )
+
+    def test_missing_file(self):
+        sources = [("/does/not/exist.beancount", True)]
+        self.assertSameParse(
+            loader._parse_recursive(sources, None),
+            parser.parse_recursive_parallel(sources, max_workers=2),
+        )
+
+
+def _ledger(seed, count):
+    """Return a ledger exercising the state directives and multi-line strings."""
+    rng = random.Random(seed)
+    lines = [
+        'option "title" "Chunks"',
+        "2020-01-01 open Assets:Cash",
+        "2020-01-01 open Expenses:Food",
+        "* Heading",
+    ]
+    tags = []
+    pushed_meta = 0
+    for index in range(count):
+        choice = rng.random()
+        if choice < 0.05:
+            tags.append("tag{}".format(index))
+            lines.append("pushtag #{}".format(tags[-1]))
+        elif choice < 0.08 and tags:
+            lines.append("poptag #{}".format(tags.pop()))
+        elif choice < 0.1:
+            lines.append('pushmeta location: "Place {}"'.format(index))
+            pushed_meta += 1
+        elif choice < 0.12:
+            lines.append('option "operating_currency" "C{}"'.format(index))
+        elif choice < 0.15:
+            # A string spanning lines, one of which looks like a directive.
+            lines.append('2020-02-01 note Assets:Cash "First line')
+            lines.append("2020-02-02 * not a directive; nor a comment")
+            lines.append('last line"')
+        elif choice < 0.17:
+            lines.append('; 2020-02-03 * "commented out"')
+        lines.append('2020-03-01 * "Payee {}" "Narration"'.format(index))
+        lines.append("  Expenses:Food  {}.{:02d} USD".format(index, index % 100))
+        lines.append("  Assets:Cash")
+    lines.extend("poptag #{}".format(tag) for tag in tags)
+    lines.extend(["popmeta location:"] * pushed_meta)
+    return "\n".join(lines) + "\n"
+
+
+class TestParseFileParallel(ParallelTestBase):
+    def setUp(self):
+        self.contents = _ledger(2, 400)
+
+    def check_file(self, contents, chunk_sizes=(300, 1000, 5000)):
+        with test_utils.temp_file(suffix=".beancount") as filename:
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write(contents)
+            expected = parser.parse_file(str(filename))
+            for chunk_size in chunk_sizes:
+                actual = parser.parse_file_parallel(
+                    str(filename), max_workers=2, chunk_size=chunk_size
+                )
+                self.assertSameParse(expected, actual)
+        return expected
+
+    def test_split_chunks(self):
+        contents = self.contents.encode("utf-8")
+        chunks = parser.split_chunks(contents, 500)
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual((0, 1, b""), chunks[0])
+        lines = contents.split(b"\n")
+        for offset, lineno, preamble in chunks[1:]:
+            self.assertEqual(lineno, contents.count(b"\n", 0, offset) + 1)
+            # Never the line inside a string.
+            self.assertIn(lines[lineno - 1][:10], (b"2020-02-01", b"2020-03-01"))
+            state = [
+                line
+                for line in lines[: lineno - 1]
+                if line.startswith((b"pushtag", b"poptag", b"pushmeta", b"popmeta", b"option"))
+            ]
+            self.assertEqual(b"\n".join(state), preamble)
+
+    def test_split_small_file(self):
+        contents = self.contents.encode("utf-8")
+        self.assertEqual([(0, 1, b"")], parser.split_chunks(contents, len(contents)))
+
+    def test_same_as_serial(self):
+        entries, errors, _ = self.check_file(self.contents)
+        self.assertEqual([], errors)
+        self.assertTrue(any(getattr(entry, "tags", None) for entry in entries))
+        self.assertTrue(any("location" in entry.meta for entry in entries))
+        self.assertTrue(any("\n2020-02-02" in getattr(entry, "comment", "") for entry in entries))
+
+    def test_shared_symbols(self):
+        contents = parser_symbols_test.LEDGER + self.contents + parser_symbols_test.LEDGER
+        with test_utils.temp_file(suffix=".beancount") as filename:
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write(contents)
+            # Take every chunk but the first from the workers.
+            with mock.patch.object(concurrent.futures.Future, "cancel", return_value=False):
+                actual = parser.parse_file_parallel(str(filename), max_workers=2, chunk_size=1000)
+            self.assertSameParse(parser.parse_file(str(filename)), actual)
+        entries, _, options_map = actual
+        symbols = options_map["symbols"]
+        for string in parser_symbols_test.iter_symbols(entries):
+            self.assertIs(symbols[string], string, string)
+
+    def test_trailing_errors(self):
+        _, errors, _ = self.check_file(
+            self.contents + '2020-04-01 * "Unterminated\n  Assets:Cash  1 USD\n'
+        )
+        self.assertTrue(errors)
+        _, errors, _ = self.check_file(self.contents + "2020-04-01 open\n")
+        self.assertTrue(errors)
+
+    def test_other_errors(self):
+        _, errors, _ = self.check_file(
+            self.contents + 'poptag #never-pushed\noption "unknown" "value"\n'
+        )
+        self.assertEqual(2, len(errors))
+
+    def test_invalid_encoding(self):
+        with self.assertRaises(ValueError):
+            parser.parse_file_parallel("unused.beancount", encoding="latin1")
+
+
+if __name__ == "__main__":
+    unittest.main()
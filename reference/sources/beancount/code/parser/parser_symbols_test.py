@@ -0,0 +1,113 @@
+__license__ = "GNU GPLv2"
+
+import unittest
+
+from beancount.core import account
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.core.number import MISSING
+from beancount.parser import parser
+
+LEDGER = """
+2020-01-01 open Assets:Cash USD,EUR
+2020-01-01 open Assets:Stock
+2020-01-01 note Assets:Cash "Opened" #ref
+2020-01-01 commodity HOOL
+  asset-class: "stock"
+
+pushtag #trip
+
+2020-01-02 * "Buy" #stock ^order-1
+  ref: "a"
+  Assets:Stock  10 HOOL {5.00 USD}
+    ref: "b"
+  Assets:Cash  -50.00 USD
+
+2020-01-03 * "Sell" #stock ^order-1
+  ref: "c"
+  Assets:Stock  -10 HOOL {5.00 USD} @ 6.00 USD
+  Assets:Cash  60.00 USD
+  Assets:Cash  -10.00 USD
+
+2020-01-04 * "Exchange" #stock ^order-2
+  Assets:Cash  10.00 EUR @@ 11.00 USD
+  Assets:Cash
+
+poptag #trip
+
+2020-01-05 price HOOL 6.10 USD
+2020-01-06 balance Assets:Cash  0.00 USD
+2020-01-06 note Assets:Stock "Sold" #stock ^order-2
+2020-01-07 pad Assets:Cash Assets:Stock
+2020-01-07 close Assets:Stock
+2020-01-08 custom "budget" Assets:Cash 10.00 EUR "monthly"
+"""
+
+
+def _user_keys(meta):
+    return (key for key in meta if key not in ("filename", "lineno"))
+
+
+def iter_symbols(entries):
+    """Yield every account, currency, tag, link and user metadata key of the entries."""
+    for entry in entries:
+        yield from _user_keys(entry.meta)
+        yield from getattr(entry, "tags", None) or ()
+        yield from getattr(entry, "links", None) or ()
+        if hasattr(entry, "account"):
+            yield entry.account
+        if isinstance(entry, data.Open):
+            yield from entry.currencies or ()
+        elif isinstance(entry, data.Commodity):
+            yield entry.currency
+        elif isinstance(entry, data.Price):
+            yield entry.currency
+            yield entry.amount.currency
+        elif isinstance(entry, data.Balance):
+            yield entry.amount.currency
+        elif isinstance(entry, data.Pad):
+            yield entry.source_account
+        elif isinstance(entry, data.Custom):
+            for value in entry.values:
+                if value.dtype == account.TYPE:
+                    yield value.value
+                elif value.dtype is Amount:
+                    yield value.value.currency
+        elif isinstance(entry, data.Transaction):
+            for posting in entry.postings:
+                yield posting.account
+                if posting.units is not MISSING:
+                    yield posting.units.currency
+                yield from _user_keys(posting.meta)
+                if posting.cost is not None:
+                    yield posting.cost.currency
+                if posting.price is not None:
+                    yield posting.price.currency
+
+
+class TestSymbols(unittest.TestCase):
+    def test_shared_instances(self):
+        entries, errors, options_map = parser.parse_string(LEDGER)
+        self.assertEqual([], errors)
+        symbols = options_map["symbols"]
+        seen = list(iter_symbols(entries))
+        for name in ("Assets:Cash", "USD", "EUR", "HOOL", "trip", "stock", "order-1", "ref"):
+            self.assertIn(name, seen)
+        for string in seen:
+            self.assertIs(symbols[string], string, string)
+        # A metadata key spelled like an earlier tag is the same object.
+        (tag,) = next(entry.tags for entry in entries if isinstance(entry, data.Note))
+        self.assertIs(symbols["ref"], tag)
+        # The balance assertion's currency comes through the amount rule.
+        balance = next(entry for entry in entries if isinstance(entry, data.Balance))
+        self.assertIs(symbols["USD"], balance.amount.currency)
+
+    def test_one_table_per_parse(self):
+        _, _, first = parser.parse_string(LEDGER)
+        _, _, second = parser.parse_string(LEDGER)
+        self.assertEqual(first["symbols"], second["symbols"])
+        self.assertIsNot(first["symbols"], second["symbols"])
+
+
+if __name__ == "__main__":
+    unittest.main()
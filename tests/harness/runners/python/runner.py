@@ -22,6 +22,13 @@
 from reporters.json_reporter import JSONReporter
 from reporters.tap import TAPReporter
 
+# The profiler is shared with the benchmark suite; --profile needs
+# conformance/benchmarks on PYTHONPATH.
+try:
+    from pta_bench.profiling import Profiler
+except ImportError:
+    Profiler = None
+
 # Global to track implementation
 _implementation = "beancount"
 
@@ -45,13 +52,21 @@ def get_executor(test: TestCase):
 def run_tests(
     tests: list[TestCase],
     fail_fast: bool = False,
+    profiler: Profiler | None = None,
 ) -> list[TestResult]:
-    """Run a list of tests and return results."""
+    """Run a list of tests and return results.
+
+    With a profiler, each test's execution is profiled under its ID.
+    """
     results = []
 
     for test in tests:
         executor = get_executor(test)
-        result = executor.execute(test)
+        if profiler:
+            with profiler.capture(test.id):
+                result = executor.execute(test)
+        else:
+            result = executor.execute(test)
         results.append(result)
 
         if fail_fast and not result.passed:
@@ -83,6 +98,10 @@ def main():
 
   # Output as JSON
   python runner.py --manifest ../../beancount/v3/manifest.json --format json
+
+  # Profile the reference implementation per test (reports in ./profile)
+  PYTHONPATH=../../../../conformance/benchmarks \\
+    python runner.py --manifest ../../beancount/v3/manifest.json --profile cpu
 """,
     )
 
@@ -140,8 +159,27 @@ def main():
         default="beancount",
         help="Implementation to test against (default: beancount)",
     )
+    parser.add_argument(
+        "--profile",
+        choices=["cpu", "alloc"],
+        help="Profile each test with cProfile (cpu) or tracemalloc (alloc)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path("profile"),
+        help="Directory for the profile reports (default: profile)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        help="Functions or allocation sites in the text reports (default: 30)",
+    )
 
     args = parser.parse_args()
+    if args.profile and Profiler is None:
+        parser.error("--profile needs conformance/benchmarks on PYTHONPATH")
 
     # Set global implementation
     global _implementation
@@ -174,7 +212,10 @@ def main():
     test_descriptions = {t.id: t.description for t in tests}
 
     # Run tests
-    results = run_tests(tests, fail_fast=args.fail_fast)
+    profiler = Profiler(args.profile, top=args.profile_top) if args.profile else None
+    results = run_tests(tests, fail_fast=args.fail_fast, profiler=profiler)
+    if profiler:
+        profiler.write_reports(args.profile_dir / "conformance")
 
     # Report results
     reporter: JSONReporter | TAPReporter
@@ -0,0 +1,86 @@
+"""Unit tests for the runner's command line, covering profiling."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import runner
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> Path:
+    """Create a manifest with two syntax tests."""
+    (tmp_path / "manifest.json").write_text(
+        json.dumps({"format": "beancount", "version": "3", "test_directories": ["suite"]})
+    )
+    suite_dir = tmp_path / "suite"
+    suite_dir.mkdir()
+    tests_json = {
+        "suite": "suite",
+        "tests": [
+            {
+                "id": "open",
+                "description": "Open directive",
+                "input": {"inline": "2024-01-01 open Assets:Bank"},
+                "expected": {"parse": "success", "directives": 1},
+            },
+            {
+                "id": "balance",
+                "description": "Balance directive",
+                "input": {
+                    "inline": "2024-01-01 open Assets:Bank\n2024-01-02 balance Assets:Bank 0 USD"
+                },
+                "expected": {"parse": "success", "directives": 2},
+            },
+        ],
+    }
+    (suite_dir / "tests.json").write_text(json.dumps(tests_json))
+    return tmp_path / "manifest.json"
+
+
+def run_main(monkeypatch: pytest.MonkeyPatch, *args: str) -> int:
+    """Run the runner's main() with ``args``; return its exit code."""
+    monkeypatch.setattr(sys, "argv", ["runner.py", *args])
+    with pytest.raises(SystemExit) as exc_info:
+        runner.main()
+    assert isinstance(exc_info.value.code, int)
+    return exc_info.value.code
+
+
+class TestProfiling:
+    @pytest.mark.parametrize("kind", ["cpu", "alloc"])
+    def test_profile_writes_reports(self, manifest, tmp_path, monkeypatch, capsys, kind):
+        profile_dir = tmp_path / "reports"
+        code = run_main(
+            monkeypatch,
+            "--manifest",
+            str(manifest),
+            "--profile",
+            kind,
+            "--profile-dir",
+            str(profile_dir),
+            "--profile-top",
+            "5",
+        )
+        assert code == 0
+        summary = json.loads((profile_dir / f"conformance.{kind}.json").read_text())
+        assert summary["kind"] == kind
+        assert set(summary["labels"]) == {"open", "balance"}
+        assert (profile_dir / f"conformance.{kind}.txt").exists()
+        assert "Profile written to" in capsys.readouterr().err
+
+    def test_without_profile(self, manifest, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert run_main(monkeypatch, "--manifest", str(manifest)) == 0
+        assert not (tmp_path / "profile").exists()
+
+    def test_unknown_kind(self, manifest, monkeypatch):
+        assert run_main(monkeypatch, "--manifest", str(manifest), "--profile", "wall") == 2
+
+    def test_profiler_unavailable(self, manifest, monkeypatch, capsys):
+        monkeypatch.setattr(runner, "Profiler", None)
+        assert run_main(monkeypatch, "--manifest", str(manifest), "--profile", "cpu") == 2
+        assert "PYTHONPATH" in capsys.readouterr().err